@@ -1,4 +1,6 @@
+import sys
 from logging.config import fileConfig
+from pathlib import Path
 
 from sqlalchemy import engine_from_config
 from sqlalchemy import pool
@@ -9,6 +11,11 @@ from alembic import context
 # access to the values within the .ini file in use.
 config = context.config
 
+# Connect with the application's database settings
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "backend" / "src"))
+from database.config import DATABASE_URL
+config.set_main_option("sqlalchemy.url", DATABASE_URL)
+
 # Interpret the config file for Python logging.
 # This line sets up loggers basically.
 if config.config_file_name is not None:
@@ -0,0 +1,34 @@
+"""add receipts.ocr_data
+
+Revision ID: 3f1c2a9d4b7e
+Revises: 
+Create Date: 2026-10-17 09:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3f1c2a9d4b7e'
+down_revision: Union[str, None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _has_ocr_data() -> bool:
+    # Databases created after the model change already have the column
+    columns = sa.inspect(op.get_bind()).get_columns("receipts")
+    return any(column["name"] == "ocr_data" for column in columns)
+
+
+def upgrade() -> None:
+    if not _has_ocr_data():
+        op.add_column("receipts", sa.Column("ocr_data", sa.LargeBinary(), nullable=True))
+
+
+def downgrade() -> None:
+    if _has_ocr_data():
+        op.drop_column("receipts", "ocr_data")
@@ -3,14 +3,16 @@ from fastapi import APIRouter
 
 # Import routers
 from .receipts import router as receipts_router
+from .rules import router as rules_router
+from .statements import router as statements_router
 
 # Create empty routers for now
-statements_router = APIRouter()
 budgets_router = APIRouter()
 analytics_router = APIRouter()
 
 # Export routers
 receipts = receipts_router
+rules = rules_router
 statements = statements_router
 budgets = budgets_router
 analytics = analytics_router
\ No newline at end of file
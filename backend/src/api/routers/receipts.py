@@ -1,15 +1,21 @@
 # backend/src/api/routers/receipts.py
 from fastapi import APIRouter, Depends, HTTPException, UploadFile, File
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 from typing import List, Optional
 from datetime import datetime
-import cv2
-import numpy as np
 from pydantic import BaseModel
+import json
 
 # Import from our application
 from api.dependencies import get_database
 from services.ocr.service import OCRService
+from services.ocr.extractor import Receipt
+from services.categorization.classifier import to_category_type
+from services.categorization.rules import rule_engine
+from services.ocr.ingestion import ImageRejectedError, ImageTooLargeError
+from services.ocr.pool import OCRQueueFullError, OCRStageTimeoutError
+from database.config import SessionLocal
 from database.utils import DatabaseManager
 from database.models import CategoryType
 from database.user_utils import UserManager  # Add this import
@@ -32,10 +38,90 @@ class ReceiptResponse(BaseModel):
     tax: float
     total: float
     categories_summary: dict
+    ocr_tier: str
 
     class Config:
         orm_mode = True
 
+async def _find_processed(contents: bytes, user_id: int, db: Session):
+    """Digest, perceptual hash, the result of an identical earlier upload and a near-duplicate candidate.
+
+    The candidate only comes from a similar-looking photo; it is used once
+    ``_read_upload`` has confirmed it against the new upload's text.
+    """
+    digest = ocr_service.cache.digest(contents)
+    receipt_data = ocr_service.cache.get(digest, db)
+    if receipt_data is not None:
+        return digest, None, receipt_data, None
+
+    # Look for another photo of the same receipt using a cheap thumbnail
+    phash = await ocr_service.image_hash(contents)
+    duplicate_digest = ocr_service.duplicates.find(user_id, phash)
+    candidate = ocr_service.cache.get(duplicate_digest, db) if duplicate_digest else None
+    return digest, phash, None, candidate
+
+async def _read_upload(contents: bytes, candidate: Optional[Receipt], db: Session, classify: bool):
+    """Decode and read a new upload, reusing ``candidate`` when it shows the same receipt.
+
+    Returns the receipt and whether its items are classified.
+    """
+    image = await ocr_service.decode_image(contents)
+    fast_ocr = None
+    if candidate is not None:
+        confirmed, fast_ocr = await ocr_service.confirm_duplicate(image, candidate)
+        if confirmed:
+            return candidate, True
+
+    if classify:
+        # The result is shared through the cache, so no user rules yet
+        receipt_data = await ocr_service.process_receipt(image, db, fast_ocr=fast_ocr)
+    else:
+        receipt_data = await ocr_service.read_receipt(image, fast_ocr)
+    if not receipt_data:
+        raise HTTPException(status_code=422, detail="Failed to process receipt")
+    return receipt_data, classify
+
+async def _store_receipt(db: Session, user_id: int, receipt_data: Receipt):
+    """Store a processed receipt; unclassified items are stored as miscellaneous."""
+    return await DatabaseManager.create_receipt(
+        db=db,
+        user_id=user_id,
+        store_name=receipt_data.store_name,
+        date=receipt_data.date,
+        items=[{
+            "description": item.description,
+            "quantity": item.quantity,
+            "price": item.price,
+            "category": to_category_type(item.category)
+        } for item in receipt_data.items],
+        subtotal=receipt_data.subtotal,
+        tax=receipt_data.tax,
+        total=receipt_data.total,
+        raw_text=receipt_data.raw_text,
+        ocr_data=(
+            receipt_data.ocr_result.to_bytes()
+            if receipt_data.ocr_result is not None else None
+        )
+    )
+
+def _upload_error(e: Exception) -> HTTPException:
+    """Map processing errors to HTTP errors."""
+    if isinstance(e, HTTPException):
+        return e
+    if isinstance(e, ImageTooLargeError):
+        return HTTPException(status_code=413, detail=str(e))
+    if isinstance(e, ImageRejectedError):
+        return HTTPException(status_code=400, detail=str(e))
+    if isinstance(e, OCRQueueFullError):
+        return HTTPException(status_code=503, detail=str(e))
+    if isinstance(e, OCRStageTimeoutError):
+        return HTTPException(status_code=504, detail=str(e))
+    return HTTPException(status_code=500, detail=str(e))
+
+def _sse(event: str, data: dict) -> str:
+    """Format one server-sent event."""
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
 @router.post("/upload", response_model=ReceiptResponse)
 async def upload_receipt(
     file: UploadFile = File(...),
@@ -51,36 +137,22 @@ async def upload_receipt(
         if not test_user:
             test_user = UserManager.create_test_user(db)
 
-        # Read and process image
+        # Read image and check for a previously processed identical upload
         contents = await file.read()
-        nparr = np.frombuffer(contents, np.uint8)
-        image = cv2.imdecode(nparr, cv2.IMREAD_COLOR)
+        digest, phash, receipt_data, candidate = await _find_processed(contents, test_user.id, db)
 
-        if image is None:
-            raise HTTPException(status_code=400, detail="Invalid image file")
+        if receipt_data is None:
+            receipt_data, _ = await _read_upload(contents, candidate, db, classify=True)
 
-        # Process receipt with OCR
-        receipt_data = await ocr_service.process_receipt(image)
-        if not receipt_data:
-            raise HTTPException(status_code=422, detail="Failed to process receipt")
+        if phash is not None:
+            ocr_service.cache.put(digest, receipt_data, db)
+            ocr_service.duplicates.add(test_user.id, phash, digest)
 
         # Store in database
-        stored_receipt = await DatabaseManager.create_receipt(
-            db=db,
-            user_id=test_user.id,  # Use test user ID
-            store_name=receipt_data.store_name,
-            date=receipt_data.date,
-            items=[{
-                "description": item.description,
-                "quantity": item.quantity,
-                "price": item.price,
-                "category": CategoryType.MISCELLANEOUS  # Default category
-            } for item in receipt_data.items],
-            subtotal=receipt_data.subtotal,
-            tax=receipt_data.tax,
-            total=receipt_data.total,
-            raw_text=receipt_data.raw_text
-        )
+        stored_receipt = await _store_receipt(db, test_user.id, receipt_data)
+        # Apply this user's rules to their stored copy only
+        if rule_engine.apply_to_receipt(db, test_user.id, stored_receipt.id):
+            db.refresh(stored_receipt)
 
         # Calculate categories summary
         categories_summary = await DatabaseManager.get_receipt_categories_summary(
@@ -100,8 +172,129 @@ async def upload_receipt(
             subtotal=stored_receipt.subtotal,
             tax=stored_receipt.tax,
             total=stored_receipt.total,
-            categories_summary=categories_summary
+            categories_summary=categories_summary,
+            ocr_tier=receipt_data.ocr_tier
         )
 
     except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
\ No newline at end of file
+        raise _upload_error(e)
+
+@router.post("/upload/stream")
+async def upload_receipt_stream(
+    file: UploadFile = File(...),
+    db: Session = Depends(get_database)
+):
+    """Upload a receipt and stream item classification as server-sent events.
+
+    The receipt is stored as soon as it is parsed (``receipt`` event, items
+    still miscellaneous). Each item's category is written to
+    ``receipt_items`` as the classifier produces it (``item`` event), and
+    ``done`` carries the final categories summary.
+    """
+    if not file.content_type.startswith("image/"):
+        raise HTTPException(status_code=400, detail="File must be an image")
+
+    try:
+        test_user = UserManager.get_user_by_email(db, "test@example.com")
+        if not test_user:
+            test_user = UserManager.create_test_user(db)
+
+        contents = await file.read()
+        digest, phash, receipt_data, candidate = await _find_processed(contents, test_user.id, db)
+        classified = receipt_data is not None
+
+        if receipt_data is None:
+            receipt_data, classified = await _read_upload(contents, candidate, db, classify=False)
+
+        stored_receipt = await _store_receipt(db, test_user.id, receipt_data)
+        if classified and rule_engine.apply_to_receipt(db, test_user.id, stored_receipt.id):
+            db.refresh(stored_receipt)
+
+        # Items were inserted in receipt order
+        stored_items = sorted(stored_receipt.items, key=lambda item: item.id)
+        item_ids = [item.id for item in stored_items]
+        receipt_id = stored_receipt.id
+        user_id = test_user.id
+        receipt_event = _sse("receipt", {
+            "id": receipt_id,
+            "store_name": stored_receipt.store_name,
+            "date": stored_receipt.date.isoformat(),
+            "subtotal": stored_receipt.subtotal,
+            "tax": stored_receipt.tax,
+            "total": stored_receipt.total,
+            "ocr_tier": receipt_data.ocr_tier,
+            "items": [{
+                "id": item.id,
+                "description": item.description,
+                "quantity": item.quantity,
+                "price": item.price,
+                "category": item.category.value
+            } for item in stored_items],
+            "classified": classified
+        })
+    except Exception as e:
+        raise _upload_error(e)
+
+    async def events():
+        yield receipt_event
+
+        # The request's session is closed once the response starts, so the
+        # stream works in a session of its own
+        db = SessionLocal()
+        try:
+            if not classified:
+                completed = 0
+                rules = rule_engine.rules_for(db, user_id)
+                # receipt_data keeps the model's categories for the shared cache;
+                # this user's rules only decide what is stored and sent
+                async for index, item in ocr_service.stream_classification(receipt_data, db):
+                    source = receipt_data.items[index]
+                    rule = rules.match(source.description, source.price) if rules else None
+                    category = to_category_type(rule.category if rule else item.category)
+                    await DatabaseManager.update_receipt_item_category(db, item_ids[index], category)
+                    completed += 1
+                    yield _sse("item", {
+                        "index": index,
+                        "id": item_ids[index],
+                        "description": item.description,
+                        "category": category.value,
+                        "confidence": 1.0 if rule else item.confidence,
+                        "completed": completed,
+                        "total": len(item_ids)
+                    })
+
+            if phash is not None:
+                ocr_service.cache.put(digest, receipt_data, db)
+                ocr_service.duplicates.add(user_id, phash, digest)
+
+            yield _sse("done", {
+                "id": receipt_id,
+                "categories_summary": await DatabaseManager.get_receipt_categories_summary(
+                    db, receipt_id
+                )
+            })
+        except Exception as e:
+            yield _sse("error", {"detail": str(e)})
+        finally:
+            db.close()
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@router.get("/cache/stats")
+async def get_cache_stats():
+    """Get hit/miss/eviction counters of the receipt result cache."""
+    return ocr_service.cache.stats()
+
+@router.get("/classification-cache/stats")
+async def get_classification_cache_stats():
+    """Get hit/miss/eviction counters of the item classification cache."""
+    return ocr_service.classifier.cache.stats()
+
+@router.get("/classification/stats")
+async def get_classification_stats():
+    """Get how many items the cache, the local model and the LLM classified."""
+    return ocr_service.classifier.stats()
@@ -0,0 +1,127 @@
+# backend/src/api/routers/rules.py
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.orm import Session
+from typing import Dict, List, Optional
+from datetime import datetime
+from pydantic import BaseModel, Field
+from api.dependencies import get_database
+from services.categorization.classifier import ExpenseCategory
+from services.categorization.rules import rule_engine
+from database.models import CategoryRule
+from database.user_utils import UserManager
+
+router = APIRouter()
+
+class RuleCreate(BaseModel):
+    pattern: str = Field(..., min_length=1)  # matched case-insensitively anywhere in the description
+    category: ExpenseCategory
+    min_amount: Optional[float] = None
+    max_amount: Optional[float] = None
+    priority: int = 0
+
+class RuleResponse(RuleCreate):
+    id: int
+    created_at: datetime
+    updated_at: datetime
+
+class RuleChange(BaseModel):
+    rule: Optional[RuleResponse]
+    updated: Dict[str, int]  # rows recategorized per table
+
+def _current_user_id(db: Session) -> int:
+    test_user = UserManager.get_user_by_email(db, "test@example.com")
+    if not test_user:
+        test_user = UserManager.create_test_user(db)
+    return test_user.id
+
+def _validate(rule: RuleCreate):
+    if not rule.pattern.strip():
+        raise HTTPException(status_code=400, detail="Pattern must not be blank")
+    if rule.min_amount is not None and rule.max_amount is not None and rule.min_amount > rule.max_amount:
+        raise HTTPException(status_code=400, detail="min_amount is greater than max_amount")
+
+def _to_response(record: CategoryRule) -> RuleResponse:
+    return RuleResponse(
+        id=record.id,
+        pattern=record.pattern,
+        category=ExpenseCategory(record.category),
+        min_amount=record.min_amount,
+        max_amount=record.max_amount,
+        priority=record.priority,
+        created_at=record.created_at,
+        updated_at=record.updated_at
+    )
+
+def _get_rule(db: Session, user_id: int, rule_id: int) -> CategoryRule:
+    record = db.query(CategoryRule).filter(
+        CategoryRule.id == rule_id, CategoryRule.user_id == user_id
+    ).first()
+    if record is None:
+        raise HTTPException(status_code=404, detail="Rule not found")
+    return record
+
+@router.get("/", response_model=List[RuleResponse])
+async def list_rules(db: Session = Depends(get_database)):
+    """List the user's categorization rules."""
+    user_id = _current_user_id(db)
+    records = db.query(CategoryRule).filter(CategoryRule.user_id == user_id).order_by(CategoryRule.id).all()
+    return [_to_response(record) for record in records]
+
+@router.post("/", response_model=RuleChange)
+async def create_rule(rule: RuleCreate, db: Session = Depends(get_database)):
+    """Create a rule and apply it to the user's stored items and transactions."""
+    _validate(rule)
+    user_id = _current_user_id(db)
+    try:
+        record = CategoryRule(
+            user_id=user_id,
+            pattern=rule.pattern.strip(),
+            category=rule.category.value,
+            min_amount=rule.min_amount,
+            max_amount=rule.max_amount,
+            priority=rule.priority
+        )
+        db.add(record)
+        db.commit()
+        db.refresh(record)
+        return RuleChange(rule=_to_response(record), updated=rule_engine.reapply(db, user_id))
+    except Exception as e:
+        db.rollback()
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.put("/{rule_id}", response_model=RuleChange)
+async def update_rule(rule_id: int, rule: RuleCreate, db: Session = Depends(get_database)):
+    """Change a rule and re-apply the user's rules to stored items and transactions."""
+    _validate(rule)
+    user_id = _current_user_id(db)
+    record = _get_rule(db, user_id, rule_id)
+    try:
+        record.pattern = rule.pattern.strip()
+        record.category = rule.category.value
+        record.min_amount = rule.min_amount
+        record.max_amount = rule.max_amount
+        record.priority = rule.priority
+        db.commit()
+        db.refresh(record)
+        return RuleChange(rule=_to_response(record), updated=rule_engine.reapply(db, user_id))
+    except Exception as e:
+        db.rollback()
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.delete("/{rule_id}", response_model=RuleChange)
+async def delete_rule(rule_id: int, db: Session = Depends(get_database)):
+    """Delete a rule; rows it categorized keep their category until another rule matches them."""
+    user_id = _current_user_id(db)
+    record = _get_rule(db, user_id, rule_id)
+    try:
+        db.delete(record)
+        db.commit()
+        return RuleChange(rule=None, updated=rule_engine.reapply(db, user_id))
+    except Exception as e:
+        db.rollback()
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/stats")
+async def get_rule_stats():
+    """Get compiled-rule cache counters."""
+    return rule_engine.stats()
@@ -1,44 +1,111 @@
 # backend/src/api/routers/statements.py
-from fastapi import APIRouter, Depends, HTTPException, UploadFile, File
+from fastapi import APIRouter, Depends, HTTPException, Request, UploadFile, File
+from fastapi.responses import StreamingResponse
+from starlette.background import BackgroundTask
 from sqlalchemy.orm import Session
 from typing import List
 from ..dependencies import get_db
+from .receipts import ocr_service
 from services.pdf_processing.statement_extractor import StatementProcessor
-from database.utils import DatabaseManager
+from services.categorization.statements import StatementCategorizer
+from services.categorization.rules import rule_engine
+from database.config import SessionLocal
+from database.utils import BankTransactionSink
+import json
+import os
+import shutil
+import tempfile
 
 router = APIRouter()
 statement_processor = StatementProcessor()
+# Shares the receipt classifier, so statement merchants and receipt items
+# go through one micro-batcher and one classification cache per process
+statement_categorizer = StatementCategorizer(ocr_service.classifier)
+
+def _sse(event: str, data: dict) -> str:
+    """Format one server-sent event."""
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+def _remove_file(path: str):
+    """Delete a temporary file if it is still there."""
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
 
 @router.post("/upload")
 async def upload_statement(
+    request: Request,
     file: UploadFile = File(...),
+    stream: bool = False,
     db: Session = Depends(get_db)
 ):
-    """Upload and process a bank statement PDF."""
+    """Upload and process a bank statement PDF.
+
+    Pages are extracted, categorized and written in batches as they come.
+    The response is JSON once everything is stored. With ``?stream=true``
+    (or ``Accept: text/event-stream``) progress is streamed instead, with
+    a ``page`` event per page and a final ``done`` event.
+    """
     try:
-        # Save PDF temporarily
-        temp_path = f"temp_{file.filename}"
-        with open(temp_path, "wb") as buffer:
-            buffer.write(await file.read())
-        
-        # Process statement
-        transactions = await statement_processor.process_statement(temp_path)
-        
-        # Store transactions
-        stored_transactions = []
-        for transaction in transactions:
-            stored_transaction = await DatabaseManager.create_bank_transaction(
-                db=db,
-                user_id=1,  # TODO: Get from auth
-                date=transaction.date,
-                description=transaction.description,
-                amount=transaction.amount,
-                transaction_type=transaction.transaction_type,
-                category=transaction.category,
-                raw_text=transaction.raw_text
-            )
-            stored_transactions.append(stored_transaction)
-        
-        return {"message": f"Processed {len(stored_transactions)} transactions"}
+        # Copy the upload to disk in chunks; page workers open the file by path
+        with tempfile.NamedTemporaryFile(suffix=".pdf", delete=False) as buffer:
+            shutil.copyfileobj(file.file, buffer)
+            temp_path = buffer.name
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+
+    user_id = 1  # TODO: Get from auth
+
+    if not stream and "text/event-stream" not in request.headers.get("accept", ""):
+        try:
+            sink = BankTransactionSink(db, user_id)
+            rules = rule_engine.rules_for(db, user_id)
+            async for page in statement_processor.stream_statement(temp_path):
+                # One classification per distinct merchant, fanned out to every row
+                await statement_categorizer.categorize(page.transactions, db, rules=rules)
+                await sink.add(page.transactions)
+            stored = await sink.flush()
+            return {"message": f"Processed {stored} transactions"}
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=str(e))
+        finally:
+            _remove_file(temp_path)
+
+    async def events():
+        # The request's session is closed once the response starts, so the
+        # stream works in a session of its own
+        db = SessionLocal()
+        sink = BankTransactionSink(db, user_id)
+        found = 0
+        try:
+            rules = rule_engine.rules_for(db, user_id)
+            async for page in statement_processor.stream_statement(temp_path):
+                await statement_categorizer.categorize(page.transactions, db, rules=rules)
+                found += len(page.transactions)
+                yield _sse("page", {
+                    "page": page.number,
+                    "pages": page.page_count,
+                    "transactions": found,
+                    "stored": await sink.add(page.transactions)
+                })
+
+            stored = await sink.flush()
+            yield _sse("done", {
+                "message": f"Processed {stored} transactions",
+                "transactions": stored,
+                "batches": sink.batches
+            })
+        except Exception as e:
+            yield _sse("error", {"detail": str(e), "stored": sink.written})
+        finally:
+            db.close()
+            _remove_file(temp_path)
+
+    # The background task also removes the file when the client leaves before the body starts
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+        background=BackgroundTask(_remove_file, temp_path)
+    )
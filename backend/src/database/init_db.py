@@ -14,7 +14,12 @@ from database.user_utils import UserManager
 console = Console()
 
 def initialize_database():
-    """Initialize database with tables and test user."""
+    """Initialize database with tables and test user.
+
+    create_all only adds missing tables. Columns added to existing tables
+    come from the alembic migrations: run ``alembic upgrade head`` from the
+    repository root when deploying.
+    """
     try:
         console.print("\n=== Initializing Database ===\n", style="bold blue")
         
@@ -1,5 +1,5 @@
 # backend/src/database/models.py
-from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey, Enum as SQLEnum
+from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey, LargeBinary, Enum as SQLEnum
 from sqlalchemy.orm import relationship
 from sqlalchemy.dialects.postgresql import JSONB
 from datetime import datetime
@@ -48,6 +48,7 @@ class Receipt(Base):
     total = Column(Float, nullable=False)
     image_path = Column(String)
     raw_text = Column(String)
+    ocr_data = Column(LargeBinary)  # OCRResult.to_bytes(), for re-parsing without OCR
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
@@ -100,6 +101,42 @@ class Budget(Base):
     # Relationships
     user = relationship("User", back_populates="budgets")
 
+class ReceiptResultCacheEntry(Base):
+    __tablename__ = "receipt_result_cache"
+
+    digest = Column(String(64), primary_key=True)  # SHA-256 of the uploaded image
+    payload = Column(JSONB, nullable=False)
+    hit_count = Column(Integer, default=0, nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    last_hit_at = Column(DateTime, default=datetime.utcnow)
+
+class ClassificationCacheEntry(Base):
+    __tablename__ = "classification_cache"
+
+    key = Column(String(64), primary_key=True)  # SHA-256 of taxonomy version, store type, description
+    description = Column(String, nullable=False)  # normalized item description
+    store_type = Column(String, nullable=False)
+    taxonomy_version = Column(String, nullable=False)
+    category = Column(String, nullable=False)
+    confidence = Column(Float, nullable=False)
+    reasoning = Column(String)
+    hit_count = Column(Integer, default=0, nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    last_hit_at = Column(DateTime, default=datetime.utcnow)
+
+class CategoryRule(Base):
+    __tablename__ = "category_rules"
+
+    id = Column(Integer, primary_key=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
+    pattern = Column(String, nullable=False)  # case-insensitive substring of the description
+    category = Column(String, nullable=False)  # ExpenseCategory value
+    min_amount = Column(Float)  # inclusive bounds on the item price / transaction amount
+    max_amount = Column(Float)
+    priority = Column(Integer, default=0, nullable=False)  # higher wins when rules overlap
+    created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
 # Optional: Analytics tables
 class MonthlySpending(Base):
     __tablename__ = "monthly_spending"
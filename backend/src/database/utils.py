@@ -1,8 +1,13 @@
 # backend/src/database/utils.py
-from typing import List, Optional, Dict, Any
+import os
+from typing import Iterable, List, Optional, Dict, Any
 from datetime import datetime
+from sqlalchemy import insert
 from sqlalchemy.orm import Session
-from .models import Receipt, ReceiptItem, BankTransaction, Budget, CategoryType
+from .models import Receipt, ReceiptItem, BankTransaction, Budget, CategoryType, TransactionType
+
+# Rows per multi-row INSERT when storing statement transactions
+STATEMENT_INSERT_BATCH_SIZE = int(os.getenv("STATEMENT_INSERT_BATCH_SIZE", "500"))
 
 class DatabaseManager:
     @staticmethod
@@ -15,7 +20,8 @@ class DatabaseManager:
         subtotal: float,
         tax: float,
         total: float,
-        raw_text: Optional[str] = None
+        raw_text: Optional[str] = None,
+        ocr_data: Optional[bytes] = None
     ) -> Receipt:
         """Create a new receipt with items."""
         try:
@@ -27,7 +33,8 @@ class DatabaseManager:
                 subtotal=subtotal,
                 tax=tax,
                 total=total,
-                raw_text=raw_text
+                raw_text=raw_text,
+                ocr_data=ocr_data
             )
             db.add(receipt)
             db.flush()
@@ -52,6 +59,80 @@ class DatabaseManager:
             db.rollback()
             raise e
 
+    @staticmethod
+    async def update_receipt_item_category(
+        db: Session,
+        item_id: int,
+        category: CategoryType
+    ):
+        """Set one receipt item's category and commit right away."""
+        try:
+            db.query(ReceiptItem).filter(ReceiptItem.id == item_id).update(
+                {ReceiptItem.category: category}, synchronize_session=False
+            )
+            db.commit()
+        except Exception as e:
+            db.rollback()
+            raise e
+
+    @staticmethod
+    async def create_bank_transaction(
+        db: Session,
+        user_id: int,
+        date: datetime,
+        description: str,
+        amount: float,
+        transaction_type: str,
+        category: Optional[str] = None,
+        raw_text: Optional[str] = None
+    ) -> BankTransaction:
+        """Create one bank statement transaction; uncategorized ones are stored as miscellaneous."""
+        try:
+            transaction = BankTransaction(
+                user_id=user_id,
+                date=date,
+                description=description,
+                amount=amount,
+                transaction_type=TransactionType(transaction_type),
+                category=CategoryType(category or CategoryType.MISCELLANEOUS.value),
+                raw_text=raw_text
+            )
+            db.add(transaction)
+            db.commit()
+            db.refresh(transaction)
+            return transaction
+
+        except Exception as e:
+            db.rollback()
+            raise e
+
+    @staticmethod
+    async def create_bank_transactions(db: Session, user_id: int, transactions: Iterable[Any]) -> int:
+        """Insert statement transactions (objects with ``BankTransaction`` fields) in one statement.
+
+        Uses a multi-row INSERT without loading ORM objects; uncategorized
+        transactions are stored as miscellaneous. Returns the rows inserted.
+        """
+        rows = [{
+            "user_id": user_id,
+            "date": transaction.date,
+            "description": transaction.description,
+            "amount": transaction.amount,
+            "transaction_type": TransactionType(transaction.transaction_type),
+            "category": CategoryType(transaction.category or CategoryType.MISCELLANEOUS.value),
+            "raw_text": transaction.raw_text
+        } for transaction in transactions]
+        if not rows:
+            return 0
+        try:
+            db.execute(insert(BankTransaction), rows)
+            db.commit()
+            return len(rows)
+
+        except Exception as e:
+            db.rollback()
+            raise e
+
     @staticmethod
     async def get_receipts(
         db: Session,
@@ -93,4 +174,39 @@ class DatabaseManager:
             summary[category]["total"] += item.price * item.quantity
             summary[category]["count"] += item.quantity
             
-        return summary
\ No newline at end of file
+        return summary
+
+class BankTransactionSink:
+    """Buffer statement transactions and store them in batches of ``batch_size``.
+
+    Each batch is one multi-row INSERT and commit, so memory holds at most
+    one batch. A failed batch is rolled back; earlier batches stay stored.
+    """
+
+    def __init__(self, db: Session, user_id: int, batch_size: int = STATEMENT_INSERT_BATCH_SIZE):
+        self.db = db
+        self.user_id = user_id
+        self.batch_size = max(batch_size, 1)
+        self._buffer: List[Any] = []
+        self.written = 0
+        self.batches = 0
+
+    @property
+    def pending(self) -> int:
+        return len(self._buffer)
+
+    async def add(self, transactions: Iterable[Any]) -> int:
+        """Buffer transactions, writing every full batch; returns the rows written so far."""
+        for transaction in transactions:
+            self._buffer.append(transaction)
+            if len(self._buffer) >= self.batch_size:
+                await self.flush()
+        return self.written
+
+    async def flush(self) -> int:
+        """Write whatever is buffered; returns the rows written so far."""
+        if self._buffer:
+            batch, self._buffer = self._buffer, []
+            self.written += await DatabaseManager.create_bank_transactions(self.db, self.user_id, batch)
+            self.batches += 1
+        return self.written
@@ -1,7 +1,9 @@
 # backend/src/main.py
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from api.routers import receipts, statements, budgets, analytics
+from api.routers import receipts, statements, budgets, analytics, rules
+from api.routers.receipts import ocr_service
+from api.routers.statements import statement_processor
 
 app = FastAPI(
     title="Finance Tracker API",
@@ -23,6 +25,12 @@ app.include_router(receipts, prefix="/api/receipts", tags=["receipts"])
 app.include_router(statements, prefix="/api/statements", tags=["statements"])
 app.include_router(budgets, prefix="/api/budgets", tags=["budgets"])
 app.include_router(analytics, prefix="/api/analytics", tags=["analytics"])
+app.include_router(rules, prefix="/api/rules", tags=["rules"])
+
+@app.on_event("shutdown")
+async def shutdown_workers():
+    ocr_service.pool.shutdown()
+    statement_processor.shutdown()
 
 @app.get("/")
 async def root():
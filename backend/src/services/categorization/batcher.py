@@ -0,0 +1,203 @@
+# backend/src/services/categorization/batcher.py
+import asyncio
+import os
+import threading
+from typing import Awaitable, Callable, Dict, Generic, List, Optional, Set, Tuple, TypeVar
+
+LLM_BATCH_WINDOW_MS = float(os.getenv("LLM_BATCH_WINDOW_MS", "20"))
+LLM_BATCH_MAX_TOKENS = int(os.getenv("LLM_BATCH_MAX_TOKENS", "4000"))
+LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", "16"))
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+class MicroBatcher(Generic[T, R]):
+    """Coalesce concurrent submissions into one call of ``send``.
+
+    Entries submitted within ``window`` seconds of the first pending one
+    are sent together; a batch is sent early once the summed ``cost`` of
+    its entries reaches ``max_cost``, and a submission costing more than
+    ``max_cost`` on its own is split into chunks that are sent
+    concurrently. ``send`` receives the flattened entries and must return
+    one result per entry, in order; each caller gets back the slice for
+    its own entries. A window of 0 still batches everything submitted in
+    the same event loop iteration.
+    """
+
+    def __init__(
+        self,
+        send: Callable[[List[T]], Awaitable[List[R]]],
+        window: float = LLM_BATCH_WINDOW_MS / 1000,
+        max_cost: int = LLM_BATCH_MAX_TOKENS,
+        cost: Callable[[T], int] = lambda entry: 1
+    ):
+        self.send = send
+        self.window = window
+        self.max_cost = max_cost
+        self.cost = cost
+        self._pending: List[Tuple[List[T], asyncio.Future]] = []
+        self._pending_cost = 0
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._in_flight: Set[asyncio.Task] = set()
+        self.submissions = 0
+        self.entries = 0
+        self.batches = 0
+
+    async def submit(self, entries: List[T]) -> List[R]:
+        """Queue entries for the next batch(es) and wait for their results."""
+        if not entries:
+            return []
+        self.submissions += 1
+        self.entries += len(entries)
+
+        chunks = self.split(entries)
+        if len(chunks) == 1:
+            return await self._enqueue(*chunks[0])
+        parts = await asyncio.gather(*(self._enqueue(chunk, cost) for chunk, cost in chunks))
+        return [result for part in parts for result in part]
+
+    def split(self, entries: List[T]) -> List[Tuple[List[T], int]]:
+        """Consecutive chunks of entries, each within max_cost where possible."""
+        chunks: List[Tuple[List[T], int]] = []
+        chunk: List[T] = []
+        chunk_cost = 0
+        for entry in entries:
+            cost = self.cost(entry)
+            if chunk and chunk_cost + cost > self.max_cost:
+                chunks.append((chunk, chunk_cost))
+                chunk, chunk_cost = [], 0
+            chunk.append(entry)
+            chunk_cost += cost
+        chunks.append((chunk, chunk_cost))
+        return chunks
+
+    async def _enqueue(self, entries: List[T], cost: int) -> List[R]:
+        # Keep batches within budget: send what is queued before overflowing it
+        if self._pending and self._pending_cost + cost > self.max_cost:
+            self._flush()
+
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((entries, future))
+        self._pending_cost += cost
+
+        if self._pending_cost >= self.max_cost:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.window, self._flush)
+        return await future
+
+    def _flush(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending, self._pending_cost = self._pending, [], 0
+        if batch:
+            task = asyncio.ensure_future(self._send_batch(batch))
+            self._in_flight.add(task)
+            task.add_done_callback(self._in_flight.discard)
+
+    async def _send_batch(self, batch: List[Tuple[List[T], asyncio.Future]]):
+        self.batches += 1
+        try:
+            results = await self.send([entry for entries, _ in batch for entry in entries])
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        offset = 0
+        for entries, future in batch:
+            # A caller may have given up (request cancelled) while we waited
+            if not future.done():
+                future.set_result(results[offset:offset + len(entries)])
+            offset += len(entries)
+
+    def stats(self) -> Dict[str, float]:
+        """Get submission/entry/batch counters."""
+        return {
+            "submissions": self.submissions,
+            "entries": self.entries,
+            "batches": self.batches,
+            "entries_per_batch": self.entries / self.batches if self.batches else 0.0,
+            "window_ms": self.window * 1000,
+            "max_tokens": self.max_cost
+        }
+
+class AdaptiveLimiter:
+    """Concurrency limit that adapts to the upstream service (AIMD).
+
+    The limit grows by one after ``limit`` consecutive successes and is
+    halved after a failure, between 1 and ``max_limit``. The counters are
+    guarded by a lock and waiters are woken on their own loop with
+    ``call_soon_threadsafe``, so one limiter can be shared by event loops
+    running in different threads.
+    """
+
+    def __init__(self, max_limit: int = LLM_MAX_CONCURRENCY, initial: Optional[int] = None):
+        self.max_limit = max_limit
+        self.limit = min(initial or max(max_limit // 2, 1), max_limit)
+        self.in_flight = 0
+        self._successes = 0
+        self._waiters: List[asyncio.Future] = []
+        self._lock = threading.Lock()
+        self.failures = 0
+        self.peak_in_flight = 0
+
+    async def acquire(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            with self._lock:
+                if self.in_flight < self.limit:
+                    self.in_flight += 1
+                    self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+                    return
+                waiter = loop.create_future()
+                self._waiters.append(waiter)
+            try:
+                await waiter
+            finally:
+                with self._lock:
+                    if waiter in self._waiters:
+                        self._waiters.remove(waiter)
+
+    def release(self, success: bool = True):
+        with self._lock:
+            self.in_flight -= 1
+            if success:
+                self._successes += 1
+                if self._successes >= self.limit:
+                    self.limit = min(self.limit + 1, self.max_limit)
+                    self._successes = 0
+            else:
+                self.failures += 1
+                self.limit = max(self.limit // 2, 1)
+                self._successes = 0
+            waiters, self._waiters = self._waiters, []
+
+        # Waiters re-check the limit, so waking extra ones is harmless
+        for waiter in waiters:
+            try:
+                waiter.get_loop().call_soon_threadsafe(self._wake, waiter)
+            except RuntimeError:
+                # The waiter's loop has been closed; nobody is left to wake
+                pass
+
+    @staticmethod
+    def _wake(waiter: asyncio.Future):
+        if not waiter.done():
+            waiter.set_result(None)
+
+    def stats(self) -> Dict[str, int]:
+        """Get the current limit and usage counters."""
+        return {
+            "limit": self.limit,
+            "max_limit": self.max_limit,
+            "in_flight": self.in_flight,
+            "peak_in_flight": self.peak_in_flight,
+            "failures": self.failures
+        }
+
+# Shared by every classifier in the process
+llm_limiter = AdaptiveLimiter()
@@ -0,0 +1,134 @@
+# backend/src/services/categorization/cache.py
+import hashlib
+import os
+import re
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional
+from sqlalchemy.orm import Session
+from rich.console import Console
+from ..cache import LRUCache
+from database.models import ClassificationCacheEntry
+
+console = Console()
+
+CLASSIFICATION_CACHE_SIZE = int(os.getenv("CLASSIFICATION_CACHE_SIZE", "20000"))
+
+_NON_ALPHANUMERIC = re.compile(r'[^A-Z0-9 ]+')
+
+@dataclass
+class CachedClassification:
+    category: str
+    confidence: float
+    reasoning: str
+
+def normalize_description(description: str) -> str:
+    """Uppercase, punctuation to spaces, single spaces: "Oreo  cookie!" -> "OREO COOKIE"."""
+    return ' '.join(_NON_ALPHANUMERIC.sub(' ', description.upper()).split())
+
+class ClassificationCache:
+    """Two-tier cache of LLM item classifications.
+
+    Keys combine the normalized item description, the store type and the
+    category taxonomy version, so the same SKU seen at the same kind of
+    store is classified once, and a taxonomy change starts a fresh cache.
+    Entries live in an in-memory LRU and in the ``classification_cache``
+    table shared by all workers.
+    """
+
+    def __init__(self, taxonomy_version: str, max_entries: int = CLASSIFICATION_CACHE_SIZE):
+        self.taxonomy_version = taxonomy_version
+        self.memory = LRUCache(max_entries)
+        self.db_hits = 0
+        self.misses = 0
+
+    def key(self, description: str, store_type: str) -> str:
+        """Cache key for an item description at a store type."""
+        raw = f"{self.taxonomy_version}\x1f{store_type}\x1f{normalize_description(description)}"
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def get_many(
+        self, keys: Iterable[str], db: Optional[Session] = None
+    ) -> Dict[str, CachedClassification]:
+        """Look up several keys at once, falling back to one database query for the rest."""
+        found: Dict[str, CachedClassification] = {}
+        missing: List[str] = []
+        for key in dict.fromkeys(keys):
+            cached = self.memory.get(key)
+            if cached is not None:
+                found[key] = cached
+            else:
+                missing.append(key)
+
+        db_found = 0
+        if missing and db is not None:
+            try:
+                entries = db.query(ClassificationCacheEntry).filter(
+                    ClassificationCacheEntry.key.in_(missing)
+                ).all()
+                if entries:
+                    db.query(ClassificationCacheEntry).filter(
+                        ClassificationCacheEntry.key.in_([entry.key for entry in entries])
+                    ).update({
+                        ClassificationCacheEntry.hit_count: ClassificationCacheEntry.hit_count + 1,
+                        ClassificationCacheEntry.last_hit_at: datetime.utcnow()
+                    }, synchronize_session=False)
+                    db.commit()
+
+                for entry in entries:
+                    cached = CachedClassification(entry.category, entry.confidence, entry.reasoning)
+                    self.memory.put(entry.key, cached)
+                    found[entry.key] = cached
+                db_found = len(entries)
+                self.db_hits += db_found
+            except Exception as e:
+                db.rollback()
+                console.print(f"[red]Classification cache lookup failed: {str(e)}")
+
+        self.misses += len(missing) - db_found
+        return found
+
+    def put_many(
+        self,
+        entries: Dict[str, CachedClassification],
+        store_type: str,
+        descriptions: Dict[str, str],
+        db: Optional[Session] = None
+    ):
+        """Store classifications in memory and, if given a session, in the database.
+
+        ``descriptions`` maps each key to its item description, which is
+        kept in the table for inspection.
+        """
+        for key, cached in entries.items():
+            self.memory.put(key, cached)
+
+        if db is not None and entries:
+            try:
+                for key, cached in entries.items():
+                    db.merge(ClassificationCacheEntry(
+                        key=key,
+                        description=normalize_description(descriptions[key]),
+                        store_type=store_type,
+                        taxonomy_version=self.taxonomy_version,
+                        category=cached.category,
+                        confidence=cached.confidence,
+                        reasoning=cached.reasoning
+                    ))
+                db.commit()
+            except Exception as e:
+                db.rollback()
+                console.print(f"[red]Classification cache write failed: {str(e)}")
+
+    def stats(self) -> Dict[str, Any]:
+        """Get hit/miss/eviction counters for both tiers."""
+        return {
+            "entries": len(self.memory),
+            "max_entries": self.memory.max_entries,
+            "taxonomy_version": self.taxonomy_version,
+            "hits": self.memory.hits + self.db_hits,
+            "memory_hits": self.memory.hits,
+            "db_hits": self.db_hits,
+            "misses": self.misses,
+            "evictions": self.memory.evictions
+        }
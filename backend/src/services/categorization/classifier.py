@@ -1,15 +1,24 @@
 # backend/src/services/categorization/classifier.py
-import getpass
-from typing import Dict, List, Optional
+import hashlib
+from typing import AsyncIterator, Dict, List, Optional, Tuple
 from enum import Enum
 from dataclasses import dataclass
-from langchain_openai import ChatOpenAI
 from langchain_core.prompts import ChatPromptTemplate
+from sqlalchemy.orm import Session
 import json
 import os
+import asyncio
+from rich.console import Console
+from database.models import CategoryType
+from .cache import ClassificationCache, CachedClassification
+from .local_model import LocalItemClassifier, load_local_model
+from .neighbors import NeighborIndex, load_neighbor_index
+from .merchants import MerchantDirectory, load_merchant_directory
+from .batcher import MicroBatcher, AdaptiveLimiter, llm_limiter
+from .streaming import ItemStreamParser, merge_streams
+from .llm import create_llm
 
-if not os.environ.get("OPENAI_API_KEY"):
-    os.environ["OPENAI_API_KEY"] = getpass.getpass("Enter your OpenAI API key: ")
+console = Console()
 
 class ExpenseCategory(str, Enum):
     GROCERIES = "groceries"
@@ -26,6 +35,22 @@ class ExpenseCategory(str, Enum):
     OFFICE = "office"
     MISCELLANEOUS = "miscellaneous"
 
+# Changes whenever a category is added, removed or renamed, so cached
+# classifications from an older taxonomy are never reused
+TAXONOMY_VERSION = hashlib.sha256(
+    ",".join(category.value for category in ExpenseCategory).encode("utf-8")
+).hexdigest()[:12]
+
+# Items a failed or partial LLM answer left out are retried this many times
+LLM_CHUNK_RETRIES = int(os.getenv("LLM_CHUNK_RETRIES", "2"))
+LLM_RETRY_BACKOFF_MS = float(os.getenv("LLM_RETRY_BACKOFF_MS", "250"))
+
+@dataclass
+class BatchItem:
+    context: str  # purchase the item belongs to, shared by items of one receipt
+    description: str
+    price: float
+
 @dataclass
 class ClassifiedItem:
     description: str
@@ -34,12 +59,54 @@ class ClassifiedItem:
     reasoning: str
     original_price: float
 
+# Receipt items are stored with the coarser database categories
+_CATEGORY_TYPE_OVERRIDES = {
+    ExpenseCategory.PERSONAL_CARE.value: CategoryType.HEALTH_BEAUTY,
+    ExpenseCategory.HEALTH.value: CategoryType.HEALTH_BEAUTY,
+    ExpenseCategory.PETS.value: CategoryType.MISCELLANEOUS,
+    ExpenseCategory.OFFICE.value: CategoryType.MISCELLANEOUS,
+}
+
+def to_category_type(category: Optional[str]) -> CategoryType:
+    """Database category for a classifier category (enum member or plain value)."""
+    value = getattr(category, "value", category)
+    if value in _CATEGORY_TYPE_OVERRIDES:
+        return _CATEGORY_TYPE_OVERRIDES[value]
+    try:
+        return CategoryType(value)
+    except ValueError:
+        return CategoryType.MISCELLANEOUS
+
 class ExpenseClassifier:
-    def __init__(self, api_key: str):
-        self.llm = ChatOpenAI(
-            model="gpt-4o-mini",  # Using GPT-4o-mini for better accuracy
-            temperature=0.1
-        ) 
+    def __init__(
+        self,
+        api_key: Optional[str] = None,
+        cache: Optional[ClassificationCache] = None,
+        local_model: Optional[LocalItemClassifier] = None,
+        limiter: Optional[AdaptiveLimiter] = None,
+        neighbors: Optional[NeighborIndex] = None,
+        merchants: Optional[MerchantDirectory] = None,
+        llm=None
+    ):
+        # Previously classified items, keyed on description + store type
+        self.cache = cache or ClassificationCache(TAXONOMY_VERSION)
+        # Trained offline (tools/train_item_classifier.py); None until a model exists
+        self.local_model = local_model or load_local_model(TAXONOMY_VERSION)
+        # Labels of near-identical descriptions (OCR variants), shared per process
+        self.neighbors = neighbors if neighbors is not None else load_neighbor_index(TAXONOMY_VERSION)
+        # Known merchants and their store types, built once per process
+        self.merchants = merchants if merchants is not None else load_merchant_directory()
+        # Items answered by each tier
+        self.served = {"rule": 0, "cache": 0, "neighbor": 0, "local": 0, "llm": 0, "fallback": 0}
+        # Items from concurrent receipts share one LLM request
+        # Large inputs are split into chunks of at most LLM_BATCH_MAX_TOKENS
+        self.batcher = MicroBatcher(self._classify_batch, cost=self._estimate_tokens)
+        # Caps concurrent LLM requests across the process, backing off on errors
+        self.limiter = limiter or llm_limiter
+        self.max_retries = LLM_CHUNK_RETRIES
+        self.retry_backoff = LLM_RETRY_BACKOFF_MS / 1000
+        # ChatOpenAI, or the offline fake with LLM_BACKEND=fake
+        self.llm = llm or create_llm(api_key)
         # Create detailed classification prompt
         self.prompt = ChatPromptTemplate.from_template(
             """You are an expert expense classifier with deep knowledge of retail items and spending patterns.
@@ -47,21 +114,17 @@ class ExpenseClassifier:
                 Available Categories:
                 {category_descriptions}
 
-                Store Context:
-                Store Name: {store_name}
-                Store Type: {store_type}
-                Total Purchase Amount: ${total_amount}
-
-                Items to Classify:
+                Items to Classify, grouped by purchase:
                 {items}
 
                 For each item, analyze:
                 1. The item description and price
-                2. The store context
+                2. The store context of its purchase
                 3. Common use cases and patterns
                 4. Similar items and their typical categories
 
                 Provide a detailed classification in JSON format where each item has:
+                - "id": The number in brackets before the item
                 - "description": The original item description
                 - "category": The most appropriate category (use provided category names exactly)
                 - "confidence": Confidence score (0.0-1.0)
@@ -69,17 +132,18 @@ class ExpenseClassifier:
                 - "alternative_category": Second most likely category if applicable
 
                 Example response format:
-                {
+                {{
                     "items": [
-                        {
+                        {{
+                            "id": 0,
                             "description": "Milk 2%",
                             "category": "groceries",
                             "confidence": 0.95,
                             "reasoning": "Dairy product primarily used for food consumption, typical grocery item",
                             "alternative_category": "none"
-                        }
+                        }}
                     ]
-                }
+                }}
 
                 Remember:
                 - Consider the store type and context
@@ -87,29 +151,14 @@ class ExpenseClassifier:
                 - Account for price points in classification
                 - Be specific in reasoning
                 - Maintain consistent category names
+                - Return every item exactly once with its id
                 """
         )
 
     def _get_store_type(self, store_name: str) -> str:
         """Determine store type based on store name."""
-        store_name_lower = store_name.lower()
-        
-        store_types = {
-            'grocery': ['walmart', 'kroger', 'safeway', 'trader', 'whole foods', 'aldi', 'food'],
-            'pharmacy': ['cvs', 'walgreens', 'rite aid', 'pharmacy'],
-            'department': ['target', 'macy', 'nordstrom', 'dillard'],
-            'electronics': ['best buy', 'apple', 'micro center'],
-            'office': ['office depot', 'staples', 'office max'],
-            'pet': ['petco', 'petsmart', 'pet'],
-            'home': ['home depot', 'lowe', 'ikea', 'bed bath'],
-            'clothing': ['gap', 'old navy', 'h&m', 'zara'],
-        }
-        
-        for store_type, patterns in store_types.items():
-            if any(pattern in store_name_lower for pattern in patterns):
-                return f"{store_type.title()} Store"
-        
-        return "General Retail Store"
+        match = self.merchants.match(store_name)
+        return match.store_label if match else "General Retail Store"
 
     def _get_category_descriptions(self) -> str:
         """Get detailed descriptions for each category."""
@@ -135,56 +184,385 @@ class ExpenseClassifier:
         self, 
         items: List[Dict], 
         store_name: str,
-        total_amount: float
+        total_amount: float,
+        db: Optional[Session] = None,
+        rules=None
     ) -> List[ClassifiedItem]:
-        """Classify items using LLM with enhanced context."""
-        try:
-            # Prepare store context
-            store_type = self._get_store_type(store_name)
-            
-            # Format items for prompt
-            items_text = "\n".join([
-                f"- {item['description']}: ${item['price']:.2f}"
-                for item in items
+        """Classify items through user rules, the cache, near neighbours, the local model, then the LLM.
+
+        ``rules`` is the user's ``CompiledRules``. Only items none of the
+        earlier tiers can answer are sent to the LLM.
+        """
+        ruled = self._apply_rules(items, rules)
+        if ruled:
+            rest = [item for index, item in enumerate(items) if index not in ruled]
+            classified = iter(await self.classify_items(rest, store_name, total_amount, db) if rest else [])
+            return [ruled[index] if index in ruled else next(classified) for index in range(len(items))]
+
+        store_type = self._get_store_type(store_name)
+        keys, known, inferred, pending = self._resolve_known(items, store_type, db)
+
+        llm_keys = set(pending)
+        if pending:
+            context = self._purchase_context(store_name, store_type, total_amount)
+            classified = await self.batcher.submit([
+                BatchItem(context, item['description'], item['price'])
+                for item in pending.values()
             ])
-            
-            # Get LLM response
-            response = await self.llm.ainvoke(
-                self.prompt.format(
-                    category_descriptions=self._get_category_descriptions(),
-                    store_name=store_name,
-                    store_type=store_type,
-                    total_amount=total_amount,
-                    items=items_text,
-                    
+            new_entries = {
+                key: self._to_cached(item)
+                for key, item in zip(pending, classified)
+                if item is not None
+            }
+            self._learn(new_entries, pending, store_type, db)
+            known.update(new_entries)
+
+        # Merge back in the original order; items the LLM failed on fall back
+        result = []
+        for key, item in zip(keys, items):
+            if key in known:
+                tier, entry = "llm" if key in llm_keys else "cache", known[key]
+            elif key in inferred:
+                tier, entry = inferred[key]
+            else:
+                self.served["fallback"] += 1
+                result.extend(self._generate_fallback_classifications([item]))
+                continue
+            self.served[tier] += 1
+            result.append(self._to_classified(item, entry))
+        return result
+
+    async def stream_classify_items(
+        self,
+        items: List[Dict],
+        store_name: str,
+        total_amount: float,
+        db: Optional[Session] = None,
+        rules=None
+    ) -> AsyncIterator[Tuple[int, ClassifiedItem]]:
+        """Yield ``(index, ClassifiedItem)`` pairs as soon as each item is classified.
+
+        Items answered without the LLM come first, then LLM answers as
+        the model streams them, one stream per token-bounded chunk. Items a
+        stream left out go through the regular retrying path; whatever still
+        has no answer falls back last. Pairs arrive in completion order, not
+        item order.
+        """
+        ruled = self._apply_rules(items, rules)
+        if ruled:
+            for index, classified in ruled.items():
+                yield index, classified
+            rest = [index for index in range(len(items)) if index not in ruled]
+            if rest:
+                async for index, classified in self.stream_classify_items(
+                    [items[index] for index in rest], store_name, total_amount, db
+                ):
+                    yield rest[index], classified
+            return
+
+        store_type = self._get_store_type(store_name)
+        keys, known, inferred, pending = self._resolve_known(items, store_type, db)
+        positions: Dict[str, List[int]] = {}
+        for index, key in enumerate(keys):
+            positions.setdefault(key, []).append(index)
+
+        for key, indexes in positions.items():
+            if key in known:
+                tier, entry = "cache", known[key]
+            elif key in inferred:
+                tier, entry = inferred[key]
+            else:
+                continue
+            for index in indexes:
+                self.served[tier] += 1
+                yield index, self._to_classified(items[index], entry)
+
+        if not pending:
+            return
+
+        pending_keys = list(pending)
+        context = self._purchase_context(store_name, store_type, total_amount)
+        entries = [BatchItem(context, item['description'], item['price']) for item in pending.values()]
+        answered: Dict[str, CachedClassification] = {}
+
+        streams = []
+        offset = 0
+        for chunk, _ in self.batcher.split(entries):
+            streams.append(self._stream_classification(chunk, offset))
+            offset += len(chunk)
+
+        async for index, classified in merge_streams(streams):
+            key = pending_keys[index]
+            if key in answered:
+                continue
+            answered[key] = self._to_cached(classified)
+            for position in positions[key]:
+                self.served["llm"] += 1
+                yield position, self._to_classified(items[position], answered[key])
+
+        missing = [key for key in pending_keys if key not in answered]
+        if missing:
+            retried = await self.batcher.submit([entries[pending_keys.index(key)] for key in missing])
+            for key, classified in zip(missing, retried):
+                if classified is None:
+                    continue
+                answered[key] = self._to_cached(classified)
+                for position in positions[key]:
+                    self.served["llm"] += 1
+                    yield position, self._to_classified(items[position], answered[key])
+
+        self._learn(answered, pending, store_type, db)
+
+        for key in pending_keys:
+            if key not in answered:
+                for position in positions[key]:
+                    self.served["fallback"] += 1
+                    yield position, self._generate_fallback_classifications([items[position]])[0]
+
+    def _apply_rules(self, items: List[Dict], rules) -> Dict[int, ClassifiedItem]:
+        """Items a user rule decides, by position; rules override every other tier."""
+        ruled: Dict[int, ClassifiedItem] = {}
+        if not rules:
+            return ruled
+        for index, item in enumerate(items):
+            rule = rules.match(item['description'], item['price'])
+            if rule is not None:
+                self.served["rule"] += 1
+                ruled[index] = ClassifiedItem(
+                    description=item['description'],
+                    category=ExpenseCategory(rule.category),
+                    confidence=1.0,
+                    reasoning=f"User rule {rule.id}: contains {rule.pattern!r}",
+                    original_price=item['price']
                 )
-                
+        return ruled
+
+    def _resolve_known(
+        self, items: List[Dict], store_type: str, db: Optional[Session]
+    ) -> Tuple[
+        List[str], Dict[str, CachedClassification],
+        Dict[str, Tuple[str, CachedClassification]], Dict[str, Dict]
+    ]:
+        """Split items by the tier that can answer them.
+
+        Returns the cache key per item, cached answers, ``(tier, answer)``
+        pairs from the neighbour index or local model, and the unique items
+        left for the LLM.
+        """
+        keys = [self.cache.key(item['description'], store_type) for item in items]
+        known = self.cache.get_many(keys, db)
+
+        # Each distinct uncached item is sent once, even if repeated on the receipt
+        pending: Dict[str, Dict] = {}
+        for key, item in zip(keys, items):
+            if key not in known and key not in pending:
+                pending[key] = item
+
+        # Neither tier writes to the cache: cached rows are LLM labels, used
+        # to train the next model and to seed the neighbour index
+        inferred: Dict[str, Tuple[str, CachedClassification]] = {}
+        if pending and self.neighbors is not None:
+            matches = self.neighbors.query([item['description'] for item in pending.values()])
+            for key, neighbor in zip(list(pending), matches):
+                if neighbor is not None:
+                    inferred[key] = ("neighbor", CachedClassification(
+                        category=neighbor.category,
+                        confidence=neighbor.confidence * neighbor.similarity,
+                        reasoning=f"Same as similar item {neighbor.description} "
+                                  f"(similarity {neighbor.similarity:.2f})"
+                    ))
+                    del pending[key]
+
+        if pending and self.local_model is not None:
+            predictions = self.local_model.predict(
+                [item['description'] for item in pending.values()], store_type
             )
-            console.print("Items classified")
+            for key, (category, confidence) in zip(list(pending), predictions):
+                if confidence >= self.local_model.threshold:
+                    inferred[key] = ("local", CachedClassification(
+                        category=category,
+                        confidence=confidence,
+                        reasoning=f"Local model {self.local_model.version}"
+                    ))
+                    del pending[key]
+
+        return keys, known, inferred, pending
+
+    def _learn(
+        self,
+        entries: Dict[str, CachedClassification],
+        items: Dict[str, Dict],
+        store_type: str,
+        db: Optional[Session]
+    ):
+        """Remember new LLM answers in the cache and the neighbour index."""
+        if not entries:
+            return
+        self.cache.put_many(
+            entries, store_type, {key: items[key]['description'] for key in entries}, db
+        )
+        if self.neighbors is not None:
+            self.neighbors.add(
+                [items[key]['description'] for key in entries],
+                [entry.category for entry in entries.values()],
+                [entry.confidence for entry in entries.values()]
+            )
+
+    @staticmethod
+    def _purchase_context(store_name: str, store_type: str, total_amount: float) -> str:
+        return f"Purchase at {store_name} ({store_type}), total ${total_amount:.2f}"
+
+    @staticmethod
+    def _to_cached(item: ClassifiedItem) -> CachedClassification:
+        return CachedClassification(
+            category=item.category.value,
+            confidence=item.confidence,
+            reasoning=item.reasoning
+        )
+
+    @staticmethod
+    def _to_classified(item: Dict, entry: CachedClassification) -> ClassifiedItem:
+        return ClassifiedItem(
+            description=item['description'],
+            category=ExpenseCategory(entry.category),
+            confidence=entry.confidence,
+            reasoning=entry.reasoning,
+            original_price=item['price']
+        )
+
+    def stats(self) -> Dict:
+        """Items served by each tier, as counts and fractions of all items."""
+        total = sum(self.served.values())
+        return {
+            "items": total,
+            **self.served,
+            "fractions": {
+                tier: count / total if total else 0.0
+                for tier, count in self.served.items()
+            },
+            "neighbor_index": self.neighbors.stats() if self.neighbors is not None else None,
+            "merchant_directory": self.merchants.stats(),
+            "local_model_version": self.local_model.version if self.local_model else None,
+            "local_model_threshold": self.local_model.threshold if self.local_model else None,
+            "llm_batches": self.batcher.stats(),
+            "llm_concurrency": self.limiter.stats()
+        }
+
+    @staticmethod
+    def _estimate_tokens(entry: BatchItem) -> int:
+        """Rough prompt plus response tokens for one item (~4 characters per token)."""
+        return 40 + len(entry.description) // 4
+
+    async def _classify_batch(self, entries: List[BatchItem]) -> List[Optional[ClassifiedItem]]:
+        """Classify one chunk, retrying only the items that came back without an answer.
+
+        Failed items come back as None once the retries are used up.
+        """
+        results: List[Optional[ClassifiedItem]] = [None] * len(entries)
+        remaining = list(range(len(entries)))
+        for attempt in range(self.max_retries + 1):
+            if attempt:
+                await asyncio.sleep(self.retry_backoff * 2 ** (attempt - 1))
+            answers = await self._request_classification([entries[i] for i in remaining])
+            for index, answer in zip(remaining, answers):
+                results[index] = answer
+            remaining = [index for index in remaining if results[index] is None]
+            if not remaining:
+                break
+        return results
+
+    async def _request_classification(self, entries: List[BatchItem]) -> List[Optional[ClassifiedItem]]:
+        """Classify items from any number of purchases with one LLM call.
+
+        Items are numbered by their position in ``entries`` and answers are
+        matched back by that id, so a reordered or partial response only
+        loses the missing items. Failed items come back as None.
+        """
+        results: List[Optional[ClassifiedItem]] = [None] * len(entries)
+        try:
+            prompt = self._format_prompt(entries)
+
+            # Get LLM response; errors (rate limits, timeouts) shrink the concurrency limit
+            await self.limiter.acquire()
+            success = False
+            try:
+                response = await self.llm.ainvoke(prompt)
+                success = True
+            finally:
+                self.limiter.release(success)
+            console.print(f"Classified {len(entries)} items")
             # Parse response
             try:
-                classified = json.loads(response)['items']
-                
-                # Convert to ClassifiedItem objects
-                result = []
-                for item_data, original_item in zip(classified, items):
-                    result.append(ClassifiedItem(
-                        description=original_item['description'],
-                        category=ExpenseCategory(item_data['category']),
-                        confidence=item_data['confidence'],
-                        reasoning=item_data['reasoning'],
-                        original_price=original_item['price']
-                    ))
-                console.print("result: ", result)
-                return result
-                
-            except (json.JSONDecodeError, KeyError) as e:
+                classified = json.loads(response.content)['items']
+            except (json.JSONDecodeError, KeyError, TypeError) as e:
                 print(f"Error parsing LLM response: {str(e)}")
-                return self._generate_fallback_classifications(items)
-                
+                return results
+
+            for item_data in classified:
+                answer = self._parse_answer(item_data, entries)
+                if answer is not None:
+                    results[answer[0]] = answer[1]
+            return results
+
         except Exception as e:
             print(f"Error in LLM classification: {str(e)}")
-            return self._generate_fallback_classifications(items)
+            return results
+
+    async def _stream_classification(
+        self, entries: List[BatchItem], offset: int = 0
+    ) -> AsyncIterator[Tuple[int, ClassifiedItem]]:
+        """Stream one LLM call, yielding ``(offset + id, item)`` as each answer object completes."""
+        parser = ItemStreamParser()
+        failed = False
+        await self.limiter.acquire()
+        try:
+            async for chunk in self.llm.astream(self._format_prompt(entries)):
+                for item_data in parser.feed(chunk.content):
+                    answer = self._parse_answer(item_data, entries)
+                    if answer is not None:
+                        yield offset + answer[0], answer[1]
+        except Exception as e:
+            failed = True
+            print(f"Error in streamed LLM classification: {str(e)}")
+        finally:
+            self.limiter.release(not failed)
+
+    def _format_prompt(self, entries: List[BatchItem]) -> str:
+        """Prompt listing entries with their ids, one block per purchase."""
+        groups: Dict[str, List[int]] = {}
+        for index, entry in enumerate(entries):
+            groups.setdefault(entry.context, []).append(index)
+        items_text = "\n\n".join(
+            context + ":\n" + "\n".join(
+                f"- [{index}] {entries[index].description}: ${entries[index].price:.2f}"
+                for index in indexes
+            )
+            for context, indexes in groups.items()
+        )
+        return self.prompt.format(
+            category_descriptions=self._get_category_descriptions(),
+            items=items_text
+        )
+
+    @staticmethod
+    def _parse_answer(
+        item_data: Dict, entries: List[BatchItem]
+    ) -> Optional[Tuple[int, ClassifiedItem]]:
+        """Entry index and classification from one answer object; None if unusable."""
+        try:
+            index = int(item_data['id'])
+            if not 0 <= index < len(entries):
+                return None
+            return index, ClassifiedItem(
+                description=entries[index].description,
+                category=ExpenseCategory(item_data['category']),
+                confidence=item_data['confidence'],
+                reasoning=item_data['reasoning'],
+                original_price=entries[index].price
+            )
+        except (KeyError, ValueError, TypeError) as e:
+            print(f"Error parsing LLM item: {str(e)}")
+            return None
 
     def _generate_fallback_classifications(self, items: List[Dict]) -> List[ClassifiedItem]:
         """Generate fallback classification when LLM fails."""
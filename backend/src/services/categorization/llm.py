@@ -0,0 +1,169 @@
+# backend/src/services/categorization/llm.py
+"""LLM backends for the classifier: OpenAI, or a deterministic offline fake."""
+import asyncio
+import json
+import os
+import random
+import re
+import zlib
+from dataclasses import dataclass
+from typing import AsyncIterator, Dict, List, Optional
+from langchain_core.messages import AIMessage, AIMessageChunk
+from langchain_openai import ChatOpenAI
+
+LLM_BACKEND = os.getenv("LLM_BACKEND", "openai")  # "openai" or "fake"
+LLM_MODEL = os.getenv("LLM_MODEL", "gpt-4o-mini")
+
+_CATEGORY_LINE = re.compile(r'^\s*- ([a-z_]+): ', re.MULTILINE)
+_ITEM_LINE = re.compile(r'^\s*- \[(\d+)\] (.*): \$', re.MULTILINE)
+
+# Words the fake answers consistently, when the prompt offers the category
+_KEYWORDS = {
+    "groceries": ["MILK", "BREAD", "EGGS", "BANANA", "CHEESE", "YOGURT", "CEREAL", "RICE", "APPLE"],
+    "household": ["TOWEL", "TISSUE", "DETERGENT", "BLEACH", "SPONGE", "TRASH", "FOIL"],
+    "personal_care": ["SHAMPOO", "SOAP", "TOOTHPASTE", "DEODORANT", "LOTION", "RAZOR"],
+    "health": ["VITAMIN", "ASPIRIN", "IBUPROFEN", "BANDAGE", "ALLERGY"],
+    "electronics": ["CABLE", "CHARGER", "BATTERY", "HDMI", "USB", "HEADPHONE"],
+    "pets": ["DOG FOOD", "CAT FOOD", "LITTER", "KIBBLE"],
+    "dining": ["SANDWICH", "PIZZA", "COFFEE", "BURRITO"],
+    "office": ["PRINTER PAPER", "PENCIL", "STAPLER", "ENVELOPE"],
+}
+
+class FakeLLMError(RuntimeError):
+    """Simulated upstream failure (rate limit, timeout)."""
+
+@dataclass
+class FakeLLMConfig:
+    latency_ms: float = 0.0  # median time to the first token
+    latency_sigma: float = 0.0  # spread of the lognormal latency; 0 is a fixed latency
+    per_item_ms: float = 0.0  # generation time for each answered item
+    error_rate: float = 0.0  # fraction of calls that fail
+    drop_rate: float = 0.0  # fraction of items left out of an answer
+    stream_chunk_chars: int = 16
+    seed: int = 0
+
+    @classmethod
+    def from_env(cls) -> "FakeLLMConfig":
+        return cls(
+            latency_ms=float(os.getenv("FAKE_LLM_LATENCY_MS", "0")),
+            latency_sigma=float(os.getenv("FAKE_LLM_LATENCY_SIGMA", "0")),
+            per_item_ms=float(os.getenv("FAKE_LLM_PER_ITEM_MS", "0")),
+            error_rate=float(os.getenv("FAKE_LLM_ERROR_RATE", "0")),
+            drop_rate=float(os.getenv("FAKE_LLM_DROP_RATE", "0")),
+            stream_chunk_chars=int(os.getenv("FAKE_LLM_STREAM_CHUNK_CHARS", "16")),
+            seed=int(os.getenv("FAKE_LLM_SEED", "0"))
+        )
+
+class FakeLLM:
+    """Offline stand-in for ChatOpenAI with the same ``ainvoke``/``astream`` interface.
+
+    Reads the categories and ``[id]`` item lines out of the classification
+    prompt and answers every item with schema-valid JSON. An item's category
+    depends only on its description, so repeated runs agree. Latency,
+    failures, dropped items and streaming granularity come from
+    ``FakeLLMConfig``, and one seeded generator drives all of them, so a
+    load test with the same seed and call order behaves the same each run.
+    """
+
+    def __init__(self, config: Optional[FakeLLMConfig] = None):
+        self.config = config or FakeLLMConfig()
+        self._random = random.Random(self.config.seed)
+        self.calls = 0
+        self.errors = 0
+        self.items_answered = 0
+        self.items_dropped = 0
+
+    def answer(self, prompt: str) -> List[Dict]:
+        """Answer objects for the items in ``prompt``, minus any dropped ones."""
+        categories = _CATEGORY_LINE.findall(prompt) or ["miscellaneous"]
+        answers = []
+        for item_id, description in _ITEM_LINE.findall(prompt):
+            if self.config.drop_rate and self._random.random() < self.config.drop_rate:
+                self.items_dropped += 1
+                continue
+            answers.append(self._classify(int(item_id), description, categories))
+        self.items_answered += len(answers)
+        return answers
+
+    @staticmethod
+    def _classify(item_id: int, description: str, categories: List[str]) -> Dict:
+        digest = zlib.crc32(description.encode("utf-8"))
+        words = description.upper()
+        category = next((
+            name for name, keywords in _KEYWORDS.items()
+            if name in categories and any(keyword in words for keyword in keywords)
+        ), categories[digest % len(categories)])
+        return {
+            "id": item_id,
+            "description": description,
+            "category": category,
+            "confidence": 0.6 + (digest % 36) / 100,
+            "reasoning": "Offline fake classification",
+            "alternative_category": "none"
+        }
+
+    def _latency(self) -> float:
+        """Seconds before the first token."""
+        median = self.config.latency_ms / 1000
+        if median <= 0:
+            return 0.0
+        if self.config.latency_sigma <= 0:
+            return median
+        return self._random.lognormvariate(0.0, self.config.latency_sigma) * median
+
+    def _fails(self) -> bool:
+        return bool(self.config.error_rate) and self._random.random() < self.config.error_rate
+
+    async def ainvoke(self, prompt) -> AIMessage:
+        self.calls += 1
+        failing = self._fails()
+        await asyncio.sleep(self._latency())
+        if failing:
+            self.errors += 1
+            raise FakeLLMError("Simulated LLM failure")
+        answers = self.answer(str(prompt))
+        await asyncio.sleep(self.config.per_item_ms * len(answers) / 1000)
+        return AIMessage(content=json.dumps({"items": answers}))
+
+    async def astream(self, prompt) -> AsyncIterator[AIMessageChunk]:
+        """Stream the answer in ``stream_chunk_chars`` pieces; a failing call breaks off halfway."""
+        self.calls += 1
+        failing = self._fails()
+        await asyncio.sleep(self._latency())
+        answers = self.answer(str(prompt))
+        content = json.dumps({"items": answers})
+        size = max(self.config.stream_chunk_chars, 1)
+        chunks = [content[start:start + size] for start in range(0, len(content), size)]
+        delay = self.config.per_item_ms * len(answers) / 1000 / len(chunks)
+        for position, chunk in enumerate(chunks):
+            if failing and position == len(chunks) // 2:
+                self.errors += 1
+                raise FakeLLMError("Simulated LLM failure mid-stream")
+            if delay:
+                await asyncio.sleep(delay)
+            yield AIMessageChunk(content=chunk)
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "calls": self.calls,
+            "errors": self.errors,
+            "items_answered": self.items_answered,
+            "items_dropped": self.items_dropped
+        }
+
+def create_llm(api_key: Optional[str] = None, backend: Optional[str] = None):
+    """The chat model named by ``backend`` (default ``LLM_BACKEND``)."""
+    backend = backend or LLM_BACKEND
+    if backend == "fake":
+        return FakeLLM(FakeLLMConfig.from_env())
+    if backend != "openai":
+        raise ValueError(f"Unknown LLM backend: {backend}")
+
+    api_key = api_key or os.getenv("OPENAI_API_KEY")
+    if not api_key:
+        raise ValueError("OPENAI_API_KEY is not set; set it or use LLM_BACKEND=fake")
+    return ChatOpenAI(
+        model=LLM_MODEL,  # GPT-4o-mini by default for better accuracy
+        temperature=0.1,
+        api_key=api_key
+    )
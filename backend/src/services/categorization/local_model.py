@@ -0,0 +1,195 @@
+# backend/src/services/categorization/local_model.py
+"""Local item classifier: character n-grams + logistic regression, no network."""
+import os
+import random
+from dataclasses import dataclass
+from datetime import datetime
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+import joblib
+import numpy as np
+from sklearn.feature_extraction.text import HashingVectorizer
+from sklearn.linear_model import LogisticRegression
+from sklearn.pipeline import Pipeline
+from rich.console import Console
+from .cache import normalize_description
+
+console = Console()
+
+LOCAL_MODEL_DIR = Path(os.getenv("LOCAL_MODEL_DIR", str(Path(__file__).parent / "models")))
+LOCAL_MODEL_VERSION = os.getenv("LOCAL_MODEL_VERSION")  # pin an artifact; default is the newest
+LOCAL_MODEL_THRESHOLD = float(os.getenv("LOCAL_MODEL_THRESHOLD", "0.9"))
+
+ARTIFACT_PREFIX = "item-classifier-"
+ARTIFACT_SUFFIX = ".joblib"
+
+@dataclass
+class TrainingSample:
+    description: str
+    store_type: str
+    category: str
+
+def model_input(description: str, store_type: str) -> str:
+    """Single string the pipeline sees: store type and normalized description."""
+    return f"{store_type}\x1f{normalize_description(description)}"
+
+def extract_features(text: str) -> List[str]:
+    """Store type, whole words and 3-5 character n-grams of each word.
+
+    Module-level so pickled pipelines can find it again on load.
+    """
+    store_type, description = text.split("\x1f", 1)
+    features = [f"s:{store_type}"]
+    for word in description.split():
+        features.append(f"w:{word}")
+        padded = f" {word} "
+        for n in (3, 4, 5):
+            features.extend(padded[i:i + n] for i in range(len(padded) - n + 1))
+    return features
+
+def build_pipeline() -> Pipeline:
+    return Pipeline([
+        ("features", HashingVectorizer(
+            analyzer=extract_features, n_features=2 ** 18, alternate_sign=False, norm="l2"
+        )),
+        ("model", LogisticRegression(C=10.0, max_iter=1000))
+    ])
+
+class LocalItemClassifier:
+    """Trained item classifier used as the first tier before the LLM.
+
+    ``predict`` returns a category and probability per item; callers keep
+    predictions at or above ``threshold`` and send the rest to the LLM.
+    Artifacts are versioned by training time and tied to the category
+    taxonomy they were trained on.
+    """
+
+    def __init__(
+        self,
+        pipeline: Pipeline,
+        version: str,
+        taxonomy_version: str,
+        threshold: float = LOCAL_MODEL_THRESHOLD,
+        metrics: Optional[Dict[str, float]] = None
+    ):
+        self.pipeline = pipeline
+        self.version = version
+        self.taxonomy_version = taxonomy_version
+        self.threshold = threshold
+        self.metrics = metrics or {}
+
+    def predict(self, descriptions: Sequence[str], store_type: str) -> List[Tuple[str, float]]:
+        """Most likely category and its probability for each description."""
+        if not descriptions:
+            return []
+        probabilities = self.pipeline.predict_proba(
+            [model_input(description, store_type) for description in descriptions]
+        )
+        best = probabilities.argmax(axis=1)
+        classes = self.pipeline.classes_
+        return [
+            (str(classes[index]), float(probabilities[row, index]))
+            for row, index in enumerate(best)
+        ]
+
+    @classmethod
+    def train(
+        cls,
+        samples: Sequence[TrainingSample],
+        taxonomy_version: str,
+        threshold: float = LOCAL_MODEL_THRESHOLD,
+        holdout: float = 0.2,
+        seed: int = 0
+    ) -> "LocalItemClassifier":
+        """Fit on samples, measuring coverage and accuracy at threshold on a held-out split.
+
+        The reported metrics come from a model fit without the held-out
+        samples; the returned model is then refit on everything.
+        """
+        if len({sample.category for sample in samples}) < 2:
+            raise ValueError("Training needs samples from at least two categories")
+
+        inputs = [model_input(sample.description, sample.store_type) for sample in samples]
+        labels = [sample.category for sample in samples]
+
+        order = list(range(len(samples)))
+        random.Random(seed).shuffle(order)
+        split = int(len(order) * (1 - holdout))
+        train_rows, test_rows = order[:split], order[split:]
+
+        metrics = {"samples": len(samples)}
+        train_labels = [labels[i] for i in train_rows]
+        if test_rows and len(set(train_labels)) >= 2:
+            pipeline = build_pipeline().fit([inputs[i] for i in train_rows], train_labels)
+            probabilities = pipeline.predict_proba([inputs[i] for i in test_rows])
+            predicted = pipeline.classes_[probabilities.argmax(axis=1)]
+            expected = np.array([labels[i] for i in test_rows])
+            confident = probabilities.max(axis=1) >= threshold
+
+            metrics["holdout_samples"] = len(test_rows)
+            metrics["holdout_accuracy"] = float((predicted == expected).mean())
+            metrics["holdout_coverage"] = float(confident.mean())
+            metrics["holdout_confident_accuracy"] = (
+                float((predicted[confident] == expected[confident]).mean())
+                if confident.any() else 0.0
+            )
+
+        pipeline = build_pipeline().fit(inputs, labels)
+        version = datetime.utcnow().strftime("%Y%m%dT%H%M%S")
+        return cls(pipeline, version, taxonomy_version, threshold, metrics)
+
+    def save(self, directory: Path = LOCAL_MODEL_DIR) -> Path:
+        """Write the model as ``item-classifier-<version>.joblib`` in directory."""
+        directory = Path(directory)
+        directory.mkdir(parents=True, exist_ok=True)
+        path = directory / f"{ARTIFACT_PREFIX}{self.version}{ARTIFACT_SUFFIX}"
+        joblib.dump({
+            "pipeline": self.pipeline,
+            "version": self.version,
+            "taxonomy_version": self.taxonomy_version,
+            "threshold": self.threshold,
+            "metrics": self.metrics
+        }, path)
+        return path
+
+    @classmethod
+    def load(cls, path: Path, threshold: Optional[float] = None) -> "LocalItemClassifier":
+        artifact = joblib.load(path)
+        return cls(
+            artifact["pipeline"],
+            artifact["version"],
+            artifact["taxonomy_version"],
+            threshold if threshold is not None else artifact["threshold"],
+            artifact["metrics"]
+        )
+
+def find_artifact(directory: Path = LOCAL_MODEL_DIR, version: Optional[str] = None) -> Optional[Path]:
+    """Path of the pinned version, or of the newest artifact in directory."""
+    directory = Path(directory)
+    if version:
+        path = directory / f"{ARTIFACT_PREFIX}{version}{ARTIFACT_SUFFIX}"
+        return path if path.exists() else None
+    # Versions are timestamps, so name order is training order
+    artifacts = sorted(directory.glob(f"{ARTIFACT_PREFIX}*{ARTIFACT_SUFFIX}"))
+    return artifacts[-1] if artifacts else None
+
+@lru_cache(maxsize=None)
+def load_local_model(taxonomy_version: str) -> Optional[LocalItemClassifier]:
+    """Load the configured artifact once per process; None when there is no usable model."""
+    path = find_artifact(LOCAL_MODEL_DIR, LOCAL_MODEL_VERSION)
+    if path is None:
+        return None
+    try:
+        model = LocalItemClassifier.load(path, LOCAL_MODEL_THRESHOLD)
+    except Exception as e:
+        console.print(f"[red]Failed to load local classifier {path}: {str(e)}")
+        return None
+    if model.taxonomy_version != taxonomy_version:
+        console.print(
+            f"[yellow]Ignoring local classifier {model.version}: trained on taxonomy "
+            f"{model.taxonomy_version}, current is {taxonomy_version}"
+        )
+        return None
+    console.print(f"Loaded local classifier {model.version}", style="green")
+    return model
@@ -0,0 +1,226 @@
+# backend/src/services/categorization/merchants.py
+"""Merchant directory: canonical merchant, store type and default category for a name."""
+import csv
+import os
+import re
+from dataclasses import dataclass
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+from rich.console import Console
+
+console = Console()
+
+MERCHANT_DIRECTORY_PATH = Path(os.getenv(
+    "MERCHANT_DIRECTORY_PATH", str(Path(__file__).parent / "data" / "merchants.csv")
+))
+
+_WORDS = re.compile(r'[A-Z0-9]+')
+
+def merchant_tokens(text: str) -> List[str]:
+    """Uppercase words of a store name or statement description ("Trader Joe's #52" -> TRADER JOES 52)."""
+    return _WORDS.findall(text.upper().replace("'", "").replace("’", ""))
+
+@dataclass
+class Merchant:
+    name: str
+    store_type: str  # e.g. "grocery"; shown to the classifier as "Grocery Store"
+    category: Optional[str] = None  # ExpenseCategory value most purchases fall under
+    aliases: Tuple[str, ...] = ()
+
+@dataclass
+class MerchantMatch:
+    merchant: Optional[str]  # None when only a store-type keyword matched
+    store_type: str
+    category: Optional[str]
+    alias: str  # the directory entry that matched
+
+    @property
+    def store_label(self) -> str:
+        return f"{self.store_type.title()} Store"
+
+# Built-in merchants; a directory file adds to and overrides these
+DEFAULT_MERCHANTS = [
+    Merchant("Walmart", "grocery", "groceries", ("Walmart Supercenter", "Wal-Mart", "Walmart.com")),
+    Merchant("Kroger", "grocery", "groceries"),
+    Merchant("Safeway", "grocery", "groceries"),
+    Merchant("Trader Joe's", "grocery", "groceries", ("Trader",)),
+    Merchant("Whole Foods", "grocery", "groceries", ("Whole Foods Market", "WholeFds")),
+    Merchant("Aldi", "grocery", "groceries"),
+    Merchant("CVS", "pharmacy", "health", ("CVS Pharmacy",)),
+    Merchant("Walgreens", "pharmacy", "health"),
+    Merchant("Rite Aid", "pharmacy", "health"),
+    Merchant("Target", "department", None),
+    Merchant("Macy's", "department", "clothing", ("Macy",)),
+    Merchant("Nordstrom", "department", "clothing"),
+    Merchant("Dillard's", "department", "clothing", ("Dillard",)),
+    Merchant("Best Buy", "electronics", "electronics"),
+    Merchant("Apple", "electronics", "electronics", ("Apple Store",)),
+    Merchant("Micro Center", "electronics", "electronics"),
+    Merchant("Office Depot", "office", "office"),
+    Merchant("Staples", "office", "office"),
+    Merchant("OfficeMax", "office", "office", ("Office Max",)),
+    Merchant("Petco", "pet", "pets"),
+    Merchant("PetSmart", "pet", "pets"),
+    Merchant("Home Depot", "home", "household", ("The Home Depot",)),
+    Merchant("Lowe's", "home", "household", ("Lowe",)),
+    Merchant("IKEA", "home", "household"),
+    Merchant("Bed Bath & Beyond", "home", "household", ("Bed Bath",)),
+    Merchant("Gap", "clothing", "clothing"),
+    Merchant("Old Navy", "clothing", "clothing"),
+    Merchant("H&M", "clothing", "clothing"),
+    Merchant("Zara", "clothing", "clothing"),
+]
+
+# Generic words that reveal the store type but not the merchant
+DEFAULT_KEYWORDS = {
+    "grocery": ["food", "foods", "grocery", "supermarket"],
+    "pharmacy": ["pharmacy"],
+    "pet": ["pet"],
+}
+
+_DEFAULT_CATEGORIES = {
+    "grocery": "groceries",
+    "pharmacy": "health",
+    "electronics": "electronics",
+    "office": "office",
+    "pet": "pets",
+    "home": "household",
+    "clothing": "clothing",
+}
+
+class MerchantDirectory:
+    """Match store names and statement descriptions against known merchants in one pass.
+
+    Every name and alias becomes a word sequence in an Aho-Corasick
+    automaton whose symbols are whole words, so a scan costs one dict
+    lookup per word of the text no matter how many merchants are loaded,
+    and "GAP" matches "GAP #123" but not "SINGAPORE". The best match is the
+    one covering the most words; merchants beat store-type keywords, and
+    ties go to the earliest occurrence.
+    """
+
+    def __init__(
+        self,
+        merchants: Iterable[Merchant] = DEFAULT_MERCHANTS,
+        keywords: Optional[Dict[str, Sequence[str]]] = None
+    ):
+        self.merchants: Dict[str, Merchant] = {}
+        for merchant in merchants:
+            self.merchants[merchant.name] = merchant
+        self.keywords = DEFAULT_KEYWORDS if keywords is None else keywords
+
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._output: List[int] = [-1]  # best pattern ending at each node, -1 for none
+        self._patterns: List[MerchantMatch] = []
+        self._ranks: List[int] = []
+        self._build()
+
+    def __len__(self) -> int:
+        return len(self.merchants)
+
+    def _add_pattern(self, tokens: List[str], match: MerchantMatch, rank: int):
+        if not tokens:
+            return
+        node = 0
+        for token in tokens:
+            following = self._goto[node].get(token)
+            if following is None:
+                following = len(self._goto)
+                self._goto[node][token] = following
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append(-1)
+            node = following
+
+        current = self._output[node]
+        if current < 0 or rank > self._ranks[current]:
+            self._output[node] = len(self._patterns)
+            self._patterns.append(match)
+            self._ranks.append(rank)
+
+    def _build(self):
+        for store_type, words in self.keywords.items():
+            for word in words:
+                tokens = merchant_tokens(word)
+                self._add_pattern(
+                    tokens,
+                    MerchantMatch(None, store_type, _DEFAULT_CATEGORIES.get(store_type), word),
+                    rank=2 * len(tokens)
+                )
+        for merchant in self.merchants.values():
+            for alias in (merchant.name, *merchant.aliases):
+                tokens = merchant_tokens(alias)
+                self._add_pattern(
+                    tokens,
+                    MerchantMatch(merchant.name, merchant.store_type, merchant.category, alias),
+                    rank=2 * len(tokens) + 1
+                )
+
+        # Breadth-first failure links; a node without its own pattern
+        # inherits the best pattern of its longest proper suffix
+        queue = list(self._goto[0].values())
+        for node in queue:
+            for token, child in self._goto[node].items():
+                fallback = self._fail[node]
+                while fallback and token not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[child] = self._goto[fallback].get(token, 0)
+                if self._output[child] < 0:
+                    self._output[child] = self._output[self._fail[child]]
+                queue.append(child)
+
+    def match(self, text: str) -> Optional[MerchantMatch]:
+        """Best directory entry found in ``text``, or None."""
+        goto, fail, output, ranks = self._goto, self._fail, self._output, self._ranks
+        node, best, best_rank = 0, -1, -1
+        for token in merchant_tokens(text):
+            following = goto[node].get(token)
+            while following is None and node:
+                node = fail[node]
+                following = goto[node].get(token)
+            node = following or 0
+            found = output[node]
+            if found >= 0 and ranks[found] > best_rank:
+                best, best_rank = found, ranks[found]
+        return self._patterns[best] if best >= 0 else None
+
+    def match_many(self, texts: Iterable[str]) -> List[Optional[MerchantMatch]]:
+        return [self.match(text) for text in texts]
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "merchants": len(self.merchants),
+            "patterns": len(self._patterns),
+            "nodes": len(self._goto)
+        }
+
+def read_merchant_file(path: Path) -> List[Merchant]:
+    """Merchants from a CSV with name, aliases ("|"-separated), store_type and category columns."""
+    with open(path, newline="", encoding="utf-8") as handle:
+        return [
+            Merchant(
+                name=row["name"].strip(),
+                store_type=row["store_type"].strip().lower(),
+                category=(row.get("category") or "").strip() or None,
+                aliases=tuple(
+                    alias.strip() for alias in (row.get("aliases") or "").split("|") if alias.strip()
+                )
+            )
+            for row in csv.DictReader(handle)
+            if row.get("name", "").strip() and row.get("store_type", "").strip()
+        ]
+
+@lru_cache(maxsize=None)
+def load_merchant_directory() -> MerchantDirectory:
+    """The process-wide directory: built-in merchants plus the directory file, if any."""
+    merchants = list(DEFAULT_MERCHANTS)
+    if MERCHANT_DIRECTORY_PATH.exists():
+        try:
+            extra = read_merchant_file(MERCHANT_DIRECTORY_PATH)
+            merchants.extend(extra)
+            console.print(f"Loaded {len(extra)} merchants from {MERCHANT_DIRECTORY_PATH}", style="green")
+        except Exception as e:
+            console.print(f"[red]Failed to load merchant directory {MERCHANT_DIRECTORY_PATH}: {str(e)}")
+    return MerchantDirectory(merchants)
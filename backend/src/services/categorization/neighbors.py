@@ -0,0 +1,273 @@
+# backend/src/services/categorization/neighbors.py
+"""Approximate nearest-neighbour label reuse for OCR variants of known items."""
+import os
+import re
+from dataclasses import dataclass
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence
+import numpy as np
+from rich.console import Console
+
+console = Console()
+
+NEIGHBOR_INDEX_PATH = Path(os.getenv(
+    "NEIGHBOR_INDEX_PATH", str(Path(__file__).parent / "models" / "neighbors.npz")
+))
+NEIGHBOR_MIN_SIMILARITY = float(os.getenv("NEIGHBOR_MIN_SIMILARITY", "0.6"))
+
+# 12 bands of 3 MinHash rows: descriptions with trigram Jaccard similarity
+# 0.6 meet as candidates ~95% of the time, 0.3 only ~28% of the time
+BANDS = 12
+ROWS_PER_BAND = 3
+NUM_HASHES = BANDS * ROWS_PER_BAND
+
+_SEPARATOR = 10  # newline never survives fold_descriptions
+_KEY_MULTIPLIERS = (np.uint64(0x9E3779B97F4A7C15), np.uint64(0xC2B2AE3D27D4EB4F))
+
+_NON_ALPHANUMERIC = re.compile(r'[^A-Z0-9\n]+')
+_LINE_EDGES = re.compile(r' *\n *')
+# Digits OCR commonly reads in place of a neighbouring letter
+_OCR_DIGIT = re.compile(r'(?<=[A-Z])[015]|[015](?=[A-Z])')
+_OCR_LETTERS = {"0": "O", "1": "I", "5": "S"}
+
+def fold_descriptions(descriptions: Sequence[str]) -> List[str]:
+    """Normalize a batch of descriptions in one pass and fold OCR digit-for-letter confusions.
+
+    Matches ``normalize_description`` (uppercase, punctuation to single
+    spaces), then reads 0/1/5 next to a letter as O/I/S: "Lean Cuis1n" ->
+    "LEAN CUISIN".
+    """
+    text = "\n".join(description.replace("\n", " ") for description in descriptions).upper()
+    text = _LINE_EDGES.sub("\n", _NON_ALPHANUMERIC.sub(" ", text)).strip(" ")
+    text = _OCR_DIGIT.sub(lambda match: _OCR_LETTERS[match.group()], text)
+    return text.split("\n")
+
+def fold_description(description: str) -> str:
+    return fold_descriptions([description])[0]
+
+@dataclass
+class Neighbor:
+    description: str
+    category: str
+    confidence: float
+    similarity: float  # estimated trigram Jaccard similarity, 0-1
+
+class NeighborIndex:
+    """MinHash LSH index over character trigrams of classified descriptions.
+
+    Each description gets a signature of ``NUM_HASHES`` trigram MinHashes,
+    computed for a whole batch at once in NumPy. Signatures are split into
+    bands, and each band is a key in a bucket dict. A query's candidates
+    are the descriptions sharing at least one bucket. The best candidate is
+    the one agreeing on the most MinHashes, and it is returned when that
+    estimated similarity reaches ``min_similarity``. Labels can be added at
+    any time; ``save``/``load`` snapshot the signatures so workers do not
+    rebuild them.
+    """
+
+    def __init__(
+        self,
+        taxonomy_version: str,
+        min_similarity: float = NEIGHBOR_MIN_SIMILARITY,
+        seed: int = 0
+    ):
+        self.taxonomy_version = taxonomy_version
+        self.min_similarity = min_similarity
+        self.seed = seed
+        rng = np.random.default_rng(seed)
+        self._multipliers = (rng.integers(1, 2 ** 32, NUM_HASHES, dtype=np.uint64) | 1).astype(np.uint32)
+        self._offsets = rng.integers(0, 2 ** 32, NUM_HASHES, dtype=np.uint64).astype(np.uint32)
+        self._salts = rng.integers(0, 2 ** 63, BANDS, dtype=np.uint64)
+
+        self._signatures = np.empty((0, NUM_HASHES), np.uint32)
+        self._confidences = np.empty(0, np.float32)
+        self.descriptions: List[str] = []
+        self.categories: List[str] = []
+        self._rows: Dict[str, int] = {}
+        self._buckets: Dict[int, List[int]] = {}
+
+    def __len__(self) -> int:
+        return len(self.descriptions)
+
+    def signatures(self, folded: Sequence[str]) -> np.ndarray:
+        """MinHash signatures (one row each) of non-empty folded descriptions."""
+        text = "\n".join(f" {description} " for description in folded).encode("ascii")
+        chars = np.frombuffer(text, np.uint8)
+        separator = chars == _SEPARATOR
+        owner = np.cumsum(separator)[:-2]
+        trigrams = (
+            (chars[:-2].astype(np.uint32) << 16) |
+            (chars[1:-1].astype(np.uint32) << 8) |
+            chars[2:]
+        )
+        valid = ~(separator[:-2] | separator[1:-1] | separator[2:])
+        trigrams, owner = trigrams[valid], owner[valid]
+
+        # Multiply-xorshift hashes, one column per hash function
+        hashes = trigrams[:, None] * self._multipliers + self._offsets
+        hashes ^= hashes >> 15
+        hashes *= np.uint32(0x2C1B3C6D)
+        hashes ^= hashes >> 12
+
+        starts = np.flatnonzero(np.r_[True, owner[1:] != owner[:-1]])
+        return np.minimum.reduceat(hashes, starts, axis=0)
+
+    def _band_keys(self, signatures: np.ndarray) -> List[List[int]]:
+        bands = signatures.astype(np.uint64).reshape(len(signatures), BANDS, ROWS_PER_BAND)
+        keys = (
+            bands[:, :, 0] * _KEY_MULTIPLIERS[0] ^
+            bands[:, :, 1] * _KEY_MULTIPLIERS[1] ^
+            bands[:, :, 2]
+        ) ^ self._salts
+        return keys.tolist()
+
+    def add(
+        self,
+        descriptions: Sequence[str],
+        categories: Sequence[str],
+        confidences: Sequence[float]
+    ):
+        """Add labelled descriptions; a description already in the index is relabelled."""
+        new: Dict[str, int] = {}
+        labels = []
+        for folded, category, confidence in zip(fold_descriptions(descriptions), categories, confidences):
+            if not folded:
+                continue
+            row = self._rows.get(folded)
+            if row is not None:
+                self.categories[row] = category
+                self._confidences[row] = confidence
+            elif folded in new:
+                labels[new[folded]] = (category, confidence)
+            else:
+                new[folded] = len(labels)
+                labels.append((category, confidence))
+        if not new:
+            return
+
+        start = len(self.descriptions)
+        signatures = self.signatures(list(new))
+        self._reserve(start + len(new))
+        self._signatures[start:start + len(new)] = signatures
+        self._confidences[start:start + len(new)] = [confidence for _, confidence in labels]
+        for offset, folded in enumerate(new):
+            self._rows[folded] = start + offset
+            self.descriptions.append(folded)
+            self.categories.append(labels[offset][0])
+        self._index_rows(start, signatures)
+
+    def _reserve(self, size: int):
+        """Grow the signature and confidence arrays geometrically so adds stay amortised O(1)."""
+        capacity = len(self._signatures)
+        if size <= capacity:
+            return
+        capacity = max(size, capacity * 2, 1024)
+        signatures = np.empty((capacity, NUM_HASHES), np.uint32)
+        signatures[:len(self.descriptions)] = self._signatures[:len(self.descriptions)]
+        confidences = np.empty(capacity, np.float32)
+        confidences[:len(self.descriptions)] = self._confidences[:len(self.descriptions)]
+        self._signatures, self._confidences = signatures, confidences
+
+    def _index_rows(self, start: int, signatures: np.ndarray):
+        for row, keys in enumerate(self._band_keys(signatures), start=start):
+            for key in keys:
+                self._buckets.setdefault(key, []).append(row)
+
+    def query(self, descriptions: Sequence[str]) -> List[Optional[Neighbor]]:
+        """Closest labelled description for each query, or None below min_similarity."""
+        results: List[Optional[Neighbor]] = [None] * len(descriptions)
+        if not self.descriptions:
+            return results
+
+        positions, folded = [], []
+        for position, text in enumerate(fold_descriptions(descriptions)):
+            if text:
+                positions.append(position)
+                folded.append(text)
+        if not folded:
+            return results
+
+        signatures = self.signatures(folded)
+        query_ids: List[int] = []
+        rows: List[int] = []
+        get = self._buckets.get
+        for query_id, keys in enumerate(self._band_keys(signatures)):
+            candidates = set()
+            for key in keys:
+                bucket = get(key)
+                if bucket:
+                    candidates.update(bucket)
+            rows.extend(candidates)
+            query_ids.extend([query_id] * len(candidates))
+        if not rows:
+            return results
+
+        query_ids = np.array(query_ids)
+        rows = np.array(rows)
+        agreement = (self._signatures[rows] == signatures[query_ids]).sum(axis=1)
+
+        # Best candidate per query: sort by query, then by agreement descending
+        order = np.lexsort((-agreement, query_ids))
+        query_ids, rows, agreement = query_ids[order], rows[order], agreement[order]
+        first = np.r_[True, query_ids[1:] != query_ids[:-1]]
+        for query_id, row, agreed in zip(query_ids[first], rows[first], agreement[first]):
+            similarity = agreed / NUM_HASHES
+            if similarity >= self.min_similarity:
+                results[positions[query_id]] = Neighbor(
+                    description=self.descriptions[row],
+                    category=self.categories[row],
+                    confidence=float(self._confidences[row]),
+                    similarity=float(similarity)
+                )
+        return results
+
+    def save(self, path: Path = NEIGHBOR_INDEX_PATH) -> Path:
+        """Snapshot signatures and labels to a ``.npz`` file."""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        np.savez_compressed(
+            path,
+            signatures=self._signatures[:len(self.descriptions)],
+            confidences=self._confidences[:len(self.descriptions)],
+            descriptions=np.array(self.descriptions, dtype=str),
+            categories=np.array(self.categories, dtype=str),
+            taxonomy_version=np.array(self.taxonomy_version),
+            seed=np.array(self.seed)
+        )
+        return path
+
+    @classmethod
+    def load(cls, path: Path, min_similarity: float = NEIGHBOR_MIN_SIMILARITY) -> "NeighborIndex":
+        with np.load(path, allow_pickle=False) as snapshot:
+            index = cls(str(snapshot["taxonomy_version"]), min_similarity, int(snapshot["seed"]))
+            index._signatures = snapshot["signatures"]
+            index._confidences = snapshot["confidences"]
+            index.descriptions = snapshot["descriptions"].tolist()
+            index.categories = snapshot["categories"].tolist()
+        index._rows = {description: row for row, description in enumerate(index.descriptions)}
+        index._index_rows(0, index._signatures)
+        return index
+
+    def stats(self) -> Dict[str, float]:
+        return {
+            "entries": len(self.descriptions),
+            "buckets": len(self._buckets),
+            "min_similarity": self.min_similarity
+        }
+
+@lru_cache(maxsize=None)
+def load_neighbor_index(taxonomy_version: str) -> NeighborIndex:
+    """The process-wide index: the snapshot when there is a usable one, else empty."""
+    if NEIGHBOR_INDEX_PATH.exists():
+        try:
+            index = NeighborIndex.load(NEIGHBOR_INDEX_PATH)
+            if index.taxonomy_version == taxonomy_version:
+                console.print(f"Loaded neighbour index with {len(index)} items", style="green")
+                return index
+            console.print(
+                f"[yellow]Ignoring neighbour index snapshot for taxonomy {index.taxonomy_version}"
+            )
+        except Exception as e:
+            console.print(f"[red]Failed to load neighbour index {NEIGHBOR_INDEX_PATH}: {str(e)}")
+    return NeighborIndex(taxonomy_version)
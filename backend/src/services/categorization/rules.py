@@ -0,0 +1,211 @@
+# backend/src/services/categorization/rules.py
+"""User categorization rules, compiled per user and applied in bulk."""
+import os
+import re
+import time
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence, Set, Tuple
+from sqlalchemy import and_, case, func, literal, or_, select
+from sqlalchemy.orm import Session
+from rich.console import Console
+from database.models import BankTransaction, CategoryRule, Receipt, ReceiptItem
+from .classifier import to_category_type
+
+console = Console()
+
+# Other workers pick up rule edits within this many seconds
+RULES_CACHE_TTL_SECONDS = float(os.getenv("RULES_CACHE_TTL_SECONDS", "30"))
+
+@dataclass
+class Rule:
+    id: int
+    pattern: str
+    category: str  # ExpenseCategory value
+    min_amount: Optional[float] = None
+    max_amount: Optional[float] = None
+    priority: int = 0
+
+    @classmethod
+    def from_record(cls, record: CategoryRule) -> "Rule":
+        return cls(
+            id=record.id,
+            pattern=record.pattern,
+            category=record.category,
+            min_amount=record.min_amount,
+            max_amount=record.max_amount,
+            priority=record.priority
+        )
+
+    def accepts(self, amount: float) -> bool:
+        return (
+            (self.min_amount is None or amount >= self.min_amount) and
+            (self.max_amount is None or amount <= self.max_amount)
+        )
+
+def priority_order(rules: Sequence[Rule]) -> List[Rule]:
+    """Rules in the order they are tried.
+
+    Highest ``priority`` first; among equals the more specific rule wins:
+    one with amount bounds, then the longer pattern, then the oldest rule.
+    """
+    return sorted(rules, key=lambda rule: (
+        -rule.priority,
+        rule.min_amount is None and rule.max_amount is None,
+        -len(rule.pattern),
+        rule.id
+    ))
+
+class CompiledRules:
+    """One user's rules folded into a single regex plus per-rule amount checks.
+
+    The regex is a lookahead alternation of every distinct pattern,
+    longest first, so one ``finditer`` over the description finds the
+    longest pattern starting at each position. Any other pattern occurring
+    there is a prefix of it, so the patterns contained in each hit are
+    precomputed and one scan finds every pattern present. The first rule
+    in ``priority_order`` whose pattern is
+    present and whose amount bounds hold wins. Matching is a
+    case-insensitive substring test, the same as the SQL in ``apply_rules``.
+    """
+
+    def __init__(self, rules: Sequence[Rule]):
+        self.rules = priority_order(rules)
+        patterns = sorted({rule.pattern.upper() for rule in self.rules}, key=len, reverse=True)
+        self._rules_by_pattern: Dict[str, List[int]] = {}
+        for order, rule in enumerate(self.rules):
+            self._rules_by_pattern.setdefault(rule.pattern.upper(), []).append(order)
+        self._contained: Dict[str, List[str]] = {
+            pattern: [other for other in patterns if other in pattern]
+            for pattern in patterns
+        }
+        self._regex = (
+            re.compile("(?=(" + "|".join(re.escape(pattern) for pattern in patterns) + "))")
+            if patterns else None
+        )
+
+    def __len__(self) -> int:
+        return len(self.rules)
+
+    def match(self, description: str, amount: float) -> Optional[Rule]:
+        """Highest-priority rule for a description and amount, or None."""
+        if self._regex is None:
+            return None
+        present: Set[str] = set()
+        for hit in self._regex.finditer(description.upper()):
+            present.update(self._contained[hit.group(1)])
+        if not present:
+            return None
+        candidates = sorted(order for pattern in present for order in self._rules_by_pattern[pattern])
+        for order in candidates:
+            if self.rules[order].accepts(amount):
+                return self.rules[order]
+        return None
+
+def load_rules(db: Session, user_id: int) -> List[Rule]:
+    return [
+        Rule.from_record(record)
+        for record in db.query(CategoryRule).filter(CategoryRule.user_id == user_id).all()
+    ]
+
+def apply_rules(
+    db: Session,
+    user_id: int,
+    rules: Sequence[Rule],
+    receipt_id: Optional[int] = None
+) -> Dict[str, int]:
+    """Recategorize a user's stored items and transactions with set-based UPDATEs.
+
+    One ``UPDATE ... SET category = CASE ...`` per table covers every rule,
+    with WHEN clauses in priority order. With ``receipt_id`` only that
+    receipt's items are touched. Returns the rows updated per table.
+    """
+    ordered = priority_order(rules)
+    updated = {"receipt_items": 0, "bank_transactions": 0}
+    if not ordered:
+        return updated
+
+    def whens(description, amount, category) -> List[Tuple]:
+        result = []
+        for rule in ordered:
+            clauses = [func.upper(description).contains(rule.pattern.upper(), autoescape=True)]
+            if rule.min_amount is not None:
+                clauses.append(amount >= rule.min_amount)
+            if rule.max_amount is not None:
+                clauses.append(amount <= rule.max_amount)
+            # Typed like the column so the enum is stored the way the ORM stores it
+            result.append((and_(*clauses), literal(to_category_type(rule.category), category.type)))
+        return result
+
+    try:
+        item_whens = whens(ReceiptItem.description, ReceiptItem.price, ReceiptItem.category)
+        user_receipts = select(Receipt.id).where(Receipt.user_id == user_id)
+        if receipt_id is not None:
+            user_receipts = user_receipts.where(Receipt.id == receipt_id)
+        updated["receipt_items"] = db.query(ReceiptItem).filter(
+            ReceiptItem.receipt_id.in_(user_receipts),
+            or_(*(condition for condition, _ in item_whens))
+        ).update({ReceiptItem.category: case(*item_whens)}, synchronize_session=False)
+
+        if receipt_id is None:
+            transaction_whens = whens(BankTransaction.description, BankTransaction.amount, BankTransaction.category)
+            updated["bank_transactions"] = db.query(BankTransaction).filter(
+                BankTransaction.user_id == user_id,
+                or_(*(condition for condition, _ in transaction_whens))
+            ).update({BankTransaction.category: case(*transaction_whens)}, synchronize_session=False)
+
+        db.commit()
+        return updated
+    except Exception as e:
+        db.rollback()
+        raise e
+
+class RuleEngine:
+    """Compiled rules per user, cached until an edit or ``ttl`` seconds pass."""
+
+    def __init__(self, ttl: float = RULES_CACHE_TTL_SECONDS):
+        self.ttl = ttl
+        self._compiled: Dict[int, Tuple[float, CompiledRules]] = {}
+        self.hits = 0
+        self.compilations = 0
+
+    def rules_for(self, db: Session, user_id: int) -> CompiledRules:
+        cached = self._compiled.get(user_id)
+        if cached is not None and time.monotonic() - cached[0] < self.ttl:
+            self.hits += 1
+            return cached[1]
+        compiled = CompiledRules(load_rules(db, user_id))
+        self._compiled[user_id] = (time.monotonic(), compiled)
+        self.compilations += 1
+        return compiled
+
+    def invalidate(self, user_id: int):
+        self._compiled.pop(user_id, None)
+
+    def reapply(self, db: Session, user_id: int) -> Dict[str, int]:
+        """Recompile a user's rules after an edit and re-apply them to all stored rows."""
+        self.invalidate(user_id)
+        compiled = self.rules_for(db, user_id)
+        updated = apply_rules(db, user_id, compiled.rules)
+        console.print(
+            f"Re-applied {len(compiled)} rules for user {user_id}: "
+            f"{updated['receipt_items']} items, {updated['bank_transactions']} transactions",
+            style="green"
+        )
+        return updated
+
+    def apply_to_receipt(self, db: Session, user_id: int, receipt_id: int) -> int:
+        """Apply a user's rules to one stored receipt's items; returns the items updated."""
+        compiled = self.rules_for(db, user_id)
+        if not compiled:
+            return 0
+        return apply_rules(db, user_id, compiled.rules, receipt_id)["receipt_items"]
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "users": len(self._compiled),
+            "hits": self.hits,
+            "compilations": self.compilations
+        }
+
+# Shared by the receipt and statement routers
+rule_engine = RuleEngine()
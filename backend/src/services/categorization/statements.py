@@ -0,0 +1,118 @@
+# backend/src/services/categorization/statements.py
+"""Bulk categorization of bank statement transactions, once per distinct merchant."""
+from typing import Dict, List, Optional, Tuple
+from sqlalchemy.orm import Session
+from rich.console import Console
+from services.pdf_processing.statement_extractor import BankTransaction
+from .classifier import ExpenseClassifier, to_category_type
+from .merchants import MerchantDirectory, MerchantMatch, merchant_tokens
+
+console = Console()
+
+# Card-network and processor prefixes that say nothing about the merchant
+_NOISE_PREFIXES = {
+    "POS", "DEBIT", "PURCHASE", "CHECKCARD", "CARD", "VISA", "ACH", "RECURRING", "SQ", "TST", "PP"
+}
+
+def statement_key(description: str) -> str:
+    """Description without prefixes, store numbers and references ("POS STARBUCKS #1123" -> STARBUCKS)."""
+    tokens = merchant_tokens(description)
+    start = 0
+    while start < len(tokens) - 1 and tokens[start] in _NOISE_PREFIXES:
+        start += 1
+    words = [token for token in tokens[start:] if not any(char.isdigit() for char in token)]
+    return " ".join(words or tokens)
+
+class StatementCategorizer:
+    """Fill ``BankTransaction.category`` for a whole statement.
+
+    Descriptions are reduced to a merchant key, so "STARBUCKS #1123" and
+    "POS STARBUCKS #0412" share one. Each distinct key is categorized once:
+    a known merchant with a default category needs no classifier at all,
+    and the rest go through the classifier tiers together in one
+    ``classify_items`` call. Labels are then fanned back out to every
+    transaction, so cost grows with distinct merchants, not statement rows.
+    """
+
+    def __init__(self, classifier: ExpenseClassifier, merchants: Optional[MerchantDirectory] = None):
+        self.classifier = classifier
+        self.merchants = merchants if merchants is not None else classifier.merchants
+        self.transactions = 0
+        self.distinct = 0
+        self.merchant_hits = 0
+
+    def group(
+        self, transactions: List[BankTransaction]
+    ) -> Tuple[Dict[str, List[int]], Dict[str, Optional[MerchantMatch]]]:
+        """Transaction positions by merchant key in first-seen order, and each key's directory match."""
+        groups: Dict[str, List[int]] = {}
+        matches: Dict[str, Optional[MerchantMatch]] = {}
+        for position, transaction in enumerate(transactions):
+            match = self.merchants.match(transaction.description)
+            key = match.merchant if match and match.merchant else statement_key(transaction.description)
+            if key not in groups:
+                groups[key] = []
+                matches[key] = match
+            groups[key].append(position)
+        return groups, matches
+
+    async def categorize(
+        self, transactions: List[BankTransaction], db: Optional[Session] = None, rules=None
+    ) -> List[BankTransaction]:
+        """Set each transaction's category (a ``CategoryType`` value) in place and return them.
+
+        Transactions matching one of the user's ``rules`` take the rule's
+        category and are left out of the grouping.
+        """
+        remaining = []
+        for transaction in transactions:
+            rule = rules.match(transaction.description, transaction.amount) if rules else None
+            if rule is not None:
+                transaction.category = to_category_type(rule.category).value
+            else:
+                remaining.append(transaction)
+
+        groups, matches = self.group(remaining)
+        self.transactions += len(remaining)
+        self.distinct += len(groups)
+
+        labels: Dict[str, str] = {}
+        pending: List[Tuple[str, BankTransaction]] = []
+        for key, positions in groups.items():
+            first = remaining[positions[0]]
+            match = matches[key]
+            if match and match.category:
+                labels[key] = match.category
+                self.merchant_hits += 1
+            else:
+                pending.append((key, first))
+
+        if pending:
+            classified = await self.classifier.classify_items(
+                items=[{"description": key, "price": first.amount} for key, first in pending],
+                store_name="Bank statement",
+                total_amount=sum(first.amount for _, first in pending),
+                db=db
+            )
+            for (key, _), item in zip(pending, classified):
+                labels[key] = item.category.value
+
+        for key, positions in groups.items():
+            category = to_category_type(labels.get(key)).value
+            for position in positions:
+                remaining[position].category = category
+
+        console.print(
+            f"Categorized {len(transactions)} transactions: {len(transactions) - len(remaining)} "
+            f"by rules, the rest from {len(groups)} merchants ({len(pending)} through the classifier)",
+            style="green"
+        )
+        return transactions
+
+    def stats(self) -> Dict[str, float]:
+        return {
+            "transactions": self.transactions,
+            "distinct_merchants": self.distinct,
+            "merchant_directory_hits": self.merchant_hits,
+            "transactions_per_merchant": self.transactions / self.distinct if self.distinct else 0.0
+        }
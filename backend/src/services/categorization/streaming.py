@@ -0,0 +1,83 @@
+# backend/src/services/categorization/streaming.py
+import asyncio
+import json
+from typing import Any, AsyncIterator, Dict, List
+
+class ItemStreamParser:
+    """Incrementally pull item objects out of a streamed ``{"items": [...]}`` answer.
+
+    Feed text chunks as they arrive; each call returns the item objects
+    completed by that chunk. Only brace depth and string state are
+    tracked, so surrounding prose or code fences are ignored and a
+    truncated answer still yields every item that was finished.
+    """
+
+    def __init__(self):
+        self._buffer: List[str] = []  # characters of the item being read
+        self._depth = 0
+        self._in_string = False
+        self._escaped = False
+
+    def feed(self, text: str) -> List[Dict[str, Any]]:
+        items = []
+        for char in text:
+            if self._depth >= 2:
+                self._buffer.append(char)
+
+            if self._in_string:
+                if self._escaped:
+                    self._escaped = False
+                elif char == "\\":
+                    self._escaped = True
+                elif char == '"':
+                    self._in_string = False
+            elif char == '"':
+                self._in_string = True
+            elif char == "{":
+                self._depth += 1
+                if self._depth == 2:
+                    # Objects one level inside the outer object are items
+                    self._buffer = ["{"]
+            elif char == "}":
+                self._depth -= 1
+                if self._depth == 1:
+                    try:
+                        item = json.loads("".join(self._buffer))
+                        if isinstance(item, dict):
+                            items.append(item)
+                    except json.JSONDecodeError:
+                        pass
+                    self._buffer = []
+                elif self._depth < 0:
+                    self._depth = 0
+        return items
+
+async def merge_streams(streams: List[AsyncIterator[Any]]) -> AsyncIterator[Any]:
+    """Yield values from several async iterators in arrival order."""
+    if len(streams) == 1:
+        async for value in streams[0]:
+            yield value
+        return
+
+    queue: asyncio.Queue = asyncio.Queue()
+    done = object()
+
+    async def drain(stream):
+        try:
+            async for value in stream:
+                await queue.put(value)
+        finally:
+            await queue.put(done)
+
+    tasks = [asyncio.ensure_future(drain(stream)) for stream in streams]
+    try:
+        remaining = len(tasks)
+        while remaining:
+            value = await queue.get()
+            if value is done:
+                remaining -= 1
+            else:
+                yield value
+    finally:
+        for task in tasks:
+            task.cancel()
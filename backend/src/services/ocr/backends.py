@@ -0,0 +1,155 @@
+# backend/src/services/ocr/backends.py
+"""Pluggable OCR engines.
+
+``TesserocrBackend`` keeps one Tesseract engine alive per process and
+hands it raw NumPy buffers, so a call costs only the recognition itself.
+``PytesseractBackend`` shells out to the ``tesseract`` binary on every call
+(temp file, process start, traineddata load) and is kept as the fallback
+when tesserocr is not installed.
+
+tesserocr is listed in requirements.txt. It builds against the system
+Tesseract and Leptonica libraries, so install their development headers
+first (``libtesseract-dev libleptonica-dev`` on Debian/Ubuntu, ``tesseract``
+from Homebrew). Without them the wheel fails to build; install the
+remaining requirements without it and "auto" falls back to pytesseract,
+logging a warning at startup. Set ``OCR_BACKEND=tesserocr`` to fail fast
+instead.
+"""
+import os
+import threading
+from abc import ABC, abstractmethod
+from typing import Optional
+import cv2
+import numpy as np
+import pytesseract
+from rich.console import Console
+from .ocr_result import OCRResult, OCRWord
+
+try:
+    import tesserocr
+except ImportError:  # optional: needs libtesseract headers to build
+    tesserocr = None
+
+console = Console()
+
+# "auto" prefers the warm tesserocr engine and falls back to pytesseract
+OCR_BACKEND = os.getenv("OCR_BACKEND", "auto").lower()
+OCR_LANGUAGE = os.getenv("OCR_LANGUAGE", "eng")
+
+class OCRBackend(ABC):
+    name: str = "base"
+
+    @abstractmethod
+    def image_to_text(self, image: np.ndarray) -> str:
+        """Recognise an image and return the plain text."""
+
+    @abstractmethod
+    def image_to_data(self, image: np.ndarray) -> OCRResult:
+        """Recognise an image and return words with boxes and confidences."""
+
+    def close(self):
+        """Release engine resources."""
+
+class PytesseractBackend(OCRBackend):
+    """Runs the tesseract CLI once per call."""
+
+    name = "pytesseract"
+
+    def __init__(self, language: str = OCR_LANGUAGE):
+        self.language = language
+
+    def image_to_text(self, image: np.ndarray) -> str:
+        return pytesseract.image_to_string(image, lang=self.language)
+
+    def image_to_data(self, image: np.ndarray) -> OCRResult:
+        data = pytesseract.image_to_data(
+            image, lang=self.language, output_type=pytesseract.Output.DICT
+        )
+        return OCRResult.from_tesseract_data(data)
+
+class TesserocrBackend(OCRBackend):
+    """Long-lived in-process Tesseract engine fed with raw image buffers."""
+
+    name = "tesserocr"
+
+    def __init__(self, language: str = OCR_LANGUAGE):
+        if tesserocr is None:
+            raise RuntimeError("tesserocr is not installed")
+        # traineddata is loaded once here and reused for every image
+        self.api = tesserocr.PyTessBaseAPI(lang=language)
+        # The engine keeps per-image state, so calls must not interleave
+        self.lock = threading.Lock()
+
+    def _set_image(self, image: np.ndarray):
+        if image.ndim == 3:
+            image = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
+        image = np.ascontiguousarray(image, dtype=np.uint8)
+        height, width = image.shape[:2]
+        bytes_per_pixel = 1 if image.ndim == 2 else image.shape[2]
+        self.api.SetImageBytes(
+            image.tobytes(), width, height, bytes_per_pixel, width * bytes_per_pixel
+        )
+
+    def image_to_text(self, image: np.ndarray) -> str:
+        with self.lock:
+            self._set_image(image)
+            try:
+                return self.api.GetUTF8Text()
+            finally:
+                self.api.Clear()
+
+    def image_to_data(self, image: np.ndarray) -> OCRResult:
+        with self.lock:
+            self._set_image(image)
+            try:
+                self.api.Recognize()
+                return self._collect_words()
+            finally:
+                self.api.Clear()
+
+    def _collect_words(self) -> OCRResult:
+        words = []
+        iterator = self.api.GetIterator()
+        if iterator is None:
+            return OCRResult()
+
+        line_id = -1
+        for word in tesserocr.iterate_level(iterator, tesserocr.RIL.WORD):
+            if word.IsAtBeginningOf(tesserocr.RIL.TEXTLINE):
+                line_id += 1
+            text = (word.GetUTF8Text(tesserocr.RIL.WORD) or "").strip()
+            box = word.BoundingBox(tesserocr.RIL.WORD)
+            if not text or box is None:
+                continue
+
+            left, top, right, bottom = box
+            words.append(OCRWord(
+                text=text,
+                left=left,
+                top=top,
+                width=right - left,
+                height=bottom - top,
+                confidence=float(word.Confidence(tesserocr.RIL.WORD)),
+                line_id=max(line_id, 0)
+            ))
+
+        return OCRResult(words=words)
+
+    def close(self):
+        self.api.End()
+
+def create_backend(name: Optional[str] = None, language: str = OCR_LANGUAGE) -> OCRBackend:
+    """Create the configured OCR backend, falling back to pytesseract."""
+    name = (name or OCR_BACKEND).lower()
+    if name == "pytesseract":
+        return PytesseractBackend(language)
+    if name not in ("auto", "tesserocr"):
+        raise ValueError(f"Unknown OCR backend: {name}")
+
+    try:
+        return TesserocrBackend(language)
+    except Exception as e:
+        if name == "tesserocr":
+            raise
+        console.print(f"[yellow]Warm OCR engine unavailable ({str(e)}), using pytesseract")
+        return PytesseractBackend(language)
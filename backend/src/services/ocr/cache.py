@@ -0,0 +1,129 @@
+# backend/src/services/ocr/cache.py
+import base64
+import hashlib
+import os
+from dataclasses import asdict
+from datetime import datetime
+from typing import Any, Dict, Optional
+from sqlalchemy.orm import Session
+from rich.console import Console
+from .extractor import Receipt, ReceiptItem
+from .ocr_result import OCRResult
+from ..cache import LRUCache
+from database.models import ReceiptResultCacheEntry
+
+console = Console()
+
+RECEIPT_CACHE_SIZE = int(os.getenv("RECEIPT_CACHE_SIZE", "1024"))
+
+class ReceiptResultCache:
+    """Two-tier cache of processed receipts keyed on the uploaded image bytes.
+
+    Entries live in an in-memory LRU and in the ``receipt_result_cache``
+    table, so a duplicate upload skips preprocessing, OCR and classification
+    even after a restart or on another worker.
+    """
+
+    def __init__(self, max_entries: int = RECEIPT_CACHE_SIZE):
+        self.memory = LRUCache(max_entries)
+        self.db_hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def digest(contents: bytes) -> str:
+        """Compute the cache key for uploaded image bytes."""
+        return hashlib.sha256(contents).hexdigest()
+
+    def get(self, digest: str, db: Optional[Session] = None) -> Optional[Receipt]:
+        """Look up a processed receipt, falling back to the database tier."""
+        payload = self.memory.get(digest)
+        if payload is not None:
+            return self._deserialize(payload)
+
+        if db is not None:
+            try:
+                entry = db.query(ReceiptResultCacheEntry).filter(
+                    ReceiptResultCacheEntry.digest == digest
+                ).first()
+                if entry:
+                    entry.hit_count += 1
+                    entry.last_hit_at = datetime.utcnow()
+                    db.commit()
+                    self.memory.put(digest, entry.payload)
+                    self.db_hits += 1
+                    return self._deserialize(entry.payload)
+            except Exception as e:
+                db.rollback()
+                console.print(f"[red]Receipt cache lookup failed: {str(e)}")
+
+        self.misses += 1
+        return None
+
+    def put(self, digest: str, receipt: Receipt, db: Optional[Session] = None):
+        """Store a processed receipt in memory and, if given a session, in the database."""
+        payload = self._serialize(receipt)
+        self.memory.put(digest, payload)
+
+        if db is not None:
+            try:
+                db.merge(ReceiptResultCacheEntry(digest=digest, payload=payload))
+                db.commit()
+            except Exception as e:
+                db.rollback()
+                console.print(f"[red]Receipt cache write failed: {str(e)}")
+
+    def stats(self) -> Dict[str, int]:
+        """Get hit/miss/eviction counters for both tiers."""
+        return {
+            "entries": len(self.memory),
+            "max_entries": self.memory.max_entries,
+            "hits": self.memory.hits + self.db_hits,
+            "memory_hits": self.memory.hits,
+            "db_hits": self.db_hits,
+            "misses": self.misses,
+            "evictions": self.memory.evictions
+        }
+
+    @staticmethod
+    def _serialize(receipt: Receipt) -> Dict[str, Any]:
+        """Convert a receipt to a JSON-compatible dict."""
+        items = []
+        for item in receipt.items:
+            data = asdict(item)
+            # Categories are str enums; store the plain value
+            data["category"] = getattr(item.category, "value", item.category)
+            items.append(data)
+
+        return {
+            "store_name": receipt.store_name,
+            "date": receipt.date.isoformat(),
+            "items": items,
+            "total": receipt.total,
+            "subtotal": receipt.subtotal,
+            "tax": receipt.tax,
+            "raw_text": receipt.raw_text,
+            "ocr_tier": receipt.ocr_tier,
+            # Compact word-level OCR output so cache hits can still be re-parsed later
+            "ocr_data": (
+                base64.b64encode(receipt.ocr_result.to_bytes()).decode("ascii")
+                if receipt.ocr_result is not None else None
+            )
+        }
+
+    @staticmethod
+    def _deserialize(payload: Dict[str, Any]) -> Receipt:
+        """Build a fresh receipt from a cached payload."""
+        return Receipt(
+            store_name=payload["store_name"],
+            date=datetime.fromisoformat(payload["date"]),
+            items=[ReceiptItem(**item) for item in payload["items"]],
+            total=payload["total"],
+            subtotal=payload["subtotal"],
+            tax=payload["tax"],
+            raw_text=payload["raw_text"],
+            ocr_tier=payload.get("ocr_tier", "full"),
+            ocr_result=(
+                OCRResult.from_bytes(base64.b64decode(payload["ocr_data"]))
+                if payload.get("ocr_data") else None
+            )
+        )
@@ -0,0 +1,156 @@
+# backend/src/services/ocr/dedup.py
+import os
+from collections import Counter
+from functools import lru_cache
+from itertools import combinations
+from typing import Any, Dict, List, Optional, Tuple
+import cv2
+import numpy as np
+from .extractor import Receipt
+
+# DCT-based perceptual hash: 8x8 low frequencies of a 32x32 thumbnail -> 64 bits
+PHASH_SIZE = 8
+PHASH_BITS = PHASH_SIZE * PHASH_SIZE
+# Re-encoded, rescaled or slightly rotated copies of one photo stay within 6 bits.
+# Different receipts with the same layout can hash identically, so a hit is only a hint.
+PHASH_MAX_DISTANCE = int(os.getenv("RECEIPT_PHASH_MAX_DISTANCE", "6"))
+# Share of the earlier receipt's item prices a new upload must show to be the same receipt
+DUPLICATE_MIN_ITEM_OVERLAP = float(os.getenv("RECEIPT_DUPLICATE_MIN_ITEM_OVERLAP", "0.8"))
+
+def perceptual_hash(image: np.ndarray) -> int:
+    """Compute a 64-bit perceptual hash of an image.
+
+    Works on any resolution; pass a small grayscale decode (e.g. from
+    ``cv2.IMREAD_REDUCED_GRAYSCALE_8``) to keep it cheap.
+    """
+    if len(image.shape) == 3:
+        image = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+
+    small = cv2.resize(image, (PHASH_SIZE * 4, PHASH_SIZE * 4), interpolation=cv2.INTER_AREA)
+    low_freq = cv2.dct(small.astype(np.float32))[:PHASH_SIZE, :PHASH_SIZE].flatten()
+    # Compare against the median, ignoring the DC term (overall brightness)
+    bits = low_freq > np.median(low_freq[1:])
+    return int.from_bytes(np.packbits(bits).tobytes(), "big")
+
+def same_receipt(parsed: Receipt, cached: Receipt, min_overlap: float = DUPLICATE_MIN_ITEM_OVERLAP) -> bool:
+    """Whether a fresh parse shows the same purchase as a cached receipt.
+
+    The totals must be equal and at least ``min_overlap`` of the cached
+    item prices must appear in the parse. Prices survive a noisy OCR pass
+    better than descriptions do.
+    """
+    if not cached.items or cached.total <= 0:
+        return False
+    if abs(parsed.total - cached.total) > 0.005:
+        return False
+    remaining = Counter(round(item.price, 2) for item in parsed.items)
+    shared = 0
+    for item in cached.items:
+        price = round(item.price, 2)
+        if remaining[price] > 0:
+            remaining[price] -= 1
+            shared += 1
+    return shared >= min_overlap * len(cached.items)
+
+@lru_cache(maxsize=None)
+def _flip_masks(chunk_bits: int, radius: int) -> Tuple[int, ...]:
+    """All chunk values with at most ``radius`` bits set."""
+    masks = [0]
+    for r in range(1, radius + 1):
+        for positions in combinations(range(chunk_bits), r):
+            mask = 0
+            for p in positions:
+                mask |= 1 << p
+            masks.append(mask)
+    return tuple(masks)
+
+class HammingIndex:
+    """Multi-index hashing over fixed-width integer hashes.
+
+    Each hash is split into chunks that are indexed in separate tables. By the
+    pigeonhole principle a hash within distance ``r`` of the query matches
+    at least one chunk within ``r // num_chunks`` bits, so a lookup only
+    probes a handful of small buckets instead of scanning every hash.
+    With four 16-bit chunks, lookups stay well under a millisecond at 300k
+    hashes while ``r < 8`` (one flipped bit per chunk); at ``r = 10`` every
+    chunk probes 137 buckets and a lookup takes about 1.6 ms.
+    """
+
+    def __init__(self, bits: int = PHASH_BITS, chunk_bits: int = 16):
+        if bits % chunk_bits:
+            raise ValueError("bits must be a multiple of chunk_bits")
+        self.bits = bits
+        self.chunk_bits = chunk_bits
+        self.num_chunks = bits // chunk_bits
+        self._chunk_mask = (1 << chunk_bits) - 1
+        self._tables: List[Dict[int, List[int]]] = [{} for _ in range(self.num_chunks)]
+        self._values: Dict[int, Any] = {}
+
+    def _chunks(self, hash_value: int) -> List[int]:
+        return [
+            (hash_value >> (i * self.chunk_bits)) & self._chunk_mask
+            for i in range(self.num_chunks)
+        ]
+
+    def add(self, hash_value: int, value: Any):
+        """Index a hash; re-adding an existing hash replaces its value."""
+        if hash_value not in self._values:
+            for table, chunk in zip(self._tables, self._chunks(hash_value)):
+                table.setdefault(chunk, []).append(hash_value)
+        self._values[hash_value] = value
+
+    def search(self, hash_value: int, max_distance: int) -> List[Tuple[int, Any]]:
+        """Return ``(distance, value)`` pairs within max_distance, closest first."""
+        flips = _flip_masks(self.chunk_bits, max_distance // self.num_chunks)
+        candidates = set()
+
+        for table, chunk in zip(self._tables, self._chunks(hash_value)):
+            lookup = table.get
+            for flip in flips:
+                bucket = lookup(chunk ^ flip)
+                if bucket:
+                    candidates.update(bucket)
+
+        results = []
+        for candidate in candidates:
+            distance = (candidate ^ hash_value).bit_count()
+            if distance <= max_distance:
+                results.append((distance, self._values[candidate]))
+
+        results.sort(key=lambda result: result[0])
+        return results
+
+    def nearest(self, hash_value: int, max_distance: int) -> Optional[Tuple[int, Any]]:
+        """Return the closest ``(distance, value)`` pair, if any."""
+        results = self.search(hash_value, max_distance)
+        return results[0] if results else None
+
+    def __len__(self) -> int:
+        return len(self._values)
+
+class NearDuplicateDetector:
+    """Per-user perceptual-hash index mapping receipt photos to cached results.
+
+    A match only says two photos look alike at thumbnail scale; callers must
+    confirm it against the new upload's text (``same_receipt``) before
+    reusing the cached result.
+    """
+
+    def __init__(self, max_distance: int = PHASH_MAX_DISTANCE):
+        self.max_distance = max_distance
+        self._indexes: Dict[int, HammingIndex] = {}
+
+    def find(self, user_id: int, phash: int) -> Optional[str]:
+        """Return the cache digest of a similar-looking earlier upload by this user, as a hint."""
+        index = self._indexes.get(user_id)
+        if index is None:
+            return None
+        match = index.nearest(phash, self.max_distance)
+        return match[1] if match else None
+
+    def add(self, user_id: int, phash: int, digest: str):
+        """Remember that the photo with this hash was processed under digest."""
+        index = self._indexes.get(user_id)
+        if index is None:
+            index = self._indexes[user_id] = HammingIndex()
+        index.add(phash, digest)
@@ -1,15 +1,33 @@
 # backend/src/services/ocr/extractor.py
-import pytesseract
 from dataclasses import dataclass
-from typing import List, Optional, Tuple
+from typing import Dict, List, Optional
+from functools import lru_cache
+from itertools import islice
 from datetime import datetime
 import re
+from .ocr_result import OCRResult
+from .backends import OCRBackend, create_backend
+
+# Line kinds assigned by ReceiptExtractor._classify_lines
+LINE_ITEM = "item"
+LINE_SUBTOTAL = "subtotal"
+LINE_TOTAL = "total"
+LINE_TAX = "tax"
+LINE_DISCOUNT = "discount"
+
+# Keyword lines with several kinds take the lowest value
+LINE_PRIORITY = {LINE_SUBTOTAL: 0, LINE_TOTAL: 1, LINE_TAX: 2, LINE_DISCOUNT: 3}
+
+# Characters dropped from every line before parsing
+NOISE_CHARACTERS = str.maketrans('', '', '*#')
 
 @dataclass
 class ReceiptItem:
     description: str
     price: float
     quantity: Optional[int] = 1
+    category: Optional[str] = None
+    confidence: Optional[float] = None
 
 @dataclass
 class Receipt:
@@ -20,9 +38,14 @@ class Receipt:
     subtotal: float
     tax: float
     raw_text: str
+    ocr_tier: str = "full"  # which OCR path produced the text
+    ocr_result: Optional[OCRResult] = None  # word-level OCR output, kept for re-parsing
 
 class ReceiptExtractor:
-    def __init__(self):
+    def __init__(self, backend: Optional[OCRBackend] = None):
+        # OCR engine, created on first use so parse-only extractors stay light
+        self._backend = backend
+
         # Enhanced patterns for better recognition
         self.price_pattern = r'\$?\d+\.\d{2}'
         self.quantity_pattern = r'(\d+)\s*@\s*\$?\d+\.\d{2}'
@@ -63,29 +86,127 @@ class ReceiptExtractor:
             'coupon'
         ]
 
+        # Precompiled matchers; each one scans a receipt's text once
+        self.amount_regex = re.compile(r'\$?(\d+\.\d{2})')
+        # Lines are scanned as one text, so quantities must not match across newlines
+        self.quantity_regex = re.compile(self.quantity_pattern.replace(r'\s', ' '))
+        self.date_regexes = [re.compile(pattern) for pattern in self.date_patterns]
+        # Every date pattern has a digit, a separator and a digit in a row
+        self.date_hint_regex = re.compile(r'\d[/-]\d')
+        self.leading_number_regex = re.compile(r'^[\d\s]+')
+        self.digits_only_regex = re.compile(r'^[\d\s]+$')
+        self.summary_regex = self._compile_keywords(
+            self.total_keywords + self.subtotal_keywords + self.tax_keywords
+        )
+        # One whole-word matcher for all keyword groups; the group that
+        # matched names the kind of line. Text is uppercased before
+        # matching, which is much cheaper than a case-insensitive scan.
+        self.keyword_regex = re.compile(
+            r'\b(?:' + '|'.join(
+                f'(?P<{kind}>' + '|'.join(re.escape(k.upper()) for k in keywords) + ')'
+                for kind, keywords in [
+                    (LINE_SUBTOTAL, self.subtotal_keywords),
+                    (LINE_TOTAL, self.total_keywords),
+                    (LINE_TAX, self.tax_keywords),
+                    (LINE_DISCOUNT, self.discount_keywords)
+                ]
+            ) + r')\b'
+        )
+
+    @staticmethod
+    def _compile_keywords(keywords: List[str]) -> re.Pattern:
+        return re.compile(
+            r'\b(?:' + '|'.join(re.escape(k) for k in keywords) + r')\b',
+            re.IGNORECASE
+        )
+
+    @property
+    def backend(self) -> OCRBackend:
+        if self._backend is None:
+            self._backend = create_backend()
+        return self._backend
+
     def extract_text(self, image) -> str:
-        """Extract text from preprocessed image using pytesseract."""
-        return pytesseract.image_to_string(image)
+        """Extract text from preprocessed image."""
+        return self.backend.image_to_text(image)
+
+    def extract_text_data(self, image) -> OCRResult:
+        """Extract words with boxes and confidences from a preprocessed image."""
+        return self.backend.image_to_data(image)
+
+    def is_consistent(self, receipt: Receipt, tolerance: float = 0.05) -> bool:
+        """Check that a parsed receipt has items and subtotal + tax matches total."""
+        if not receipt.items or receipt.total <= 0:
+            return False
+        # Receipts without a subtotal line are checked against the item sum
+        subtotal = receipt.subtotal or sum(item.price for item in receipt.items)
+        return abs(subtotal + receipt.tax - receipt.total) <= tolerance
 
     def extract_receipt_data(self, text: str) -> Receipt:
-        """Parse receipt text and extract structured data."""
-        # Clean and normalize text
-        lines = [line.strip() for line in text.split('\n') if line.strip()]
-        cleaned_lines = self._clean_text(lines)
-        
-        # Extract basic information
-        store_name = self._extract_store_name(cleaned_lines)
-        date = self._extract_date(text)
-        
-        # Extract items with quantities
-        items = self._extract_items(cleaned_lines)
-        
-        # Extract financial details
-        subtotal, tax, total = self._extract_totals(cleaned_lines)
-        
+        """Parse receipt text and extract structured data.
+
+        The text is normalized once and each precompiled pattern scans it
+        once; matches are mapped back to their lines by line start offset.
+        """
+        # Single spaces, no noise characters, uppercase
+        cleaned = '\n'.join(
+            ' '.join(line.split()) for line in text.split('\n')
+        ).translate(NOISE_CHARACTERS).upper()
+
+        kinds = self._classify_lines(cleaned)
+
+        quantities: Dict[int, int] = {}
+        if '@' in cleaned:
+            for match in self.quantity_regex.finditer(cleaned):
+                quantities.setdefault(self._line_start(cleaned, match), int(match.group(1)))
+
+        # Lines without an amount change neither items nor totals
+        line_amounts: Dict[int, List[re.Match]] = {}
+        for match in self.amount_regex.finditer(cleaned):
+            line_amounts.setdefault(self._line_start(cleaned, match), []).append(match)
+
+        items: List[ReceiptItem] = []
+        current_quantity = 1
+        subtotal = 0.0
+        total = 0.0
+        tax_amounts: List[float] = []
+
+        for start, amounts in line_amounts.items():
+            kind = kinds.get(start, LINE_ITEM)
+            if kind == LINE_TOTAL:
+                # Last amount on the line, largest total found
+                total = max(total, float(amounts[-1].group(1)))
+            elif kind == LINE_SUBTOTAL:
+                subtotal = max(subtotal, float(amounts[-1].group(1)))
+            elif kind == LINE_TAX:
+                tax_amounts.append(float(amounts[-1].group(1)))
+            elif kind == LINE_ITEM:
+                current_quantity = quantities.get(start, current_quantity)
+                # Description is everything before the first price
+                description = self._clean_description(cleaned[start:amounts[0].start()])
+                if description:
+                    items.append(ReceiptItem(
+                        description=description,
+                        price=float(amounts[0].group(1)),
+                        quantity=current_quantity
+                    ))
+                current_quantity = 1  # Reset quantity after each priced line
+
+        # Taxes are summed bottom-up, where they usually are
+        tax = sum(reversed(tax_amounts), 0.0)
+
+        # If we couldn't find some values, try to calculate them
+        if total == 0 and subtotal > 0 and tax > 0:
+            total = subtotal + tax
+        elif subtotal == 0 and total > 0 and tax > 0:
+            subtotal = total - tax
+        elif tax == 0 and total > 0 and subtotal > 0:
+            tax = total - subtotal
+
+        header = list(islice(filter(None, cleaned.split('\n')), 3))
         return Receipt(
-            store_name=store_name,
-            date=date,
+            store_name=self._extract_store_name(header),
+            date=self._extract_date(text),
             items=items,
             total=total,
             subtotal=subtotal,
@@ -93,145 +214,81 @@ class ReceiptExtractor:
             raw_text=text
         )
 
-    def _clean_text(self, lines: List[str]) -> List[str]:
-        """Clean and normalize text from receipt."""
-        cleaned = []
-        for line in lines:
-            # Remove multiple spaces
-            line = ' '.join(line.split())
-            # Remove common noise characters
-            line = re.sub(r'[*#]+', '', line)
-            # Convert to uppercase for consistency
-            line = line.upper()
-            if line:
-                cleaned.append(line)
-        return cleaned
+    @staticmethod
+    def _line_start(text: str, match: re.Match) -> int:
+        """Offset of the start of the line containing a match."""
+        return text.rfind('\n', 0, match.start()) + 1
+
+    def _classify_lines(self, cleaned: str) -> Dict[int, str]:
+        """Map the start offset of every keyword line to its kind.
+
+        A line with several keywords takes the highest-priority kind, e.g.
+        "SUB TOTAL" is a subtotal even though it contains "TOTAL". Lines
+        missing from the result are items (when priced) or noise.
+        """
+        kinds: Dict[int, str] = {}
+        for match in self.keyword_regex.finditer(cleaned):
+            start = self._line_start(cleaned, match)
+            kind = match.lastgroup
+            if start not in kinds or LINE_PRIORITY[kind] < LINE_PRIORITY[kinds[start]]:
+                kinds[start] = kind
+        return kinds
+
+    def _clean_description(self, text: str) -> str:
+        """Tidy the text before an item price; empty when it is not a usable description."""
+        description = ' '.join(text.split())
+        description = self.leading_number_regex.sub('', description)
+        if self.summary_regex.search(description):
+            return ''
+        return description
+
+    def _extract_date(self, text: str) -> datetime:
+        """Extract date from receipt text, defaulting to now."""
+        return self.find_date(text) or datetime.now()
+
+    def find_date(self, text: str) -> Optional[datetime]:
+        """Find the receipt date; earlier patterns take priority. None if there is none."""
+        if self.date_hint_regex.search(text):
+            for regex in self.date_regexes:
+                for match in regex.finditer(text):
+                    parsed = self._parse_date(match.group())
+                    if parsed is not None:
+                        return parsed
+        return None
+
+    @staticmethod
+    @lru_cache(maxsize=1024)
+    def _parse_date(date_str: str) -> Optional[datetime]:
+        """Try the supported date formats in order."""
+        for fmt in ['%m/%d/%Y', '%Y-%m-%d', '%d/%m/%Y']:
+            try:
+                return datetime.strptime(date_str, fmt)
+            except ValueError:
+                continue
+        return None
 
     def _extract_store_name(self, lines: List[str]) -> str:
-        """Extract store name using various heuristics."""
-        for i, line in enumerate(lines[:3]):  # Check first 3 lines
+        """Extract store name from the first cleaned lines using various heuristics."""
+        for line in lines[:3]:
             # Skip lines that look like dates or times
-            if any(re.search(pattern, line) for pattern in self.date_patterns):
+            if any(regex.search(line) for regex in self.date_regexes):
                 continue
             # Skip lines that are too long (usually not store names)
             if len(line) > 30:
                 continue
             # Skip lines with prices
-            if re.search(self.price_pattern, line):
+            if self.amount_regex.search(line):
                 continue
             # Skip lines that are just numbers
-            if re.match(r'^[\d\s]+$', line):
+            if self.digits_only_regex.match(line):
                 continue
             return line.strip()
         return "Unknown Store"
 
-    def _extract_date(self, text: str) -> datetime:
-        """Extract date from receipt text."""
-        for pattern in self.date_patterns:
-            matches = re.finditer(pattern, text)
-            for match in matches:
-                try:
-                    date_str = match.group()
-                    # Try different date formats
-                    for fmt in ['%m/%d/%Y', '%Y-%m-%d', '%d/%m/%Y']:
-                        try:
-                            return datetime.strptime(date_str, fmt)
-                        except ValueError:
-                            continue
-                except ValueError:
-                    continue
-        return datetime.now()
-
-    def _extract_items(self, lines: List[str]) -> List[ReceiptItem]:
-        """Extract items and their prices from receipt."""
-        items = []
-        current_quantity = 1
-        
-        for line in lines:
-            # Skip lines that look like totals or discounts
-            if any(keyword in line.upper() for keyword in 
-                  self.total_keywords + self.subtotal_keywords + 
-                  self.tax_keywords + self.discount_keywords):
-                continue
-
-            # Check for quantity notation
-            qty_match = re.search(self.quantity_pattern, line)
-            if qty_match:
-                current_quantity = int(qty_match.group(1))
-            
-            # Extract price
-            price_match = re.search(self.price_pattern, line)
-            if price_match:
-                price_str = price_match.group()
-                try:
-                    price = float(price_str.replace('$', ''))
-                    # Get description (everything before the price)
-                    description = line[:price_match.start()].strip()
-                    
-                    # Clean up description
-                    description = re.sub(r'\s+', ' ', description)
-                    description = re.sub(r'^[\d\s]+', '', description)  # Remove leading numbers
-                    
-                    if description and not any(keyword in description.upper() 
-                                            for keyword in self.total_keywords + 
-                                            self.subtotal_keywords + 
-                                            self.tax_keywords):
-                        items.append(ReceiptItem(
-                            description=description,
-                            price=price,
-                            quantity=current_quantity
-                        ))
-                    current_quantity = 1  # Reset quantity
-                except ValueError:
-                    continue
-        
-        return items
-
-    def _extract_totals(self, lines: List[str]) -> Tuple[float, float, float]:
-        """Extract subtotal, tax, and total amounts from receipt."""
-        subtotal = 0.0
-        tax = 0.0
-        total = 0.0
-        
-        # Process lines in reverse (totals usually at bottom)
-        for line in reversed(lines):
-            line_upper = line.upper()
-            
-            # Extract total first
-            if any(keyword in line_upper for keyword in self.total_keywords):
-                if 'SUBTOTAL' not in line_upper:  # Skip subtotal lines
-                    amount = self._extract_amount(line)
-                    if amount > total:  # Take the largest total found
-                        total = amount
-            
-            # Extract subtotal
-            elif any(keyword in line_upper for keyword in self.subtotal_keywords):
-                amount = self._extract_amount(line)
-                if amount > subtotal:  # Take the largest subtotal found
-                    subtotal = amount
-            
-            # Extract tax
-            elif any(keyword in line_upper for keyword in self.tax_keywords):
-                amount = self._extract_amount(line)
-                tax += amount  # Sum up all tax amounts
-        
-        # If we couldn't find some values, try to calculate them
-        if total == 0 and subtotal > 0 and tax > 0:
-            total = subtotal + tax
-        elif subtotal == 0 and total > 0 and tax > 0:
-            subtotal = total - tax
-        elif tax == 0 and total > 0 and subtotal > 0:
-            tax = total - subtotal
-        
-        return subtotal, tax, total
-
     def _extract_amount(self, line: str) -> float:
         """Extract dollar amount from a line of text."""
-        amounts = re.findall(r'\$?(\d+\.\d{2})', line)
+        amounts = self.amount_regex.findall(line)
         if amounts:
-            try:
-                # Return the last number in the line (usually the total)
-                return float(amounts[-1])
-            except ValueError:
-                pass
-        return 0.0
\ No newline at end of file
+            # Return the last number in the line (usually the total)
+            return float(amounts[-1])
+        return 0.0
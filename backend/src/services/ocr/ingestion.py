@@ -0,0 +1,85 @@
+# backend/src/services/ocr/ingestion.py
+import io
+import os
+import warnings
+from typing import Tuple
+import cv2
+import numpy as np
+from PIL import Image
+from .preprocessing import ImagePreprocessor, OCR_MAX_PIXELS
+
+# Uploads above these limits are rejected before any pixels are decoded
+OCR_MAX_UPLOAD_BYTES = int(os.getenv("OCR_MAX_UPLOAD_BYTES", str(20 * 1024 * 1024)))
+OCR_MAX_SOURCE_PIXELS = int(os.getenv("OCR_MAX_SOURCE_PIXELS", "60000000"))
+# A decoder reduction may undershoot the pixel budget down to this share of it
+OCR_MIN_DECODE_SHARE = float(os.getenv("OCR_MIN_DECODE_SHARE", "0.7"))
+
+# Decoder-side downscaling (DCT scaling for JPEG), largest reduction first
+REDUCED_GRAYSCALE_FLAGS = [
+    (8, cv2.IMREAD_REDUCED_GRAYSCALE_8),
+    (4, cv2.IMREAD_REDUCED_GRAYSCALE_4),
+    (2, cv2.IMREAD_REDUCED_GRAYSCALE_2),
+    (1, cv2.IMREAD_GRAYSCALE)
+]
+
+class ImageRejectedError(ValueError):
+    """Raised when an upload is not a decodable image."""
+
+class ImageTooLargeError(ImageRejectedError):
+    """Raised when an upload exceeds the byte or pixel limits."""
+
+def read_image_size(contents: bytes) -> Tuple[int, int]:
+    """Validate an upload and return its (width, height) from the header only."""
+    if len(contents) > OCR_MAX_UPLOAD_BYTES:
+        raise ImageTooLargeError(
+            f"Image is {len(contents)} bytes, limit is {OCR_MAX_UPLOAD_BYTES}"
+        )
+
+    try:
+        with warnings.catch_warnings():
+            # We apply our own, stricter pixel limit below
+            warnings.simplefilter("ignore", Image.DecompressionBombWarning)
+            with Image.open(io.BytesIO(contents)) as img:
+                width, height = img.size
+    except Image.DecompressionBombError as e:
+        raise ImageTooLargeError(str(e))
+    except Exception:
+        raise ImageRejectedError("Invalid image file")
+
+    if width * height > OCR_MAX_SOURCE_PIXELS:
+        raise ImageTooLargeError(
+            f"Image is {width}x{height} pixels, limit is {OCR_MAX_SOURCE_PIXELS} pixels"
+        )
+    return width, height
+
+def decode_receipt_image(contents: bytes, max_pixels: int = OCR_MAX_PIXELS) -> np.ndarray:
+    """Decode an upload straight to grayscale at no more than max_pixels.
+
+    Large JPEGs are scaled down inside the decoder, so a 12MP photo never
+    exists in memory at full resolution. The decoder only halves, so the
+    reduction closest to the budget is used even when it lands slightly
+    below it (down to ``OCR_MIN_DECODE_SHARE`` of max_pixels): a 12MP
+    photo decodes at 3MP for a 4MP budget instead of decoding in full.
+    """
+    width, height = read_image_size(contents)
+
+    # Largest decoder reduction that still leaves most of max_pixels
+    flag = cv2.IMREAD_GRAYSCALE
+    for factor, reduced_flag in REDUCED_GRAYSCALE_FLAGS:
+        if width * height / (factor * factor) >= OCR_MIN_DECODE_SHARE * max_pixels:
+            flag = reduced_flag
+            break
+
+    image = cv2.imdecode(np.frombuffer(contents, np.uint8), flag)
+    if image is None:
+        raise ImageRejectedError("Invalid image file")
+
+    return ImagePreprocessor.fit_pixel_budget(image, max_pixels)
+
+def decode_thumbnail(contents: bytes) -> np.ndarray:
+    """Decode a small grayscale preview (1/8 scale) for hashing."""
+    read_image_size(contents)
+    image = cv2.imdecode(np.frombuffer(contents, np.uint8), cv2.IMREAD_REDUCED_GRAYSCALE_8)
+    if image is None:
+        raise ImageRejectedError("Invalid image file")
+    return image
@@ -0,0 +1,118 @@
+# backend/src/services/ocr/ocr_result.py
+import struct
+import zlib
+from dataclasses import dataclass, field
+from typing import Any, Dict, List
+import numpy as np
+
+# Compact binary format: magic + word count, then a zlib stream of
+# boxes (int32 x4), confidences (float32), line ids (int32),
+# UTF-8 text lengths (int32) and the concatenated UTF-8 text.
+_MAGIC = b"OCR\x01"
+_HEADER = struct.Struct("<4sI")
+
+@dataclass
+class OCRWord:
+    text: str
+    left: int
+    top: int
+    width: int
+    height: int
+    confidence: float  # 0-100 as reported by Tesseract
+    line_id: int
+
+@dataclass
+class OCRResult:
+    words: List[OCRWord] = field(default_factory=list)
+
+    @property
+    def text(self) -> str:
+        """Rebuild the text with one output line per OCR line."""
+        lines: List[List[str]] = []
+        current_line = None
+        for word in self.words:
+            if word.line_id != current_line:
+                lines.append([])
+                current_line = word.line_id
+            lines[-1].append(word.text)
+        return "\n".join(" ".join(line) for line in lines)
+
+    @property
+    def mean_confidence(self) -> float:
+        """Average word confidence, 0.0 when nothing was recognised."""
+        if not self.words:
+            return 0.0
+        return sum(word.confidence for word in self.words) / len(self.words)
+
+    @classmethod
+    def from_tesseract_data(cls, data: Dict[str, List[Any]]) -> "OCRResult":
+        """Build a result from ``pytesseract.image_to_data(..., output_type=Output.DICT)``."""
+        words = []
+        line_ids: Dict[tuple, int] = {}
+
+        for i, text in enumerate(data["text"]):
+            confidence = float(data["conf"][i])
+            text = str(text).strip()
+            # Structural rows (pages, blocks, lines) carry conf -1 and no text
+            if not text or confidence < 0:
+                continue
+
+            line_key = (data["block_num"][i], data["par_num"][i], data["line_num"][i])
+            line_id = line_ids.setdefault(line_key, len(line_ids))
+            words.append(OCRWord(
+                text=text,
+                left=int(data["left"][i]),
+                top=int(data["top"][i]),
+                width=int(data["width"][i]),
+                height=int(data["height"][i]),
+                confidence=confidence,
+                line_id=line_id
+            ))
+
+        return cls(words=words)
+
+    def to_bytes(self, level: int = 6) -> bytes:
+        """Serialize to the compact binary format stored with each receipt."""
+        encoded = [word.text.encode("utf-8") for word in self.words]
+        boxes = np.array(
+            [(w.left, w.top, w.width, w.height) for w in self.words], dtype="<i4"
+        ).reshape(-1, 4)
+        confidences = np.array([w.confidence for w in self.words], dtype="<f4")
+        line_ids = np.array([w.line_id for w in self.words], dtype="<i4")
+        lengths = np.array([len(text) for text in encoded], dtype="<i4")
+
+        body = b"".join([
+            boxes.tobytes(), confidences.tobytes(), line_ids.tobytes(),
+            lengths.tobytes(), b"".join(encoded)
+        ])
+        return _HEADER.pack(_MAGIC, len(self.words)) + zlib.compress(body, level)
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "OCRResult":
+        """Rebuild a result written by ``to_bytes``."""
+        magic, count = _HEADER.unpack_from(data)
+        if magic != _MAGIC:
+            raise ValueError("Not a serialized OCR result")
+
+        body = zlib.decompress(data[_HEADER.size:])
+        offset = 0
+
+        def take(dtype: str, size: int) -> np.ndarray:
+            nonlocal offset
+            array = np.frombuffer(body, dtype=dtype, count=size, offset=offset)
+            offset += array.nbytes
+            return array
+
+        boxes = take("<i4", count * 4).reshape(count, 4).tolist()
+        confidences = take("<f4", count).tolist()
+        line_ids = take("<i4", count).tolist()
+        lengths = take("<i4", count).tolist()
+
+        words = []
+        for i in range(count):
+            text = body[offset:offset + lengths[i]].decode("utf-8")
+            offset += lengths[i]
+            left, top, width, height = boxes[i]
+            words.append(OCRWord(text, left, top, width, height, confidences[i], line_ids[i]))
+
+        return cls(words=words)
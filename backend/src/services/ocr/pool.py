@@ -0,0 +1,179 @@
+# backend/src/services/ocr/pool.py
+import asyncio
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+from rich.console import Console
+
+console = Console()
+
+# Pool configuration
+OCR_WORKERS = int(os.getenv("OCR_WORKERS", str(os.cpu_count() or 1)))
+OCR_QUEUE_SIZE = int(os.getenv("OCR_QUEUE_SIZE", "16"))
+OCR_STAGE_TIMEOUTS = {
+    "decode": float(os.getenv("OCR_DECODE_TIMEOUT", "10")),
+    "hash": float(os.getenv("OCR_HASH_TIMEOUT", "5")),
+    "fast_pass": float(os.getenv("OCR_FAST_PASS_TIMEOUT", "15")),
+    "preprocess": float(os.getenv("OCR_PREPROCESS_TIMEOUT", "20")),
+    "extract": float(os.getenv("OCR_EXTRACT_TIMEOUT", "30")),
+}
+DEFAULT_STAGE_TIMEOUT = 30.0
+
+class OCRQueueFullError(Exception):
+    """Raised when every worker is busy and the wait queue is full."""
+
+class OCRStageTimeoutError(Exception):
+    """Raised when a pool stage does not finish within its timeout."""
+
+class OCRWorkerPool:
+    """Process pool for the CPU-bound OCR stages.
+
+    Jobs beyond ``max_workers + queue_size`` in flight are rejected instead of
+    piling up, and every stage is awaited with its own timeout so the event
+    loop stays free while the work runs in another process. With
+    ``max_workers=0`` stages run inline, which is handy for debugging tools.
+    """
+
+    def __init__(
+        self,
+        max_workers: int = OCR_WORKERS,
+        queue_size: int = OCR_QUEUE_SIZE,
+        timeouts: Optional[Dict[str, float]] = None,
+        initializer: Optional[Callable[[], None]] = None
+    ):
+        self.max_workers = max_workers
+        self.queue_size = queue_size
+        self.timeouts = {**OCR_STAGE_TIMEOUTS, **(timeouts or {})}
+        # Runs once in each worker process, e.g. to load the OCR engine
+        self.initializer = initializer
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._in_flight = 0
+        # Slots are released from executor threads when a job really ends
+        self._lock = threading.Lock()
+
+    @property
+    def capacity(self) -> int:
+        """Maximum number of stages running or waiting at once."""
+        return max(self.max_workers, 1) + self.queue_size
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    def _get_executor(self) -> Optional[ProcessPoolExecutor]:
+        """Create the executor lazily so importing the service stays cheap."""
+        if self._executor is None and self.max_workers > 0:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.max_workers, initializer=self.initializer
+            )
+        return self._executor
+
+    async def run(self, stage: str, fn: Callable, *args: Any) -> Any:
+        """Run ``fn(*args)`` in a worker process under the stage timeout.
+
+        ``fn`` must be a module-level function so it can be pickled. A job
+        keeps its slot until the worker finishes it, even after the caller
+        has stopped waiting on a timeout, so timed-out jobs still count
+        against ``capacity``.
+        """
+        self._admit()
+
+        executor = self._get_executor()
+        if executor is None:
+            try:
+                return fn(*args)
+            finally:
+                self._release()
+
+        try:
+            future = executor.submit(fn, *args)
+        except Exception:
+            self._release()
+            raise
+        future.add_done_callback(lambda _: self._release())
+        return await self._wait(stage, future)
+
+    async def run_group(
+        self, stage: str, fn: Callable, arg_lists: Sequence[Tuple[Any, ...]],
+        parallel: Optional[int] = None
+    ) -> List[Any]:
+        """Run ``fn`` over the parts of one request under a single slot.
+
+        The parts (e.g. the strips of a tall receipt) are admitted as one
+        job, so a long receipt cannot fill the queue on its own. At most
+        ``parallel`` parts run at once, by default one per worker. The slot
+        is held until the last submitted part has ended in its worker.
+        """
+        self._admit()
+
+        executor = self._get_executor()
+        if executor is None:
+            try:
+                return [fn(*args) for args in arg_lists]
+            finally:
+                self._release()
+
+        # The group itself plus every part still running in a worker
+        outstanding = [1]
+
+        def part_done(_=None):
+            with self._lock:
+                outstanding[0] -= 1
+                finished = outstanding[0] == 0
+            if finished:
+                self._release()
+
+        semaphore = asyncio.Semaphore(parallel or max(self.max_workers, 1))
+
+        async def run_part(args: Tuple[Any, ...]) -> Any:
+            async with semaphore:
+                with self._lock:
+                    outstanding[0] += 1
+                try:
+                    future = executor.submit(fn, *args)
+                except Exception:
+                    part_done()
+                    raise
+                future.add_done_callback(part_done)
+                return await self._wait(stage, future)
+
+        tasks = [asyncio.ensure_future(run_part(args)) for args in arg_lists]
+        try:
+            return await asyncio.gather(*tasks)
+        except BaseException:
+            # Parts still waiting for their turn are not submitted
+            for task in tasks:
+                task.cancel()
+            raise
+        finally:
+            part_done()
+
+    def _admit(self):
+        with self._lock:
+            if self._in_flight >= self.capacity:
+                raise OCRQueueFullError(
+                    f"OCR queue is full ({self._in_flight} jobs in flight)"
+                )
+            self._in_flight += 1
+
+    async def _wait(self, stage: str, future) -> Any:
+        timeout = self.timeouts.get(stage, DEFAULT_STAGE_TIMEOUT)
+        try:
+            return await asyncio.wait_for(asyncio.wrap_future(future), timeout=timeout)
+        except asyncio.TimeoutError:
+            # The worker keeps going until the stage ends; we only stop waiting
+            raise OCRStageTimeoutError(
+                f"OCR stage '{stage}' timed out after {timeout:.1f}s"
+            )
+
+    def _release(self):
+        with self._lock:
+            self._in_flight -= 1
+
+    def shutdown(self):
+        """Stop the worker processes."""
+        if self._executor is not None:
+            console.print("Shutting down OCR worker pool...", style="yellow")
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
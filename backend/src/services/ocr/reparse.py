@@ -0,0 +1,124 @@
+# backend/src/services/ocr/reparse.py
+"""Bulk re-parsing of stored receipts from their word-level OCR output."""
+import os
+from dataclasses import dataclass
+from typing import Callable, Optional
+from sqlalchemy.orm import Session, selectinload
+from rich.console import Console
+from .extractor import ReceiptExtractor
+from .ocr_result import OCRResult
+from database.models import (
+    Receipt as ReceiptRecord, ReceiptItem as ReceiptItemRecord, CategoryType
+)
+
+console = Console()
+
+REPARSE_CHUNK_SIZE = int(os.getenv("REPARSE_CHUNK_SIZE", "500"))
+
+@dataclass
+class ReparseStats:
+    scanned: int = 0
+    updated: int = 0
+    failed: int = 0
+    last_id: int = 0  # resume point: pass as after_id to continue
+
+class ReceiptReparser:
+    """Re-run ``ReceiptExtractor`` over ``receipts.ocr_data`` without touching OCR.
+
+    Receipts are walked in id order in chunks of ``chunk_size``; each chunk
+    is committed and then dropped from the session so memory stays flat
+    over the whole corpus. Only receipts whose parsed fields changed are
+    written.
+    """
+
+    def __init__(
+        self,
+        extractor: Optional[ReceiptExtractor] = None,
+        chunk_size: int = REPARSE_CHUNK_SIZE
+    ):
+        self.extractor = extractor or ReceiptExtractor()
+        self.chunk_size = chunk_size
+
+    def run(
+        self,
+        db: Session,
+        after_id: int = 0,
+        limit: Optional[int] = None,
+        dry_run: bool = False,
+        on_chunk: Optional[Callable[[ReparseStats], None]] = None
+    ) -> ReparseStats:
+        """Re-parse every receipt with stored OCR output and an id above after_id."""
+        stats = ReparseStats(last_id=after_id)
+
+        while limit is None or stats.scanned < limit:
+            size = self.chunk_size if limit is None else min(self.chunk_size, limit - stats.scanned)
+            chunk = db.query(ReceiptRecord).options(
+                selectinload(ReceiptRecord.items)
+            ).filter(
+                ReceiptRecord.id > stats.last_id,
+                ReceiptRecord.ocr_data.isnot(None)
+            ).order_by(ReceiptRecord.id).limit(size).all()
+            if not chunk:
+                break
+
+            for record in chunk:
+                stats.scanned += 1
+                stats.last_id = record.id
+                try:
+                    if self.reparse(record):
+                        stats.updated += 1
+                except Exception as e:
+                    stats.failed += 1
+                    console.print(f"[red]Failed to re-parse receipt {record.id}: {str(e)}")
+
+            if dry_run:
+                db.rollback()
+            else:
+                db.commit()
+            db.expunge_all()
+
+            if on_chunk:
+                on_chunk(stats)
+
+        return stats
+
+    def reparse(self, record: ReceiptRecord) -> bool:
+        """Update one stored receipt from its OCR output; return whether it changed."""
+        text = OCRResult.from_bytes(record.ocr_data).text
+        parsed = self.extractor.extract_receipt_data(text)
+        # Keep the stored date when the text has none instead of using today
+        date = self.extractor.find_date(text) or record.date
+
+        changed = False
+        for field, value in [
+            ("store_name", parsed.store_name),
+            ("date", date),
+            ("subtotal", parsed.subtotal),
+            ("tax", parsed.tax),
+            ("total", parsed.total),
+            ("raw_text", text)
+        ]:
+            if getattr(record, field) != value:
+                setattr(record, field, value)
+                changed = True
+
+        old_items = [(item.description, item.quantity, item.price) for item in record.items]
+        new_items = [(item.description, item.quantity, item.price) for item in parsed.items]
+        if old_items != new_items:
+            # Keep categories already assigned to items that are still there
+            categories = {}
+            for item in record.items:
+                categories.setdefault(item.description, item.category)
+
+            record.items = [
+                ReceiptItemRecord(
+                    description=description,
+                    quantity=quantity,
+                    price=price,
+                    category=categories.get(description, CategoryType.MISCELLANEOUS)
+                )
+                for description, quantity, price in new_items
+            ]
+            changed = True
+
+        return changed
@@ -1,35 +1,118 @@
 # backend/src/services/ocr/service.py
 from .preprocessing import ImagePreprocessor
 from .extractor import ReceiptExtractor, Receipt
-from ..categorization.classifier import ExpenseClassifier
+from .cache import ReceiptResultCache
+from .dedup import NearDuplicateDetector, same_receipt
+from .pool import OCRWorkerPool, OCRQueueFullError, OCRStageTimeoutError
+from . import stages, tiling
+from .ocr_result import OCRResult
+from ..categorization.classifier import ExpenseClassifier, ClassifiedItem
 import numpy as np
-from typing import Optional
+from typing import AsyncIterator, Optional, Tuple
+from sqlalchemy.orm import Session
 import os
 from rich.console import Console
 
 console = Console()
 
+# Cascade: try a cheap OCR pass before denoise + deskew
+OCR_CASCADE = os.getenv("OCR_CASCADE", "true").lower() == "true"
+OCR_CASCADE_MIN_CONFIDENCE = float(os.getenv("OCR_CASCADE_MIN_CONFIDENCE", "75"))
+
 class OCRService:
-    def __init__(self):
+    def __init__(
+        self,
+        pool: Optional[OCRWorkerPool] = None,
+        cascade: bool = OCR_CASCADE,
+        min_confidence: float = OCR_CASCADE_MIN_CONFIDENCE
+    ):
         self.preprocessor = ImagePreprocessor()
         self.extractor = ReceiptExtractor()
+        # CPU-bound stages run in worker processes to keep the event loop free
+        self.pool = pool or OCRWorkerPool(initializer=stages.warm_up)
+        self.cascade = cascade
+        self.min_confidence = min_confidence
+        # Processed results keyed on the uploaded image bytes
+        self.cache = ReceiptResultCache()
+        # Perceptual hashes of earlier uploads, per user
+        self.duplicates = NearDuplicateDetector()
         self.classifier = ExpenseClassifier(
             api_key=os.getenv("OPENAI_API_KEY")
         )
 
-    async def process_receipt(self, image: np.ndarray) -> Optional[Receipt]:
-        """Process receipt image with LLM-based classification."""
-        try:
-            console.print("\n=== Processing Receipt ===", style="bold blue")
-            
+    async def decode_image(self, contents: bytes) -> np.ndarray:
+        """Decode uploaded bytes in the worker pool (grayscale, within the pixel budget)."""
+        return await self.pool.run("decode", stages.decode, contents)
+
+    async def image_hash(self, contents: bytes) -> int:
+        """Perceptual hash of an upload's thumbnail, computed in the worker pool."""
+        return await self.pool.run("hash", stages.thumbnail_hash, contents)
+
+    async def confirm_duplicate(self, image: np.ndarray, candidate: Receipt) -> Tuple[bool, OCRResult]:
+        """Check a near-duplicate hint against the new upload's text.
+
+        A fast OCR pass of ``image`` must show the candidate's total and most
+        of its item prices. The OCR result is returned so that, when the
+        hint is rejected, ``read_receipt`` can reuse it as its fast pass.
+        """
+        console.print("Checking near-duplicate against a fast OCR pass...", style="yellow")
+        ocr_result = await self.pool.run("fast_pass", stages.fast_pass, image)
+        parsed = self.extractor.extract_receipt_data(ocr_result.text)
+        return same_receipt(parsed, candidate), ocr_result
+
+    async def _fast_pass(self, image: np.ndarray, ocr_result: Optional[OCRResult] = None) -> Optional[Receipt]:
+        """Try the cheap OCR tier; return None when the result needs the full pipeline."""
+        if ocr_result is None:
+            console.print("Running fast OCR pass...", style="yellow")
+            ocr_result = await self.pool.run("fast_pass", stages.fast_pass, image)
+        receipt_data = self.extractor.extract_receipt_data(ocr_result.text)
+
+        if (ocr_result.mean_confidence >= self.min_confidence and
+                self.extractor.is_consistent(receipt_data)):
+            receipt_data.ocr_tier = "fast"
+            receipt_data.ocr_result = ocr_result
+            return receipt_data
+
+        console.print(
+            f"Fast pass not good enough (confidence {ocr_result.mean_confidence:.1f}), "
+            "escalating to full preprocessing...",
+            style="yellow"
+        )
+        return None
+
+    async def _extract_text_data(self, image: np.ndarray) -> OCRResult:
+        """OCR a preprocessed image, splitting tall receipts into strips run in parallel."""
+        if image.shape[0] <= tiling.OCR_STRIP_MIN_HEIGHT:
+            return await self.pool.run("extract", stages.extract_text_data, image)
+
+        strips = tiling.find_strips(image)
+        console.print(f"Tall receipt: OCR in {len(strips)} strips...", style="yellow")
+        # All strips of one receipt share one admission slot
+        results = await self.pool.run_group("extract", stages.extract_text_data, [
+            (image[strip.top:strip.bottom],) for strip in strips
+        ])
+        return tiling.stitch(strips, results)
+
+    async def read_receipt(self, image: np.ndarray, fast_ocr: Optional[OCRResult] = None) -> Optional[Receipt]:
+        """OCR and parse a receipt image without classifying its items.
+
+        ``fast_ocr`` is an already computed fast pass of ``image`` (see
+        ``confirm_duplicate``) used instead of running it again.
+        """
+        receipt_data = None
+        if self.cascade:
+            receipt_data = await self._fast_pass(image, fast_ocr)
+
+        if receipt_data is None:
             # Preprocess image
             console.print("Preprocessing image...", style="yellow")
-            preprocessed = self.preprocessor.preprocess_receipt(image)
-            
+            preprocessed = await self.pool.run("preprocess", stages.preprocess, image)
+
             # Extract text
             console.print("Extracting text...", style="yellow")
-            text = self.extractor.extract_text(preprocessed)
-            
+            ocr_result = await self._extract_text_data(preprocessed)
+            text = ocr_result.text
+
             if not text.strip():
                 console.print("[red]No text extracted from image")
                 return None
@@ -37,6 +120,27 @@ class OCRService:
             # Extract receipt data
             console.print("Parsing receipt data...", style="yellow")
             receipt_data = self.extractor.extract_receipt_data(text)
+            receipt_data.ocr_tier = "full"
+            receipt_data.ocr_result = ocr_result
+
+        return receipt_data
+
+    async def process_receipt(
+        self, image: np.ndarray, db: Optional[Session] = None, rules=None,
+        fast_ocr: Optional[OCRResult] = None
+    ) -> Optional[Receipt]:
+        """Process receipt image with LLM-based classification.
+
+        With a database session, item classifications are also cached in
+        and looked up from the shared classification cache table. ``rules``
+        (the user's compiled rules) decide matching items before any model.
+        """
+        try:
+            console.print("\n=== Processing Receipt ===", style="bold blue")
+
+            receipt_data = await self.read_receipt(image, fast_ocr)
+            if receipt_data is None:
+                return None
             
             # Classify items
             console.print("Classifying items...", style="yellow")
@@ -46,13 +150,16 @@ class OCRService:
                     "price": item.price
                 } for item in receipt_data.items],
                 store_name=receipt_data.store_name,
-                total_amount=receipt_data.total
+                total_amount=receipt_data.total,
+                db=db,
+                rules=rules
             )
             
             # Update items with categories
             console.print("\nClassification Results:", style="bold green")
             for item, classified in zip(receipt_data.items, classified_items):
                 item.category = classified.category
+                item.confidence = classified.confidence
                 console.print(
                     f"Item: {classified.description}\n"
                     f"Category: {classified.category.value}\n"
@@ -62,6 +169,31 @@ class OCRService:
             
             return receipt_data
 
+        except (OCRQueueFullError, OCRStageTimeoutError):
+            # Let the caller map capacity problems to the right HTTP status
+            raise
         except Exception as e:
             console.print(f"[red]Error processing receipt: {str(e)}")
-            return None
\ No newline at end of file
+            return None
+
+    async def stream_classification(
+        self, receipt_data: Receipt, db: Optional[Session] = None, rules=None
+    ) -> AsyncIterator[Tuple[int, ClassifiedItem]]:
+        """Classify a parsed receipt's items, yielding ``(index, item)`` as each completes.
+
+        Categories are also set on ``receipt_data.items`` as they arrive.
+        """
+        async for index, classified in self.classifier.stream_classify_items(
+            items=[{
+                "description": item.description,
+                "price": item.price
+            } for item in receipt_data.items],
+            store_name=receipt_data.store_name,
+            total_amount=receipt_data.total,
+            db=db,
+            rules=rules
+        ):
+            item = receipt_data.items[index]
+            item.category = classified.category
+            item.confidence = classified.confidence
+            yield index, classified
@@ -0,0 +1,42 @@
+# backend/src/services/ocr/stages.py
+"""Module-level OCR stage functions executed inside pool worker processes."""
+import numpy as np
+from typing import Optional
+from .preprocessing import ImagePreprocessor
+from .ingestion import decode_receipt_image, decode_thumbnail
+from .dedup import perceptual_hash
+from .extractor import ReceiptExtractor
+from .ocr_result import OCRResult
+
+# One extractor per worker process, created on first use
+_extractor: Optional[ReceiptExtractor] = None
+
+def _get_extractor() -> ReceiptExtractor:
+    global _extractor
+    if _extractor is None:
+        _extractor = ReceiptExtractor()
+    return _extractor
+
+def warm_up():
+    """Pool initializer: load the OCR engine before the first job arrives."""
+    _get_extractor().backend
+
+def decode(contents: bytes) -> np.ndarray:
+    """Decode uploaded bytes to a grayscale image within the pixel budget."""
+    return decode_receipt_image(contents)
+
+def thumbnail_hash(contents: bytes) -> int:
+    """Perceptual hash of a 1/8-scale grayscale decode of the upload."""
+    return perceptual_hash(decode_thumbnail(contents))
+
+def preprocess(image: np.ndarray) -> np.ndarray:
+    """Run the full preprocessing pipeline on a decoded image."""
+    return ImagePreprocessor.preprocess_receipt(image)
+
+def fast_pass(image: np.ndarray) -> OCRResult:
+    """Cheap cascade tier: Otsu threshold and OCR with word confidences."""
+    return _get_extractor().extract_text_data(ImagePreprocessor.fast_preprocess(image))
+
+def extract_text_data(image: np.ndarray) -> OCRResult:
+    """Run Tesseract on a preprocessed image, keeping word confidences."""
+    return _get_extractor().extract_text_data(image)
@@ -0,0 +1,89 @@
+# backend/src/services/ocr/tiling.py
+"""Split tall receipts into horizontal strips that can be OCR'd in parallel."""
+import os
+from dataclasses import dataclass
+from typing import List, Sequence
+import numpy as np
+from .ocr_result import OCRResult, OCRWord
+
+# Images taller than this are tiled
+OCR_STRIP_MIN_HEIGHT = int(os.getenv("OCR_STRIP_MIN_HEIGHT", "3000"))
+OCR_STRIP_HEIGHT = int(os.getenv("OCR_STRIP_HEIGHT", "1500"))
+# Extra rows on each side of a cut so a line split by a bad cut is whole in one strip
+OCR_STRIP_OVERLAP = int(os.getenv("OCR_STRIP_OVERLAP", "60"))
+
+@dataclass
+class Strip:
+    top: int  # first row of the slice handed to OCR
+    bottom: int  # one past the last row of the slice
+    own_top: int  # words centred in [own_top, own_bottom) belong to this strip
+    own_bottom: int
+
+def find_strips(
+    image: np.ndarray,
+    strip_height: int = OCR_STRIP_HEIGHT,
+    overlap: int = OCR_STRIP_OVERLAP
+) -> List[Strip]:
+    """Plan strips of roughly strip_height rows, cutting at whitespace between lines.
+
+    Each cut is placed at the row with the least ink in the last quarter of
+    the strip, preferring the middle of a blank gap, so text lines are
+    rarely split.
+    """
+    height = image.shape[0]
+    if height <= strip_height:
+        return [Strip(0, height, 0, height)]
+
+    # Binarised input: dark pixels are text
+    ink = np.count_nonzero(image < 128, axis=1)
+    cuts = [0]
+    while height - cuts[-1] > strip_height:
+        window_start = cuts[-1] + strip_height * 3 // 4
+        window = ink[window_start:cuts[-1] + strip_height]
+        blank = np.flatnonzero(window == window.min())
+        # Middle of the widest run of emptiest rows
+        runs = np.split(blank, np.flatnonzero(np.diff(blank) > 1) + 1)
+        widest = max(runs, key=len)
+        cuts.append(window_start + int(widest[len(widest) // 2]))
+    cuts.append(height)
+
+    return [
+        Strip(
+            top=max(own_top - overlap, 0),
+            bottom=min(own_bottom + overlap, height),
+            own_top=own_top,
+            own_bottom=own_bottom
+        )
+        for own_top, own_bottom in zip(cuts, cuts[1:])
+    ]
+
+def stitch(strips: Sequence[Strip], results: Sequence[OCRResult]) -> OCRResult:
+    """Merge per-strip OCR results into one result in page coordinates.
+
+    Words seen twice in the overlap are kept only by the strip that owns
+    their vertical centre; line ids are renumbered to stay unique.
+    """
+    words: List[OCRWord] = []
+    line_offset = 0
+
+    for strip, result in zip(strips, results):
+        max_line = -1
+        for word in result.words:
+            top = word.top + strip.top
+            centre = top + word.height / 2
+            if not strip.own_top <= centre < strip.own_bottom:
+                continue
+
+            max_line = max(max_line, word.line_id)
+            words.append(OCRWord(
+                text=word.text,
+                left=word.left,
+                top=top,
+                width=word.width,
+                height=word.height,
+                confidence=word.confidence,
+                line_id=line_offset + word.line_id
+            ))
+        line_offset += max_line + 1
+
+    return OCRResult(words=words)
@@ -0,0 +1,90 @@
+# backend/src/services/pdf_processing/layout.py
+"""One word-level layout pass per PDF page, shared by table and text parsing."""
+from bisect import bisect_right
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+# Words whose tops differ by at most this many points share a line
+LINE_TOLERANCE = 3.0
+
+@dataclass
+class PageLayout:
+    tables: List[List[List[Optional[str]]]] = field(default_factory=list)  # shaped like extract_tables()
+    lines: List[str] = field(default_factory=list)  # text outside every table, top to bottom
+
+    @property
+    def text(self) -> str:
+        return "\n".join(self.lines)
+
+def group_lines(words: List[Dict], tolerance: float = LINE_TOLERANCE) -> List[List[Dict]]:
+    """Words clustered into lines by ``top``, each line left to right."""
+    lines: List[List[Dict]] = []
+    line_top = None
+    for word in sorted(words, key=lambda word: (word["top"], word["x0"])):
+        if line_top is None or word["top"] - line_top > tolerance:
+            lines.append([])
+            line_top = word["top"]
+        lines[-1].append(word)
+    return [sorted(line, key=lambda word: word["x0"]) for line in lines]
+
+class _TableGrid:
+    """Row and cell boxes of one table found by ``page.find_tables()``."""
+
+    def __init__(self, table):
+        self.bbox = table.bbox
+        self.rows = sorted(table.rows, key=lambda row: row.bbox[1])
+        self.row_tops = [row.bbox[1] for row in self.rows]
+        # cells[row][column] collects (line number, words) per line
+        self.cells: List[List[Optional[List[Tuple[int, List[str]]]]]] = [
+            [[] if cell is not None else None for cell in row.cells] for row in self.rows
+        ]
+
+    def contains(self, x: float, y: float) -> bool:
+        x0, top, x1, bottom = self.bbox
+        return x0 <= x <= x1 and top <= y <= bottom
+
+    def place(self, word: Dict, x: float, y: float, line: int) -> bool:
+        """File a word under the cell containing its centre; False when no cell does."""
+        index = bisect_right(self.row_tops, y) - 1
+        if index < 0 or y > self.rows[index].bbox[3]:
+            return False
+        for column, cell in enumerate(self.rows[index].cells):
+            if cell is not None and cell[0] <= x <= cell[2]:
+                lines = self.cells[index][column]
+                if not lines or lines[-1][0] != line:
+                    lines.append((line, []))
+                lines[-1][1].append(word["text"])
+                return True
+        return False
+
+    def extract(self) -> List[List[Optional[str]]]:
+        return [
+            [
+                None if lines is None else "\n".join(" ".join(words) for _, words in lines)
+                for lines in row
+            ]
+            for row in self.cells
+        ]
+
+def analyse_page(page, tolerance: float = LINE_TOLERANCE) -> PageLayout:
+    """Split a page's words between its tables and its free text.
+
+    ``extract_words`` clusters the page's characters once. ``find_tables``
+    only supplies cell geometry from the ruling lines, so the clustering is
+    not repeated for ``extract_tables`` and ``extract_text``. A word belongs
+    to the table cell containing its centre; every other word goes to the
+    free-text lines, so a row printed in a table never reappears as text.
+    """
+    grids = [_TableGrid(table) for table in page.find_tables()]
+    lines: List[str] = []
+    for number, line in enumerate(group_lines(page.extract_words(), tolerance)):
+        free: List[str] = []
+        for word in line:
+            x = (word["x0"] + word["x1"]) / 2
+            y = (word["top"] + word["bottom"]) / 2
+            grid = next((grid for grid in grids if grid.contains(x, y)), None)
+            if grid is None or not grid.place(word, x, y, number):
+                free.append(word["text"])
+        if free:
+            lines.append(" ".join(free))
+    return PageLayout(tables=[grid.extract() for grid in grids], lines=lines)
@@ -0,0 +1,122 @@
+# backend/src/services/pdf_processing/scanner.py
+"""One-pass scanner for the dates and amounts in bank statement text."""
+import re
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Iterable, List, Optional, Union
+
+MONTHS = {
+    name: number for number, name in enumerate(
+        ["jan", "feb", "mar", "apr", "may", "jun", "jul", "aug", "sep", "oct", "nov", "dec"], start=1
+    )
+}
+_MONTH = r'(?i:Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Oct|Nov|Dec)[a-zA-Z]*'
+
+@dataclass
+class Token:
+    kind: str  # 'date' or 'amount'
+    start: int
+    end: int
+    text: str
+    value: Union[datetime, float, None]  # None for a date-shaped token that is not a valid date
+
+def two_digit_year(year: int) -> int:
+    """Expand a two-digit year the way ``strptime('%y')`` does (69-99 -> 1900s)."""
+    return year + (1900 if year >= 69 else 2000)
+
+class StatementScanner:
+    """Dates and amounts of a text, with their spans, from one ``finditer``.
+
+    Every supported shape is an alternative of a single compiled regex:
+    01/23/2024 or 23-01-24, 2024-01-23, January 23, 2024, 23 Jan 2024, and
+    amounts like -$1,234.56. An amount is one token however it is written,
+    so "$1,234.56" is never also read as "234.56". Dates are built straight
+    from the matched fields without ``strptime``; whether 01/02 is
+    January 2nd or February 1st is decided once for a whole text (or
+    page, with ``detect_day_first``) rather than tried per date.
+    """
+
+    def __init__(self):
+        # Each branch first checks one character, so most positions fail at once
+        self.token_regex = re.compile(
+            r'(?<![\d.,])(?=[\d$-])(?:'
+            r'(?P<iso>(?P<iy>\d{4})[/-](?P<im>\d{1,2})[/-](?P<id>\d{1,2}))'
+            r'|(?P<numeric>(?P<n1>\d{1,2})[/-](?P<n2>\d{1,2})[/-](?P<n3>\d{2,4}))'
+            r'|(?P<dmy>(?P<dd>\d{1,2}) (?P<dmon>' + _MONTH + r') (?P<dy>\d{4}))'
+            r'|(?P<amount>-?\$?(?:\d{1,3}(?:,\d{3})+|\d+)\.\d{2}(?!\d)))'
+            r'|(?<![A-Za-z])(?=[JFMASONDjfmasond])'
+            r'(?P<mdy>(?P<mon>' + _MONTH + r') (?P<md>\d{1,2}),? (?P<my>\d{4}))'
+        )
+        # Words and shapes that mark a continuation line of a transaction
+        self.marker_regex = re.compile(
+            r'balance|payment|deposit|withdrawal|transfer|pos|debit|credit|check|#\d+|\d{4}|\$',
+            re.IGNORECASE
+        )
+
+    def detect_day_first(self, texts: Iterable[str]) -> bool:
+        """Whether numeric dates read day first, judged from every numeric date in ``texts``."""
+        return self._day_first(
+            match for text in texts for match in self.token_regex.finditer(text)
+            if match.lastgroup == "numeric"
+        )
+
+    @staticmethod
+    def _day_first(numeric_matches: Iterable[re.Match]) -> bool:
+        # A part above 12 can only be a day; the more common signal wins, month first on a tie
+        day_first = month_first = 0
+        for match in numeric_matches:
+            if int(match.group("n1")) > 12:
+                day_first += 1
+            elif int(match.group("n2")) > 12:
+                month_first += 1
+        return day_first > month_first
+
+    def scan(self, text: str, day_first: Optional[bool] = None) -> List[Token]:
+        """All date and amount tokens of ``text`` in order of position.
+
+        Without ``day_first`` the order of numeric dates is judged from the
+        numeric dates of ``text`` itself, as in ``detect_day_first``.
+        """
+        matches = list(self.token_regex.finditer(text))
+        if day_first is None:
+            day_first = self._day_first(match for match in matches if match.lastgroup == "numeric")
+        tokens = []
+        for match in matches:
+            # lastgroup is the outermost alternative, e.g. 'amount' or 'iso'
+            if match.lastgroup == "amount":
+                value = float(match.group().replace("$", "").replace(",", ""))
+                tokens.append(Token("amount", match.start(), match.end(), match.group(), value))
+            else:
+                tokens.append(Token("date", match.start(), match.end(), match.group(), self._date(match, day_first)))
+        return tokens
+
+    def find_date(self, text: str, day_first: Optional[bool] = None) -> Optional[datetime]:
+        """First valid date in ``text``."""
+        for token in self.scan(text, day_first):
+            if token.kind == "date" and token.value is not None:
+                return token.value
+        return None
+
+    def find_amounts(self, text: str) -> List[float]:
+        """Every amount in ``text``, once each, in order of position."""
+        return [token.value for token in self.scan(text) if token.kind == "amount"]
+
+    def _date(self, match: re.Match, day_first: bool) -> Optional[datetime]:
+        try:
+            if match.group("iso") is not None:
+                return datetime(int(match.group("iy")), int(match.group("im")), int(match.group("id")))
+            if match.group("numeric") is not None:
+                first, second, year = match.group("n1", "n2", "n3")
+                if len(year) == 3:
+                    return None
+                year = int(year) if len(year) == 4 else two_digit_year(int(year))
+                month, day = (int(second), int(first)) if day_first else (int(first), int(second))
+                if month > 12:
+                    # Only readable the other way round
+                    month, day = day, month
+                return datetime(year, month, day)
+            if match.group("mdy") is not None:
+                return datetime(int(match.group("my")), MONTHS[match.group("mon")[:3].lower()], int(match.group("md")))
+            return datetime(int(match.group("dy")), MONTHS[match.group("dmon")[:3].lower()], int(match.group("dd")))
+        except ValueError:
+            return None
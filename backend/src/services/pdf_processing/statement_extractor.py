@@ -1,14 +1,29 @@
 # backend/src/services/pdf_processing/statement_extractor.py
+import asyncio
+import math
+import os
+from collections import deque
 import pdfplumber
+from concurrent.futures import ProcessPoolExecutor
 from dataclasses import dataclass
 from datetime import datetime
-from typing import List, Optional, Dict, Tuple
+from typing import AsyncIterator, List, Optional, Dict, Tuple
 import re
 from rich.console import Console
 from rich.table import Table
+from .layout import analyse_page
+from .scanner import StatementScanner, Token
 
 console = Console()
 
+# Page-parallel extraction; statements shorter than the minimum stay in-process
+STATEMENT_WORKERS = int(os.getenv("STATEMENT_WORKERS", str(os.cpu_count() or 1)))
+STATEMENT_PARALLEL_MIN_PAGES = int(os.getenv("STATEMENT_PARALLEL_MIN_PAGES", "4"))
+# Pages per worker task; with at most one task per worker in flight this bounds memory
+STATEMENT_PAGES_PER_TASK = int(os.getenv("STATEMENT_PAGES_PER_TASK", "4"))
+# Log every table and parsed row; rendering them costs more than parsing
+STATEMENT_LOG_ROWS = os.getenv("STATEMENT_LOG_ROWS", "false").lower() == "true"
+
 @dataclass
 class BankTransaction:
     date: datetime
@@ -17,81 +32,185 @@ class BankTransaction:
     transaction_type: str  # 'debit' or 'credit'
     category: Optional[str] = None
     raw_text: str = ""
+    source: str = ""  # page region it was read from: 'table' or 'text'
+
+@dataclass
+class StatementPage:
+    number: int  # 1-based
+    page_count: int
+    transactions: List[BankTransaction]
+
+def page_ranges(page_count: int, parts: int) -> List[Tuple[int, int]]:
+    """Split ``range(page_count)`` into at most ``parts`` contiguous, near-equal ``(start, stop)`` ranges."""
+    if page_count <= 0:
+        return []
+    parts = max(1, min(parts, page_count))
+    size, extra = divmod(page_count, parts)
+    ranges = []
+    start = 0
+    for part in range(parts):
+        stop = start + size + (1 if part < extra else 0)
+        ranges.append((start, stop))
+        start = stop
+    return ranges
+
+def extract_page_range(pdf_path: str, start: int, stop: int) -> List[List[BankTransaction]]:
+    """Worker entry point: open the PDF and extract pages ``start`` to ``stop - 1``, one list per page."""
+    processor = StatementProcessor(workers=1)
+    pages = []
+    with pdfplumber.open(pdf_path, pages=list(range(start + 1, stop + 1))) as pdf:
+        for offset, page in enumerate(pdf.pages):
+            pages.append(processor._process_page(page, start + offset + 1))
+            page.close()
+    return pages
 
 class StatementProcessor:
-    def __init__(self):
-        # Enhanced date patterns
-        self.date_patterns = [
-            r'\d{1,2}[/-]\d{1,2}[/-]\d{2,4}',  # 01/23/2024, 01-23-24
-            r'\d{4}[/-]\d{1,2}[/-]\d{1,2}',    # 2024/01/23
-            r'(?:Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Oct|Nov|Dec)[a-z]* \d{1,2},? \d{4}',  # January 23, 2024
-            r'\d{1,2} (?:Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Oct|Nov|Dec)[a-z]* \d{4}'     # 23 January 2024
-        ]
-        
-        # Enhanced amount patterns
-        self.amount_patterns = [
-            r'\$?\d{1,3}(?:,\d{3})*\.\d{2}',     # $1,234.56 or 1,234.56
-            r'\$?\d+\.\d{2}',                     # $123.45 or 123.45
-            r'-\$?\d{1,3}(?:,\d{3})*\.\d{2}',    # -$1,234.56
-            r'-\$?\d+\.\d{2}'                     # -$123.45
-        ]
-        
-        # Transaction markers
-        self.transaction_markers = [
-            r'(balance|payment|deposit|withdrawal|transfer|pos|debit|credit|check|#\d+)',
-            r'\d{4}',  # Last 4 digits of card/account
-            r'\$'      # Dollar sign
+    def __init__(self, workers: int = STATEMENT_WORKERS):
+        # Worker processes for page-parallel extraction; 1 extracts in-process
+        self.workers = workers
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._executor_workers = 0
+
+        # One compiled regex for every date and amount shape
+        self.scanner = StatementScanner()
+        self.space_regex = re.compile(r'\s+')
+        self.edge_regex = re.compile(r'^\W+|\W+$')
+
+    async def process_statement(
+        self,
+        pdf_path: str,
+        openai_api_key: Optional[str] = None,
+        workers: Optional[int] = None
+    ) -> List[BankTransaction]:
+        """Process a bank statement PDF and return all its transactions.
+
+        Collects ``stream_statement``; use that directly to handle long
+        statements without holding every transaction at once.
+
+        Categories are filled in afterwards by
+        ``services.categorization.statements.StatementCategorizer``.
+        """
+        return [
+            transaction
+            async for page in self.stream_statement(pdf_path, workers)
+            for transaction in page.transactions
         ]
 
-    async def process_statement(self, pdf_path: str, openai_api_key: str) -> List[BankTransaction]:
-        """Process a bank statement PDF and return categorized transactions."""
+    async def stream_statement(
+        self, pdf_path: str, workers: Optional[int] = None
+    ) -> AsyncIterator[StatementPage]:
+        """Yield each page's transactions in page order.
+
+        With more than one worker (``STATEMENT_WORKERS`` by default) and at
+        least ``STATEMENT_PARALLEL_MIN_PAGES`` pages, ranges of
+        ``STATEMENT_PAGES_PER_TASK`` pages are extracted in a process pool;
+        each worker opens the PDF itself. At most one range per worker is
+        submitted ahead of the consumer and ranges are yielded in order, so
+        the output is the same as the sequential walk and memory does not
+        grow with the statement's length.
+        """
+        workers = self.workers if workers is None else workers
         try:
             console.print("\n[bold yellow]Opening PDF file...[/]")
             with pdfplumber.open(pdf_path) as pdf:
-                console.print(f"Successfully opened PDF with {len(pdf.pages)} pages")
-                
-                # Extract tables and text from each page
-                transactions = []
-                for i, page in enumerate(pdf.pages):
-                    console.print(f"\n[bold blue]Processing page {i+1}...[/]")
-                    
-                    # Try to extract tables first
-                    tables = page.extract_tables()
-                    if tables:
-                        console.print(f"Found {len(tables)} tables on page {i+1}")
-                        transactions.extend(self._process_tables(tables))
-                    
-                    # Extract and process text
-                    text = page.extract_text()
-                    text_transactions = self._process_text(text)
-                    transactions.extend(text_transactions)
-                    
-                    console.print(f"Found {len(text_transactions)} transactions in text on page {i+1}")
-                    
-                    # Debug output
-                    if not tables and not text_transactions:
-                        console.print("[yellow]No transactions found on this page. Sample text:[/]")
-                        lines = text.split('\n')[:5]
-                        for line in lines:
-                            console.print(f"LINE: {line}")
-                
-                return transactions
-                
+                page_count = len(pdf.pages)
+                console.print(f"Successfully opened PDF with {page_count} pages")
+
+                if workers <= 1 or page_count < STATEMENT_PARALLEL_MIN_PAGES:
+                    for i, page in enumerate(pdf.pages):
+                        transactions = self._process_page(page, i + 1)
+                        # Drop the page's parsed layout before moving on
+                        page.close()
+                        yield StatementPage(i + 1, page_count, transactions)
+                    return
+
+            ranges = page_ranges(
+                page_count, max(workers, math.ceil(page_count / STATEMENT_PAGES_PER_TASK))
+            )
+            console.print(f"Extracting {page_count} pages in {len(ranges)} tasks on {workers} worker processes")
+            loop = asyncio.get_running_loop()
+            executor = self._get_executor(workers)
+            in_flight = deque()
+            for start, stop in ranges:
+                in_flight.append((start, loop.run_in_executor(executor, extract_page_range, pdf_path, start, stop)))
+                if len(in_flight) < workers:
+                    continue
+                first, task = in_flight.popleft()
+                for offset, transactions in enumerate(await task):
+                    yield StatementPage(first + offset + 1, page_count, transactions)
+            while in_flight:
+                first, task = in_flight.popleft()
+                for offset, transactions in enumerate(await task):
+                    yield StatementPage(first + offset + 1, page_count, transactions)
+
         except Exception as e:
             console.print(f"[bold red]Error processing PDF: {str(e)}[/]")
             raise
 
-    def _process_tables(self, tables: List[List[List[str]]]) -> List[BankTransaction]:
+    def _process_page(self, page, number: int) -> List[BankTransaction]:
+        """Transactions from one page: its table rows, then its free text.
+
+        One layout pass (``analyse_page``) feeds both parsers, and words in a
+        table are kept out of the text, so each row is found once.
+        """
+        console.print(f"\n[bold blue]Processing page {number}...[/]")
+        transactions = []
+        layout = analyse_page(page)
+        # Decide once per page whether 01/02 is January 2nd or February 1st
+        day_first = self.scanner.detect_day_first(
+            layout.lines + [cell for table in layout.tables for row in table for cell in row if cell]
+        )
+
+        if layout.tables:
+            console.print(f"Found {len(layout.tables)} tables on page {number}")
+            transactions.extend(self._process_tables(layout.tables, day_first))
+
+        text_transactions = self._process_text(layout.text, day_first)
+        transactions.extend(text_transactions)
+
+        console.print(f"Found {len(text_transactions)} transactions in text on page {number}")
+
+        # Debug output
+        if not layout.tables and not text_transactions:
+            console.print("[yellow]No transactions found on this page. Sample text:[/]")
+            for line in layout.lines[:5]:
+                console.print(f"LINE: {line}")
+
+        return transactions
+
+    def _get_executor(self, workers: int) -> ProcessPoolExecutor:
+        """Create the pool lazily; a different worker count replaces it."""
+        if self._executor is None or self._executor_workers != workers:
+            self.shutdown()
+            self._executor = ProcessPoolExecutor(max_workers=workers)
+            self._executor_workers = workers
+        return self._executor
+
+    def shutdown(self):
+        """Stop the page worker processes."""
+        if self._executor is not None:
+            console.print("Shutting down statement worker pool...", style="yellow")
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def _process_tables(
+        self, tables: List[List[List[str]]], day_first: Optional[bool] = None
+    ) -> List[BankTransaction]:
         """Process extracted tables from the PDF."""
         transactions = []
+        if day_first is None:
+            day_first = self.scanner.detect_day_first(
+                cell for table in tables for row in table for cell in row if cell
+            )
         
         for table in tables:
             # Skip empty tables
             if not table or not any(table):
                 continue
                 
-            console.print("\n[yellow]Processing table:[/]")
-            self._debug_print_table(table)
+            if STATEMENT_LOG_ROWS:
+                console.print("\n[yellow]Processing table:[/]")
+                self._debug_print_table(table)
             
             # Try to identify header row and column positions
             date_col, desc_col, amount_col = self._identify_columns(table)
@@ -102,7 +221,7 @@ class StatementProcessor:
                     if len(row) > max(date_col, desc_col, amount_col):
                         try:
                             date_str = str(row[date_col]).strip()
-                            date = self._parse_date(date_str)
+                            date = self._parse_date(date_str, day_first)
                             
                             if date:
                                 description = str(row[desc_col]).strip()
@@ -116,10 +235,12 @@ class StatementProcessor:
                                         description=description,
                                         amount=abs(amount),
                                         transaction_type='debit' if amount < 0 else 'credit',
-                                        raw_text=' '.join(str(x) for x in row if x)
+                                        raw_text=' '.join(str(x) for x in row if x),
+                                        source='table'
                                     )
                                     transactions.append(transaction)
-                                    console.print(f"[green]Found transaction: {description} - ${abs(amount):.2f}[/]")
+                                    if STATEMENT_LOG_ROWS:
+                                        console.print(f"[green]Found transaction: {description} - ${abs(amount):.2f}[/]")
                         
                         except Exception as e:
                             console.print(f"[red]Error processing row: {str(e)}[/]")
@@ -127,43 +248,42 @@ class StatementProcessor:
         
         return transactions
 
-    def _process_text(self, text: str) -> List[BankTransaction]:
+    def _process_text(self, text: str, day_first: Optional[bool] = None) -> List[BankTransaction]:
         """Process raw text to extract transactions."""
         transactions = []
-        lines = text.split('\n')
-        
-        # Group lines that might belong to the same transaction
-        transaction_groups = self._group_transaction_lines(lines)
-        
-        for group in transaction_groups:
+
+        # Group lines that might belong to the same transaction, scanning the text once
+        for group, tokens in self._scan_groups(text, day_first):
             combined_text = ' '.join(group)
-            
+
             # Try to extract transaction components
-            date = self._find_date(combined_text)
+            date = next((token.value for token in tokens if token.kind == 'date' and token.value), None)
             if not date:
                 continue
-                
-            amounts = self._find_amounts(combined_text)
+
+            amounts = [token.value for token in tokens if token.kind == 'amount']
             if not amounts:
                 continue
-                
-            # Use the last amount found as the transaction amount
-            amount = amounts[-1]
-            
-            # Clean description by removing date and amount
-            description = self._clean_description(combined_text, amounts)
-            
+
+            # The first amount is the transaction's; later ones are running balances
+            amount = amounts[0]
+
+            # Clean description by removing dates and amounts
+            description = self._clean_description(combined_text, tokens)
+
             if date and amount and description:
                 transaction = BankTransaction(
                     date=date,
                     description=description,
                     amount=abs(amount),
                     transaction_type='debit' if amount < 0 else 'credit',
-                    raw_text=combined_text
+                    raw_text=combined_text,
+                    source='text'
                 )
                 transactions.append(transaction)
-                console.print(f"[green]Found transaction: {description} - ${abs(amount):.2f}[/]")
-        
+                if STATEMENT_LOG_ROWS:
+                    console.print(f"[green]Found transaction: {description} - ${abs(amount):.2f}[/]")
+
         return transactions
 
     def _identify_columns(self, table: List[List[str]]) -> Tuple[Optional[int], Optional[int], Optional[int]]:
@@ -197,33 +317,68 @@ class StatementProcessor:
 
     def _group_transaction_lines(self, lines: List[str]) -> List[List[str]]:
         """Group lines that might belong to the same transaction."""
+        return [group for group, _ in self._scan_groups('\n'.join(lines))]
+
+    def _scan_groups(
+        self, text: str, day_first: Optional[bool] = None
+    ) -> List[Tuple[List[str], List[Token]]]:
+        """Transaction line groups of ``text`` with their date and amount tokens.
+
+        The whole text is scanned once and tokens are handed to their lines
+        by offset. A line with a valid date starts a group; following lines
+        join it while they hold an amount or a transaction marker. Token
+        spans are offsets into the group's lines joined with single spaces.
+        """
+        tokens = self.scanner.scan(text, day_first)
         groups = []
-        current_group = []
-        
-        for line in lines:
-            line = line.strip()
+        current_group: List[str] = []
+        current_tokens: List[Token] = []
+        length = 0
+        next_token = 0
+        line_start = 0
+
+        for raw_line in text.split('\n'):
+            line_end = line_start + len(raw_line)
+            first = next_token
+            while next_token < len(tokens) and tokens[next_token].start < line_end:
+                next_token += 1
+            line_tokens = tokens[first:next_token]
+            # Where the stripped line starts in the text
+            stripped_start = line_start + len(raw_line) - len(raw_line.lstrip())
+            line_start = line_end + 1
+
+            line = raw_line.strip()
             if not line:
                 continue
-                
+
             # Start new group if we find a date
-            if self._find_date(line):
+            if any(token.kind == 'date' and token.value for token in line_tokens):
                 if current_group:
-                    groups.append(current_group)
-                current_group = [line]
+                    groups.append((current_group, current_tokens))
+                current_group, current_tokens, length = [line], [], 0
+            elif current_group and (
+                any(token.kind == 'amount' for token in line_tokens) or
+                self.scanner.marker_regex.search(line)
+            ):
+                # Add to current group after the joining space
+                length += 1
+                current_group.append(line)
             else:
-                # Add to current group if it might be part of the transaction
-                if current_group and (
-                    self._find_amounts(line) or
-                    any(re.search(pattern, line.lower()) for pattern in self.transaction_markers)
-                ):
-                    current_group.append(line)
-                elif current_group:
-                    groups.append(current_group)
-                    current_group = []
-        
+                if current_group:
+                    groups.append((current_group, current_tokens))
+                    current_group, current_tokens, length = [], [], 0
+                continue
+
+            shift = length - stripped_start
+            current_tokens.extend(
+                Token(token.kind, token.start + shift, token.end + shift, token.text, token.value)
+                for token in line_tokens
+            )
+            length += len(line)
+
         if current_group:
-            groups.append(current_group)
-        
+            groups.append((current_group, current_tokens))
+
         return groups
 
     def _find_column_index(self, header: List[str], possible_names: List[str]) -> Optional[int]:
@@ -234,23 +389,20 @@ class StatementProcessor:
                     return i
         return None
 
-    def _clean_description(self, text: str, amounts: List[float]) -> str:
-        """Clean transaction description."""
-        # Remove dates
-        for pattern in self.date_patterns:
-            text = re.sub(pattern, '', text, flags=re.IGNORECASE)
-        
-        # Remove amounts
-        for amount in amounts:
-            text = text.replace(f"${abs(amount):.2f}", '')
-            text = text.replace(f"-${abs(amount):.2f}", '')
-            text = text.replace(f"${abs(amount):,.2f}", '')
-            text = text.replace(f"-${abs(amount):,.2f}", '')
-        
+    def _clean_description(self, text: str, tokens: List[Token]) -> str:
+        """Clean transaction description by cutting out its date and amount tokens."""
+        kept = []
+        position = 0
+        for token in tokens:
+            kept.append(text[position:token.start])
+            position = token.end
+        kept.append(text[position:])
+        text = ' '.join(kept)
+
         # Clean up extra spaces and special characters
-        text = re.sub(r'\s+', ' ', text)
-        text = re.sub(r'^\W+|\W+$', '', text)
-        
+        text = self.space_regex.sub(' ', text)
+        text = self.edge_regex.sub('', text)
+
         return text.strip()
 
     def _debug_print_table(self, table: List[List[str]]):
@@ -267,46 +419,19 @@ class StatementProcessor:
             
         console.print(debug_table)
 
-    def _find_date(self, text: str) -> Optional[datetime]:
+    def _find_date(self, text: str, day_first: Optional[bool] = None) -> Optional[datetime]:
         """Extract date from text."""
-        for pattern in self.date_patterns:
-            match = re.search(pattern, text, re.IGNORECASE)
-            if match:
-                try:
-                    date_str = match.group()
-                    # Try different date formats
-                    for fmt in [
-                        '%m/%d/%Y', '%Y-%m-%d', '%d/%m/%Y', '%m/%d/%y',
-                        '%B %d, %Y', '%b %d, %Y', '%d %B %Y', '%d %b %Y'
-                    ]:
-                        try:
-                            return datetime.strptime(date_str, fmt)
-                        except ValueError:
-                            continue
-                except Exception:
-                    continue
-        return None
+        return self.scanner.find_date(text, day_first)
 
     def _find_amounts(self, text: str) -> List[float]:
-        """Extract all amounts from text."""
-        amounts = []
-        for pattern in self.amount_patterns:
-            matches = re.findall(pattern, text)
-            for match in matches:
-                try:
-                    # Remove currency symbols and commas
-                    clean_amount = match.replace('$', '').replace(',', '')
-                    amount = float(clean_amount)
-                    amounts.append(amount)
-                except ValueError:
-                    continue
-        return amounts
+        """Extract all amounts from text, once each."""
+        return self.scanner.find_amounts(text)
 
     def _extract_amount(self, text: str) -> Optional[float]:
         """Extract single amount from text."""
         amounts = self._find_amounts(text)
         return amounts[-1] if amounts else None
 
-    def _parse_date(self, date_str: str) -> Optional[datetime]:
+    def _parse_date(self, date_str: str, day_first: Optional[bool] = None) -> Optional[datetime]:
         """Parse date string into datetime object."""
-        return self._find_date(date_str)
\ No newline at end of file
+        return self._find_date(date_str, day_first)
@@ -0,0 +1,203 @@
+import sys
+import os
+import json
+import asyncio
+import threading
+import time
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.categorization.batcher import MicroBatcher, AdaptiveLimiter
+from services.categorization.classifier import ExpenseCategory, BatchItem
+from test_classification_cache import RecordingLLM, Message, make_classifier
+
+class Recorder:
+    def __init__(self):
+        self.batches = []
+
+    async def send(self, entries):
+        self.batches.append(list(entries))
+        return [entry * 10 for entry in entries]
+
+async def gather_submissions(batcher, submissions):
+    return await asyncio.gather(*(batcher.submit(entries) for entries in submissions))
+
+class TestMicroBatcher:
+    def test_concurrent_submissions_share_a_batch(self):
+        recorder = Recorder()
+        batcher = MicroBatcher(recorder.send, window=0.01)
+
+        results = asyncio.run(gather_submissions(batcher, [[1, 2], [3], [4, 5, 6]]))
+
+        assert recorder.batches == [[1, 2, 3, 4, 5, 6]]
+        assert results == [[10, 20], [30], [40, 50, 60]]
+        assert batcher.stats()["entries_per_batch"] == 6
+
+    def test_cost_budget_splits_batches(self):
+        recorder = Recorder()
+        batcher = MicroBatcher(recorder.send, window=10, max_cost=3)
+
+        # A full budget is sent right away instead of waiting out the window
+        results = asyncio.run(gather_submissions(batcher, [[1, 2], [3, 4], [5]]))
+
+        assert recorder.batches == [[1, 2], [3, 4, 5]]
+        assert results == [[10, 20], [30, 40], [50]]
+
+    def test_errors_reach_every_caller(self):
+        async def fail(entries):
+            raise RuntimeError("boom")
+
+        batcher = MicroBatcher(fail, window=0)
+
+        async def run():
+            return await asyncio.gather(
+                batcher.submit([1]), batcher.submit([2]), return_exceptions=True
+            )
+
+        assert [str(result) for result in asyncio.run(run())] == ["boom", "boom"]
+
+class TestClassifierBatching:
+    def test_concurrent_receipts_make_one_request(self):
+        llm = RecordingLLM()
+        classifier = make_classifier(llm)
+
+        async def run():
+            return await asyncio.gather(
+                classifier.classify_items([{"description": "MILK", "price": 1.0}], "Walmart", 1.0),
+                classifier.classify_items([{"description": "SOAP", "price": 2.0},
+                                           {"description": "OAT MILK", "price": 3.0}], "CVS", 5.0)
+            )
+
+        walmart, cvs = asyncio.run(run())
+
+        assert llm.calls == [["MILK", "SOAP", "OAT MILK"]]
+        assert [item.category for item in walmart] == [ExpenseCategory.GROCERIES]
+        assert [(item.description, item.category, item.original_price) for item in cvs] == [
+            ("SOAP", ExpenseCategory.HOUSEHOLD, 2.0), ("OAT MILK", ExpenseCategory.GROCERIES, 3.0)
+        ]
+
+    def test_answers_are_matched_by_id(self):
+        class ReversedPartialLLM:
+            async def ainvoke(self, prompt):
+                # Answers out of order and skips item 0
+                return Message(json.dumps({"items": [
+                    {"id": 2, "category": "pets", "confidence": 0.8, "reasoning": "r"},
+                    {"id": 1, "category": "office", "confidence": 0.8, "reasoning": "r"},
+                    {"id": 7, "category": "office", "confidence": 0.8, "reasoning": "r"}
+                ]}))
+
+        classifier = make_classifier(ReversedPartialLLM())
+        result = asyncio.run(classifier.classify_items(
+            [{"description": d, "price": 1.0} for d in ["A", "PEN", "DOG FOOD"]], "Target", 3.0
+        ))
+
+        assert [item.category for item in result] == [
+            ExpenseCategory.MISCELLANEOUS, ExpenseCategory.OFFICE, ExpenseCategory.PETS
+        ]
+        assert classifier.stats()["fallback"] == 1
+
+class TestChunking:
+    def test_large_submissions_are_split(self):
+        recorder = Recorder()
+        batcher = MicroBatcher(recorder.send, window=0, max_cost=4)
+
+        result = asyncio.run(batcher.submit(list(range(10))))
+
+        assert recorder.batches == [[0, 1, 2, 3], [4, 5, 6, 7], [8, 9]]
+        assert result == [entry * 10 for entry in range(10)]
+
+    def test_chunks_run_concurrently_and_retry_alone(self):
+        class FlakyLLM(RecordingLLM):
+            """Sleeps like a remote call and fails the first request mentioning ITEM 5."""
+
+            def __init__(self):
+                super().__init__()
+                self.active = 0
+                self.peak = 0
+                self.failed = False
+
+            async def ainvoke(self, prompt):
+                self.active += 1
+                self.peak = max(self.peak, self.active)
+                await asyncio.sleep(0.01)
+                self.active -= 1
+                if "ITEM 5:" in prompt and not self.failed:
+                    self.failed = True
+                    raise RuntimeError("rate limited")
+                return await super().ainvoke(prompt)
+
+        llm = FlakyLLM()
+        classifier = make_classifier(llm)
+        classifier.batcher.max_cost = 3 * classifier._estimate_tokens(
+            BatchItem("", "ITEM 0", 1.0)
+        )
+
+        result = asyncio.run(classifier.classify_items(
+            [{"description": f"ITEM {i}", "price": 1.0} for i in range(9)], "Costco", 9.0
+        ))
+
+        assert llm.peak == 3
+        # The failed request is not recorded; its chunk is sent again on its own
+        assert sorted(llm.calls) == sorted([
+            ["ITEM 0", "ITEM 1", "ITEM 2"], ["ITEM 6", "ITEM 7", "ITEM 8"], ["ITEM 3", "ITEM 4", "ITEM 5"]
+        ])
+        assert all(item.category == ExpenseCategory.HOUSEHOLD for item in result)
+        assert classifier.limiter.failures == 1
+
+class TestAdaptiveLimiter:
+    def test_halves_on_failure_and_grows_on_success(self):
+        limiter = AdaptiveLimiter(max_limit=8, initial=4)
+
+        async def cycle(success):
+            await limiter.acquire()
+            limiter.release(success)
+
+        asyncio.run(cycle(False))
+        assert limiter.limit == 2
+        for _ in range(2):
+            asyncio.run(cycle(True))
+        assert limiter.limit == 3
+
+    def test_blocks_at_the_limit(self):
+        limiter = AdaptiveLimiter(max_limit=2, initial=2)
+        active = []
+
+        async def worker():
+            await limiter.acquire()
+            active.append(limiter.in_flight)
+            await asyncio.sleep(0.005)
+            limiter.release(True)
+
+        async def run():
+            await asyncio.gather(*(worker() for _ in range(6)))
+
+        asyncio.run(run())
+        assert max(active) == 2
+        assert limiter.in_flight == 0
+
+    def test_shared_by_loops_in_threads(self):
+        limiter = AdaptiveLimiter(max_limit=2, initial=2)
+        active = []
+        lock = threading.Lock()
+
+        async def worker():
+            await limiter.acquire()
+            with lock:
+                active.append(limiter.in_flight)
+            # Block the thread so other loops must wait on the limiter
+            time.sleep(0.005)
+            await asyncio.sleep(0.005)
+            limiter.release(True)
+
+        async def run():
+            await asyncio.gather(*(worker() for _ in range(5)))
+
+        threads = [threading.Thread(target=asyncio.run, args=(run(),)) for _ in range(3)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join(timeout=10)
+
+        assert not any(thread.is_alive() for thread in threads)
+        assert len(active) == 15
+        assert max(active) <= limiter.max_limit
+        assert limiter.in_flight == 0
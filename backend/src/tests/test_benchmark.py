@@ -0,0 +1,35 @@
+import sys
+import os
+import io
+import pdfplumber
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "tools"))
+
+from benchmark import compare_to_baseline, percentile_summary, regressions
+from generate_sample_statement import make_transactions, render_statement_pdf
+from services.pdf_processing.statement_extractor import StatementProcessor
+
+class TestBenchmarkHelpers:
+    def test_generated_statement_is_parsable(self):
+        rows = make_transactions(50)
+        with pdfplumber.open(io.BytesIO(render_statement_pdf(rows, rows_per_page=30))) as pdf:
+            assert len(pdf.pages) == 2
+            tables = [table for page in pdf.pages for table in page.extract_tables()]
+
+        transactions = StatementProcessor()._process_tables(tables)
+        assert len(transactions) == 50
+        assert transactions[0].description == rows[0][1]
+
+    def test_percentiles(self):
+        summary = percentile_summary([0.001] * 99 + [0.101])
+        assert summary["calls"] == 100
+        assert round(summary["p50_ms"], 6) == 1.0
+        assert summary["p99_ms"] > 1.0
+
+    def test_flags_regressions_beyond_threshold(self):
+        baseline = {"parse": {"p50_ms": 1.0}, "decode": {"p50_ms": 10.0}}
+        results = {"parse": {"p50_ms": 1.5}, "decode": {"p50_ms": 11.0}, "ocr": {"p50_ms": 5.0}}
+        changes = compare_to_baseline(results, baseline)
+
+        assert changes["ocr"] is None
+        assert regressions(changes, threshold=0.25) == ["parse"]
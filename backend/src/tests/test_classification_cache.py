@@ -0,0 +1,101 @@
+import sys
+import os
+import re
+import json
+import asyncio
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database.models import Base, ClassificationCacheEntry
+from services.categorization.cache import ClassificationCache, normalize_description
+from services.categorization.batcher import AdaptiveLimiter
+from services.categorization.neighbors import NeighborIndex
+from services.categorization.classifier import ExpenseClassifier, ExpenseCategory, TAXONOMY_VERSION
+
+ITEM_LINE = re.compile(r'^\s*- \[(\d+)\] (.*): \$', re.MULTILINE)
+
+class Message:
+    def __init__(self, content):
+        self.content = content
+
+class RecordingLLM:
+    """Classifies everything containing MILK as groceries, the rest as household."""
+
+    def __init__(self, fail=False):
+        self.fail = fail
+        self.calls = []
+
+    async def ainvoke(self, prompt):
+        items = ITEM_LINE.findall(prompt)
+        self.calls.append([description for _, description in items])
+        if self.fail:
+            return Message("not json")
+        return Message(json.dumps({"items": [{
+            "id": int(index),
+            "description": description,
+            "category": "groceries" if "MILK" in description.upper() else "household",
+            "confidence": 0.9,
+            "reasoning": "test"
+        } for index, description in items]}))
+
+def make_classifier(llm, cache=None):
+    classifier = ExpenseClassifier(cache=cache or ClassificationCache(TAXONOMY_VERSION), llm=llm)
+    classifier.local_model = None
+    classifier.neighbors = NeighborIndex(TAXONOMY_VERSION)
+    classifier.limiter = AdaptiveLimiter(max_limit=4, initial=4)
+    classifier.retry_backoff = 0
+    return classifier
+
+def classify(classifier, descriptions, db=None):
+    return asyncio.run(classifier.classify_items(
+        items=[{"description": d, "price": 1.0} for d in descriptions],
+        store_name="Walmart", total_amount=1.0, db=db
+    ))
+
+class TestClassificationCache:
+    def test_normalizes_descriptions(self):
+        assert normalize_description("  Oreo-cookie  14oz!") == "OREO COOKIE 14OZ"
+
+    def test_only_misses_reach_the_llm(self):
+        llm = RecordingLLM()
+        classifier = make_classifier(llm)
+
+        classify(classifier, ["MILK 1L", "SPONGE", "milk 1l"])
+        result = classify(classifier, ["SPONGE", "BREAD", "Milk 1L"])
+
+        # Repeats within a receipt and across receipts are sent once
+        assert llm.calls == [["MILK 1L", "SPONGE"], ["BREAD"]]
+        assert [item.description for item in result] == ["SPONGE", "BREAD", "Milk 1L"]
+        assert [item.category for item in result] == [
+            ExpenseCategory.HOUSEHOLD, ExpenseCategory.HOUSEHOLD, ExpenseCategory.GROCERIES
+        ]
+
+    def test_failures_are_not_cached(self):
+        llm = RecordingLLM(fail=True)
+        classifier = make_classifier(llm)
+
+        assert classify(classifier, ["MILK"])[0].category == ExpenseCategory.MISCELLANEOUS
+        classify(classifier, ["MILK"])
+        assert len(llm.calls) == 2 * (classifier.max_retries + 1)
+
+    def test_database_tier_is_shared(self):
+        engine = create_engine("sqlite://")
+        Base.metadata.create_all(engine, tables=[ClassificationCacheEntry.__table__])
+        db = sessionmaker(bind=engine)()
+
+        classify(make_classifier(RecordingLLM()), ["MILK", "SOAP"], db=db)
+
+        # A fresh process has an empty memory tier but finds the rows
+        llm = RecordingLLM()
+        cache = ClassificationCache(TAXONOMY_VERSION)
+        result = classify(make_classifier(llm, cache), ["SOAP", "MILK"], db=db)
+
+        assert llm.calls == []
+        assert [item.category for item in result] == [ExpenseCategory.HOUSEHOLD, ExpenseCategory.GROCERIES]
+        assert cache.stats()["db_hits"] == 2
+        assert {entry.hit_count for entry in db.query(ClassificationCacheEntry)} == {1}
+
+    def test_taxonomy_version_is_part_of_the_key(self):
+        assert ClassificationCache("v1").key("MILK", "Grocery Store") != \
+            ClassificationCache("v2").key("MILK", "Grocery Store")
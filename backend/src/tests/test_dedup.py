@@ -0,0 +1,103 @@
+import sys
+import os
+import random
+import cv2
+from datetime import datetime
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "tools"))
+
+from services.ocr.dedup import HammingIndex, NearDuplicateDetector, same_receipt, PHASH_BITS
+from services.ocr.extractor import Receipt, ReceiptItem
+from services.ocr.stages import thumbnail_hash
+from generate_sample_receipt import render_sample_receipt
+
+def flip_bits(value, count, rng):
+    for bit in rng.sample(range(PHASH_BITS), count):
+        value ^= 1 << bit
+    return value
+
+def receipt_items(seed):
+    rng = random.Random(seed)
+    return [(f"Item {i:02d}", round(rng.uniform(1, 20), 2)) for i in range(8)]
+
+def receipt_upload(items, angle=0.0, scale=1.0, quality=90):
+    """JPEG bytes of a rendered receipt, optionally rotated and rescaled like a retake."""
+    image = cv2.cvtColor(render_sample_receipt(items=items, noise=False), cv2.COLOR_RGB2GRAY)
+    if scale != 1.0:
+        image = cv2.resize(image, None, fx=scale, fy=scale, interpolation=cv2.INTER_CUBIC)
+    if angle:
+        height, width = image.shape
+        rotation = cv2.getRotationMatrix2D((width / 2, height / 2), angle, 1.0)
+        image = cv2.warpAffine(image, rotation, (width, height), borderValue=255)
+    return cv2.imencode(".jpg", image, [cv2.IMWRITE_JPEG_QUALITY, quality])[1].tobytes()
+
+def parsed_receipt(items):
+    total = round(sum(price for _, price in items), 2)
+    return Receipt(
+        store_name="GROCERY STORE", date=datetime(2024, 1, 1),
+        items=[ReceiptItem(description=name, price=price) for name, price in items],
+        total=total, subtotal=total, tax=0.0, raw_text=""
+    )
+
+class TestHammingIndex:
+    def test_matches_brute_force(self):
+        rng = random.Random(7)
+        index = HammingIndex()
+        hashes = [rng.getrandbits(PHASH_BITS) for _ in range(500)]
+        for i, h in enumerate(hashes):
+            index.add(h, i)
+
+        for i in range(50):
+            query = flip_bits(hashes[i], rng.randint(0, 14), rng)
+            expected = sorted(
+                (bin(query ^ h).count("1"), j) for j, h in enumerate(hashes)
+                if bin(query ^ h).count("1") <= 10
+            )
+            assert sorted(index.search(query, 10)) == expected
+
+    def test_nearest_without_match(self):
+        index = HammingIndex()
+        index.add(0, "a")
+        assert index.nearest((1 << PHASH_BITS) - 1, 10) is None
+        assert index.nearest(0b111, 10) == (3, "a")
+
+class TestNearDuplicateDetector:
+    def test_finds_retaken_photo_for_same_user_only(self):
+        items = receipt_items(1)
+        detector = NearDuplicateDetector()
+        detector.add(1, thumbnail_hash(receipt_upload(items)), "digest-1")
+
+        for retake in (
+            receipt_upload(items, quality=60),
+            receipt_upload(items, scale=2.0),
+            receipt_upload(items, angle=1.0),
+        ):
+            assert detector.find(1, thumbnail_hash(retake)) == "digest-1"
+            assert detector.find(2, thumbnail_hash(retake)) is None
+
+    def test_different_receipt_with_same_layout_is_not_a_duplicate(self):
+        items, other_items = receipt_items(1), receipt_items(2)
+        detector = NearDuplicateDetector()
+        detector.add(1, thumbnail_hash(receipt_upload(items)), "digest-1")
+        cached = parsed_receipt(items)
+
+        # Same-layout receipts can look identical at thumbnail scale, so a
+        # hash hit is only a candidate; the text check must reject it
+        candidate = detector.find(1, thumbnail_hash(receipt_upload(other_items)))
+        assert candidate in (None, "digest-1")
+        assert not same_receipt(parsed_receipt(other_items), cached)
+        assert same_receipt(parsed_receipt(items), cached)
+
+class TestSameReceipt:
+    def test_tolerates_a_misread_item(self):
+        items = receipt_items(3)
+        noisy = parsed_receipt(items)
+        noisy.items[0].price += 0.5
+        assert same_receipt(noisy, parsed_receipt(items))
+
+    def test_rejects_other_total_or_empty_receipt(self):
+        items = receipt_items(3)
+        changed = parsed_receipt(items)
+        changed.total += 1.0
+        assert not same_receipt(changed, parsed_receipt(items))
+        assert not same_receipt(parsed_receipt([]), parsed_receipt([]))
@@ -0,0 +1,46 @@
+import sys
+import os
+import cv2
+import numpy as np
+import pytest
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.ocr import ingestion
+from services.ocr.ingestion import (
+    decode_receipt_image, decode_thumbnail, ImageRejectedError, ImageTooLargeError
+)
+
+def encode_jpeg(width, height):
+    image = np.full((height, width, 3), 255, np.uint8)
+    cv2.putText(image, "TOTAL $12.34", (50, height // 2), cv2.FONT_HERSHEY_SIMPLEX, 4, (0, 0, 0), 8)
+    return cv2.imencode(".jpg", image)[1].tobytes()
+
+class TestImageIngestion:
+    def test_large_photo_decodes_to_grayscale_within_budget(self):
+        contents = encode_jpeg(4000, 3000)
+        image = decode_receipt_image(contents, max_pixels=1_000_000)
+
+        assert image.ndim == 2
+        assert image.shape[0] * image.shape[1] <= 1_000_000
+        assert image.shape[1] / image.shape[0] == pytest.approx(4 / 3, rel=0.01)
+
+    def test_12mp_photo_uses_reduced_decode(self):
+        # Half scale gives 3MP, close enough to the 4MP budget to skip a full decode
+        image = decode_receipt_image(encode_jpeg(4000, 3000), max_pixels=4_000_000)
+        assert image.shape == (1500, 2000)
+
+    def test_small_image_keeps_resolution(self):
+        image = decode_receipt_image(encode_jpeg(400, 800), max_pixels=1_000_000)
+        assert image.shape == (800, 400)
+
+    def test_thumbnail_is_reduced(self):
+        assert decode_thumbnail(encode_jpeg(800, 1600)).shape == (200, 100)
+
+    def test_rejects_invalid_bytes(self):
+        with pytest.raises(ImageRejectedError):
+            decode_receipt_image(b"not an image")
+
+    def test_rejects_oversized_source_before_decoding(self, monkeypatch):
+        monkeypatch.setattr(ingestion, "OCR_MAX_SOURCE_PIXELS", 100_000)
+        with pytest.raises(ImageTooLargeError):
+            decode_receipt_image(encode_jpeg(400, 800))
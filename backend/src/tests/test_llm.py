@@ -0,0 +1,81 @@
+import sys
+import os
+import json
+import asyncio
+import pytest
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.categorization.llm import FakeLLM, FakeLLMConfig, FakeLLMError, create_llm
+from services.categorization.classifier import ExpenseCategory
+from test_classification_cache import make_classifier, classify
+
+PROMPT = """Available Categories:
+- groceries: Food items
+- household: Cleaning supplies
+
+Walmart (Grocery Store), total $3.00:
+- [0] WHOLE MILK: $1.00
+- [1] XQZV 42: $1.00
+"""
+
+class TestFakeLLM:
+    def test_answers_every_item_with_offered_categories(self):
+        response = asyncio.run(FakeLLM().ainvoke(PROMPT))
+        items = json.loads(response.content)["items"]
+        assert [item["id"] for item in items] == [0, 1]
+        assert items[0]["category"] == "groceries"
+        assert items[1]["category"] in {"groceries", "household"}
+        assert all(0 <= item["confidence"] <= 1 and item["reasoning"] for item in items)
+
+    def test_answers_are_deterministic(self):
+        first = asyncio.run(FakeLLM().ainvoke(PROMPT)).content
+        second = asyncio.run(FakeLLM(FakeLLMConfig(seed=7)).ainvoke(PROMPT)).content
+        assert first == second
+
+    def test_streams_the_same_answer(self):
+        async def collect(llm):
+            return [chunk.content async for chunk in llm.astream(PROMPT)]
+
+        chunks = asyncio.run(collect(FakeLLM(FakeLLMConfig(stream_chunk_chars=5))))
+        assert len(chunks) > 1
+        assert "".join(chunks) == asyncio.run(FakeLLM().ainvoke(PROMPT)).content
+
+    def test_failures_are_reproducible(self):
+        def outcomes(seed):
+            llm = FakeLLM(FakeLLMConfig(error_rate=0.5, seed=seed))
+            results = []
+            for _ in range(20):
+                try:
+                    asyncio.run(llm.ainvoke(PROMPT))
+                    results.append(True)
+                except FakeLLMError:
+                    results.append(False)
+            return results
+
+        assert outcomes(3) == outcomes(3)
+        assert 0 < outcomes(3).count(False) < 20
+
+    def test_create_llm_requires_a_key_for_openai(self, monkeypatch):
+        monkeypatch.delenv("OPENAI_API_KEY", raising=False)
+        with pytest.raises(ValueError):
+            create_llm(backend="openai")
+        assert isinstance(create_llm(backend="fake"), FakeLLM)
+
+class TestClassifierWithFakeLLM:
+    def test_dropped_items_are_retried(self):
+        llm = FakeLLM(FakeLLMConfig(drop_rate=0.5, seed=1))
+        classifier = make_classifier(llm)
+        classifier.max_retries = 10
+
+        result = classify(classifier, [f"ITEM {i}" for i in range(10)] + ["WHOLE MILK"])
+
+        assert llm.items_dropped > 0
+        assert llm.calls > 1
+        assert classifier.served["fallback"] == 0
+        assert result[-1].category == ExpenseCategory.GROCERIES
+
+    def test_failing_backend_falls_back(self):
+        classifier = make_classifier(FakeLLM(FakeLLMConfig(error_rate=1.0)))
+        result = classify(classifier, ["WHOLE MILK"])
+        assert result[0].category == ExpenseCategory.MISCELLANEOUS
+        assert classifier.limiter.failures == classifier.max_retries + 1
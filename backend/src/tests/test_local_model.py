@@ -0,0 +1,82 @@
+import sys
+import os
+import asyncio
+import tempfile
+from pathlib import Path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.categorization.cache import ClassificationCache
+from services.categorization.classifier import ExpenseClassifier, ExpenseCategory, TAXONOMY_VERSION
+from services.categorization.local_model import LocalItemClassifier, TrainingSample, find_artifact
+from test_classification_cache import RecordingLLM
+
+GROCERIES = ["MILK 2%", "WHOLE MILK", "BANANAS", "BREAD WHEAT", "EGGS LARGE", "CHOBANI YOGURT",
+             "OREO COOKIE", "APPLES GALA", "CHEDDAR CHEESE", "ORANGE JUICE"]
+HOUSEHOLD = ["PAPER TOWELS", "DISH SOAP", "TRASH BAGS", "SPONGE 3PK", "BLEACH",
+             "LAUNDRY DETERGENT", "TOILET PAPER", "ALUMINUM FOIL", "LIGHT BULB", "MOP REFILL"]
+
+def make_samples():
+    samples = []
+    for _ in range(5):
+        samples += [TrainingSample(d, "Grocery Store", "groceries") for d in GROCERIES]
+        samples += [TrainingSample(d, "Grocery Store", "household") for d in HOUSEHOLD]
+    return samples
+
+class TestLocalItemClassifier:
+    def test_learns_training_labels(self):
+        model = LocalItemClassifier.train(make_samples(), TAXONOMY_VERSION, threshold=0.6)
+
+        predictions = model.predict(["whole milk", "Dish Soap"], "Grocery Store")
+        assert [category for category, _ in predictions] == ["groceries", "household"]
+        assert all(0.6 <= confidence <= 1.0 for _, confidence in predictions)
+        assert model.metrics["samples"] == 100
+        assert 0.0 <= model.metrics["holdout_coverage"] <= 1.0
+
+    def test_needs_two_categories(self):
+        samples = [TrainingSample("MILK", "Grocery Store", "groceries")] * 5
+        try:
+            LocalItemClassifier.train(samples, TAXONOMY_VERSION)
+            assert False, "expected ValueError"
+        except ValueError:
+            pass
+
+    def test_save_and_load_newest(self):
+        model = LocalItemClassifier.train(make_samples(), TAXONOMY_VERSION)
+        with tempfile.TemporaryDirectory() as directory:
+            model.version = "20240101T000000"
+            model.save(Path(directory))
+            model.version = "20240201T000000"
+            newest = model.save(Path(directory))
+
+            assert find_artifact(Path(directory)) == newest
+            assert find_artifact(Path(directory), "20240101T000000").name.endswith("20240101T000000.joblib")
+            assert find_artifact(Path(directory), "missing") is None
+
+            loaded = LocalItemClassifier.load(newest, threshold=0.75)
+            assert loaded.version == "20240201T000000"
+            assert loaded.threshold == 0.75
+            assert loaded.predict(["BANANAS"], "Grocery Store")[0][0] == "groceries"
+
+class TestLocalTier:
+    def test_only_uncertain_items_reach_the_llm(self):
+        model = LocalItemClassifier.train(make_samples(), TAXONOMY_VERSION, threshold=0.6)
+        llm = RecordingLLM()
+        classifier = ExpenseClassifier(cache=ClassificationCache(TAXONOMY_VERSION), llm=llm)
+        classifier.local_model = model
+        classifier.neighbors = None
+
+        # An item the model has never seen anything like stays uncertain
+        model.threshold = model.predict(["XQZV 42"], "Grocery Store")[0][1] + 1e-6
+
+        result = asyncio.run(classifier.classify_items(
+            items=[{"description": d, "price": 1.0} for d in ["WHOLE MILK", "XQZV 42", "BLEACH"]],
+            store_name="Walmart", total_amount=3.0
+        ))
+
+        assert llm.calls == [["XQZV 42"]]
+        assert [item.category for item in result] == [
+            ExpenseCategory.GROCERIES, ExpenseCategory.HOUSEHOLD, ExpenseCategory.HOUSEHOLD
+        ]
+        stats = classifier.stats()
+        assert (stats["local"], stats["llm"], stats["cache"]) == (2, 1, 0)
+        assert stats["fractions"]["local"] == 2 / 3
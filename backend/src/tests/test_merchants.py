@@ -0,0 +1,68 @@
+import sys
+import os
+import tempfile
+from pathlib import Path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.categorization.merchants import (
+    Merchant, MerchantDirectory, merchant_tokens, read_merchant_file
+)
+from test_classification_cache import RecordingLLM, make_classifier
+
+class TestMerchantDirectory:
+    def test_tokenizes_store_names(self):
+        assert merchant_tokens("Trader Joe's #552") == ["TRADER", "JOES", "552"]
+        assert merchant_tokens("CVS/PHARMACY") == ["CVS", "PHARMACY"]
+
+    def test_matches_receipts_and_statement_descriptions(self):
+        directory = MerchantDirectory()
+        for text in ["WALMART SUPERCENTER", "POS DEBIT WAL-MART #1234 DALLAS TX", "Walmart.com 8009256278"]:
+            match = directory.match(text)
+            assert match.merchant == "Walmart"
+            assert match.store_label == "Grocery Store"
+            assert match.category == "groceries"
+
+    def test_matches_whole_words_only(self):
+        directory = MerchantDirectory()
+        assert directory.match("GAP OUTLET #12").merchant == "Gap"
+        assert directory.match("SINGAPORE AIRLINES") is None
+
+    def test_prefers_longest_merchant_over_keywords(self):
+        directory = MerchantDirectory([
+            Merchant("Home Depot", "home", "household"),
+            Merchant("Depot Foods", "grocery", "groceries"),
+        ])
+        assert directory.match("THE HOME DEPOT FOODS").merchant == "Home Depot"
+        # A generic keyword still reveals the store type
+        match = directory.match("Joe's Food Mart")
+        assert match.merchant is None
+        assert match.store_type == "grocery"
+        # A merchant beats a keyword of the same length
+        assert MerchantDirectory().match("CVS/PHARMACY #0312").merchant == "CVS"
+
+    def test_overlapping_aliases_use_failure_links(self):
+        directory = MerchantDirectory([
+            Merchant("Blue Bottle Coffee", "dining", "dining"),
+            Merchant("Bottle King", "grocery", "groceries"),
+        ], keywords={})
+        assert directory.match("SQ *BLUE BOTTLE KING ST").merchant == "Bottle King"
+        assert directory.match("BLUE BOTTLE COFFEE OAKLAND").merchant == "Blue Bottle Coffee"
+
+    def test_reads_directory_file(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "merchants.csv"
+            path.write_text(
+                "name,aliases,store_type,category\n"
+                "Costco,Costco Whse|Costco Wholesale,Grocery,groceries\n"
+                ",missing name,grocery,groceries\n"
+            )
+            merchants = read_merchant_file(path)
+        assert merchants == [Merchant("Costco", "grocery", "groceries", ("Costco Whse", "Costco Wholesale"))]
+        assert MerchantDirectory(merchants).match("COSTCO WHSE #0481").merchant == "Costco"
+
+class TestClassifierStoreType:
+    def test_store_type_comes_from_directory(self):
+        classifier = make_classifier(RecordingLLM())
+        assert classifier._get_store_type("Kroger #512") == "Grocery Store"
+        assert classifier._get_store_type("Joe's Corner Shop") == "General Retail Store"
+        assert classifier.stats()["merchant_directory"]["merchants"] >= 1
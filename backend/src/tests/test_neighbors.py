@@ -0,0 +1,70 @@
+import sys
+import os
+import asyncio
+import tempfile
+from pathlib import Path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.categorization.neighbors import NeighborIndex, fold_description
+from services.categorization.classifier import ExpenseCategory, TAXONOMY_VERSION
+from test_classification_cache import RecordingLLM, make_classifier
+
+def make_index():
+    index = NeighborIndex(TAXONOMY_VERSION)
+    index.add(
+        ["LEAN CUISINE", "PAPER TOWELS", "CHOBANI YOGURT"],
+        ["groceries", "household", "groceries"],
+        [0.95, 0.9, 0.9]
+    )
+    return index
+
+class TestNeighborIndex:
+    def test_folds_ocr_digit_confusions(self):
+        assert fold_description("Lean Cuis1n") == "LEAN CUISIN"
+        # Numbers on their own are left alone
+        assert fold_description("5OAP 10 PK") == "SOAP 10 PK"
+
+    def test_finds_ocr_variants(self):
+        matches = make_index().query(["LEAN CUISIN", "LEAN CUIS1N", "PAPER TOWEL", "LEAN POCKET", ""])
+
+        assert [match.description if match else None for match in matches] == [
+            "LEAN CUISINE", "LEAN CUISINE", "PAPER TOWELS", None, None
+        ]
+        assert matches[0].category == "groceries"
+        assert 0.6 <= matches[0].similarity < 1.0
+
+    def test_updates_incrementally(self):
+        index = make_index()
+        index.add(["LEAN CUISINE", "DOG FOOD"], ["dining", "pets"], [0.8, 0.9])
+
+        assert len(index) == 4
+        assert index.query(["LEAN CUISINE"])[0].category == "dining"
+        assert index.query(["DOG F00D"])[0].category == "pets"
+
+    def test_snapshot_round_trip(self):
+        index = make_index()
+        with tempfile.TemporaryDirectory() as directory:
+            loaded = NeighborIndex.load(index.save(Path(directory) / "neighbors.npz"))
+
+        assert loaded.taxonomy_version == TAXONOMY_VERSION
+        assert loaded.query(["CHOBANI YOGRT"])[0].description == "CHOBANI YOGURT"
+        loaded.add(["BLEACH"], ["household"], [0.9])
+        assert loaded.query(["BLEACH"])[0].similarity == 1.0
+
+class TestNeighborTier:
+    def test_reuses_labels_of_close_descriptions(self):
+        llm = RecordingLLM()
+        classifier = make_classifier(llm)
+
+        classify = lambda descriptions: asyncio.run(classifier.classify_items(
+            [{"description": d, "price": 1.0} for d in descriptions], "Walmart", 1.0
+        ))
+        classify(["OAT MILK 64OZ", "SPONGE"])
+        result = classify(["OAT M1LK 64OZ", "SP0NGE", "BREAD"])
+
+        # OCR variants are answered from the index; only the new item reaches the LLM
+        assert llm.calls[1] == ["BREAD"]
+        assert [item.category for item in result] == [
+            ExpenseCategory.GROCERIES, ExpenseCategory.HOUSEHOLD, ExpenseCategory.HOUSEHOLD
+        ]
+        assert classifier.stats()["neighbor"] == 2
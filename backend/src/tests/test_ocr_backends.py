@@ -0,0 +1,64 @@
+import sys
+import os
+import asyncio
+import numpy as np
+import pytest
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.ocr import backends
+from services.ocr.backends import OCRBackend, PytesseractBackend, create_backend
+from services.ocr.extractor import ReceiptExtractor
+from services.ocr.ocr_result import OCRResult, OCRWord
+from services.ocr.pool import OCRWorkerPool
+
+class StaticBackend(OCRBackend):
+    name = "static"
+
+    def __init__(self, text):
+        self.text = text
+        self.calls = 0
+
+    def image_to_text(self, image):
+        self.calls += 1
+        return self.text
+
+    def image_to_data(self, image):
+        self.calls += 1
+        return OCRResult(words=[
+            OCRWord(word, 0, 0, 10, 10, 90.0, line_id)
+            for line_id, line in enumerate(self.text.splitlines())
+            for word in line.split()
+        ])
+
+def _worker_marker():
+    os.environ["OCR_TEST_WARM"] = "1"
+
+def _read_marker():
+    return os.environ.get("OCR_TEST_WARM")
+
+class TestOCRBackends:
+    def test_extractor_uses_injected_backend(self):
+        backend = StaticBackend("STORE\nTotal: $5.00")
+        extractor = ReceiptExtractor(backend=backend)
+
+        assert extractor.extract_text(np.zeros((4, 4), np.uint8)) == "STORE\nTotal: $5.00"
+        assert extractor.extract_text_data(np.zeros((4, 4), np.uint8)).text == "STORE\nTotal: $5.00"
+        assert backend.calls == 2
+
+    def test_auto_falls_back_to_pytesseract(self, monkeypatch):
+        monkeypatch.setattr(backends, "tesserocr", None)
+        assert isinstance(create_backend("auto"), PytesseractBackend)
+
+        with pytest.raises(RuntimeError):
+            create_backend("tesserocr")
+
+    def test_unknown_backend(self):
+        with pytest.raises(ValueError):
+            create_backend("paddle")
+
+    def test_pool_initializer_runs_in_each_worker(self):
+        pool = OCRWorkerPool(max_workers=1, queue_size=0, initializer=_worker_marker)
+        try:
+            assert asyncio.run(pool.run("extract", _read_marker)) == "1"
+        finally:
+            pool.shutdown()
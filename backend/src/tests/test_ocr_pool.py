@@ -0,0 +1,87 @@
+import sys
+import os
+import time
+import asyncio
+import pytest
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.ocr.pool import OCRWorkerPool, OCRQueueFullError, OCRStageTimeoutError
+
+class TestOCRWorkerPool:
+    def test_runs_stage_in_worker_process(self):
+        pool = OCRWorkerPool(max_workers=1, queue_size=0)
+        try:
+            worker_pid = asyncio.run(pool.run("extract", os.getpid))
+            assert worker_pid != os.getpid()
+        finally:
+            pool.shutdown()
+
+    def test_inline_mode_without_workers(self):
+        pool = OCRWorkerPool(max_workers=0, queue_size=0)
+        assert asyncio.run(pool.run("extract", os.getpid)) == os.getpid()
+
+    def test_stage_timeout(self):
+        pool = OCRWorkerPool(max_workers=1, queue_size=0, timeouts={"preprocess": 0.1})
+        try:
+            with pytest.raises(OCRStageTimeoutError):
+                asyncio.run(pool.run("preprocess", time.sleep, 1))
+        finally:
+            pool.shutdown()
+
+    def test_rejects_when_queue_is_full(self):
+        pool = OCRWorkerPool(max_workers=1, queue_size=1)
+
+        async def submit_burst():
+            jobs = [pool.run("extract", time.sleep, 0.2) for _ in range(3)]
+            return await asyncio.gather(*jobs, return_exceptions=True)
+
+        try:
+            results = asyncio.run(submit_burst())
+            rejected = [r for r in results if isinstance(r, OCRQueueFullError)]
+            assert len(rejected) == 1
+            assert pool.in_flight == 0
+        finally:
+            pool.shutdown()
+
+    def test_timed_out_job_keeps_its_slot_until_it_ends(self):
+        pool = OCRWorkerPool(max_workers=1, queue_size=0, timeouts={"extract": 0.1})
+        try:
+            with pytest.raises(OCRStageTimeoutError):
+                asyncio.run(pool.run("extract", time.sleep, 0.6))
+            # The worker is still busy, so there is no room for another job
+            assert pool.in_flight == 1
+            with pytest.raises(OCRQueueFullError):
+                asyncio.run(pool.run("extract", os.getpid))
+
+            deadline = time.monotonic() + 5
+            while pool.in_flight and time.monotonic() < deadline:
+                time.sleep(0.05)
+            assert pool.in_flight == 0
+            assert asyncio.run(pool.run("extract", os.getpid)) != os.getpid()
+        finally:
+            pool.shutdown()
+
+    def test_group_takes_one_slot(self):
+        pool = OCRWorkerPool(max_workers=1, queue_size=0)
+        try:
+            # Four parts on a pool with room for a single job
+            pids = asyncio.run(pool.run_group("extract", os.getpid, [()] * 4))
+            assert len(pids) == 4 and os.getpid() not in pids
+            assert pool.in_flight == 0
+        finally:
+            pool.shutdown()
+
+    def test_group_keeps_its_slot_until_parts_end(self):
+        pool = OCRWorkerPool(max_workers=2, queue_size=0, timeouts={"extract": 0.1})
+        try:
+            with pytest.raises(OCRStageTimeoutError):
+                asyncio.run(pool.run_group("extract", time.sleep, [(0.6,), (0.6,), (0.6,)]))
+            # Parts still running hold the group's single slot
+            assert pool.in_flight == 1
+
+            deadline = time.monotonic() + 5
+            while pool.in_flight and time.monotonic() < deadline:
+                time.sleep(0.05)
+            assert pool.in_flight == 0
+        finally:
+            pool.shutdown()
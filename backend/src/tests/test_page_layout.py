@@ -0,0 +1,45 @@
+import sys
+import os
+import io
+import pdfplumber
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "tools"))
+
+from generate_sample_statement import make_transactions, render_statement_pdf
+from services.pdf_processing.layout import analyse_page, group_lines
+from services.pdf_processing.statement_extractor import StatementProcessor
+
+def word(text, x0, top):
+    return {"text": text, "x0": x0, "x1": x0 + 6 * len(text), "top": top, "bottom": top + 10}
+
+class TestGroupLines:
+    def test_clusters_by_top_and_orders_left_to_right(self):
+        words = [word("TRIP", 90, 101), word("01/02/2024", 10, 100), word("UBER", 60, 99.5), word("FEE", 10, 120)]
+        lines = group_lines(words)
+        assert [[w["text"] for w in line] for line in lines] == [["01/02/2024", "UBER", "TRIP"], ["FEE"]]
+
+class TestAnalysePage:
+    def test_tables_match_pdfplumber_and_rows_leave_the_text(self):
+        rows = make_transactions(60)
+        with pdfplumber.open(io.BytesIO(render_statement_pdf(rows, rows_per_page=30))) as pdf:
+            for page in pdf.pages:
+                layout = analyse_page(page)
+                assert layout.tables == page.extract_tables()
+                assert layout.lines == [page.extract_text().split("\n")[0]]
+
+    def test_each_row_is_emitted_once(self):
+        rows = make_transactions(60)
+        processor = StatementProcessor(workers=1)
+        with pdfplumber.open(io.BytesIO(render_statement_pdf(rows, rows_per_page=30))) as pdf:
+            transactions = [t for number, page in enumerate(pdf.pages, 1) for t in processor._process_page(page, number)]
+
+        # Descriptions come back with the PDF's glyphs (e.g. a curly apostrophe), so compare dates
+        assert [t.date.strftime("%m/%d/%Y") for t in transactions] == [date for date, _, _ in rows]
+        assert [f"{'-' if t.transaction_type == 'debit' else ''}${t.amount:,.2f}" for t in transactions] == [
+            amount for _, _, amount in rows
+        ]
+        assert {t.source for t in transactions} == {"table"}
+
+    def test_free_text_transactions_are_marked(self):
+        transactions = StatementProcessor(workers=1)._process_text("01/02/2024 UBER TRIP -$14.06")
+        assert [(t.description, t.source) for t in transactions] == [("UBER TRIP", "text")]
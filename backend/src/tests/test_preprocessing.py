@@ -0,0 +1,34 @@
+import sys
+import os
+import cv2
+import pytest
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "tools"))
+
+from services.ocr.preprocessing import ImagePreprocessor
+from generate_sample_receipt import render_sample_receipt
+
+def rotated_receipt(angle):
+    items = [(f"Item {i:02d}", 1.0 + i) for i in range(30)]
+    receipt = cv2.cvtColor(render_sample_receipt(items=items, noise=False), cv2.COLOR_RGB2GRAY)
+    # Upscale to roughly phone-photo resolution
+    receipt = cv2.resize(receipt, None, fx=3, fy=3, interpolation=cv2.INTER_CUBIC)
+    padded = cv2.copyMakeBorder(receipt, 100, 100, 200, 200, cv2.BORDER_CONSTANT, value=255)
+    h, w = padded.shape
+    M = cv2.getRotationMatrix2D((w / 2, h / 2), angle, 1.0)
+    return cv2.warpAffine(padded, M, (w, h), borderValue=255)
+
+class TestSkewEstimation:
+    @pytest.mark.parametrize("angle", [-8, -3, 2, 6])
+    def test_recovers_rotation(self, angle):
+        estimate = ImagePreprocessor._get_skew_angle(rotated_receipt(angle))
+        assert estimate == pytest.approx(-angle, abs=0.3)
+
+    def test_level_text_skips_search(self):
+        image = rotated_receipt(0)
+        assert ImagePreprocessor._is_horizontal(ImagePreprocessor._ink_points(255 - image))
+        assert ImagePreprocessor._get_skew_angle(image) == 0.0
+
+    def test_blank_image(self):
+        blank = rotated_receipt(0) * 0 + 255
+        assert ImagePreprocessor._get_skew_angle(blank) == 0.0
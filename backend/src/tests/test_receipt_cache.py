@@ -0,0 +1,64 @@
+import sys
+import os
+from datetime import datetime
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.cache import LRUCache
+from services.ocr.cache import ReceiptResultCache
+from services.ocr.extractor import Receipt, ReceiptItem
+from services.ocr.ocr_result import OCRResult, OCRWord
+
+def make_receipt():
+    return Receipt(
+        store_name="GROCERY STORE",
+        date=datetime(2024, 1, 23),
+        items=[
+            ReceiptItem("MILK 1L", 3.99, 1, category="groceries", confidence=0.95),
+            ReceiptItem("BREAD", 2.49, 2)
+        ],
+        total=9.21,
+        subtotal=8.97,
+        tax=0.24,
+        raw_text="GROCERY STORE\nMILK 1L $3.99"
+    )
+
+class TestLRUCache:
+    def test_evicts_least_recently_used(self):
+        cache = LRUCache(max_entries=2)
+        cache.put("a", 1)
+        cache.put("b", 2)
+        assert cache.get("a") == 1
+        cache.put("c", 3)
+
+        assert "b" not in cache
+        assert cache.get("a") == 1
+        assert cache.get("b") is None
+        assert cache.stats() == {
+            "entries": 2, "max_entries": 2, "hits": 2, "misses": 1, "evictions": 1
+        }
+
+class TestReceiptResultCache:
+    def test_digest_depends_on_content(self):
+        assert ReceiptResultCache.digest(b"abc") == ReceiptResultCache.digest(b"abc")
+        assert ReceiptResultCache.digest(b"abc") != ReceiptResultCache.digest(b"abd")
+
+    def test_round_trip_in_memory(self):
+        cache = ReceiptResultCache(max_entries=4)
+        digest = cache.digest(b"image-bytes")
+        assert cache.get(digest) is None
+
+        cache.put(digest, make_receipt())
+        cached = cache.get(digest)
+
+        assert cached == make_receipt()
+        assert cached is not cache.get(digest)  # callers get independent copies
+        assert cache.stats()["hits"] == 2
+        assert cache.stats()["misses"] == 1
+
+    def test_keeps_ocr_output(self):
+        cache = ReceiptResultCache(max_entries=4)
+        receipt = make_receipt()
+        receipt.ocr_result = OCRResult(words=[OCRWord("MILK", 0, 0, 40, 10, 91.0, 0)])
+        cache.put("digest", receipt)
+
+        assert cache.get("digest").ocr_result == receipt.ocr_result
@@ -0,0 +1,82 @@
+import sys
+import os
+from datetime import datetime
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database.models import Base, User, Receipt, ReceiptItem, CategoryType
+from services.ocr.ocr_result import OCRResult, OCRWord
+from services.ocr.reparse import ReceiptReparser
+
+def ocr_result(lines):
+    return OCRResult(words=[
+        OCRWord(word, 10 * i, 20 * line_id, 10, 10, 90.0, line_id)
+        for line_id, line in enumerate(lines)
+        for i, word in enumerate(line.split())
+    ])
+
+def make_session():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine, tables=[
+        User.__table__, Receipt.__table__, ReceiptItem.__table__
+    ])
+    return sessionmaker(bind=engine)()
+
+class TestOCRResultSerialization:
+    def test_round_trip(self):
+        result = ocr_result(["ÉPICERIE DU COIN", "Total: $5.00"])
+        data = result.to_bytes()
+
+        assert isinstance(data, bytes)
+        assert OCRResult.from_bytes(data) == result
+        assert OCRResult.from_bytes(OCRResult().to_bytes()) == OCRResult()
+
+class TestReceiptReparser:
+    def test_updates_changed_receipts_in_chunks(self):
+        db = make_session()
+        db.add(User(id=1, email="test@example.com", hashed_password="x"))
+        stored_date = datetime(2024, 1, 1)
+        lines = ["CORNER SHOP", "01/23/2024", "Milk $3.99", "Bread $2.49", "Total: $6.48"]
+        for receipt_id in range(1, 6):
+            db.add(Receipt(
+                id=receipt_id, user_id=1, store_name="OLD", date=stored_date,
+                subtotal=0.0, tax=0.0, total=0.0, raw_text="",
+                ocr_data=ocr_result(lines).to_bytes(),
+                items=[ReceiptItem(description="MILK", price=3.99, category=CategoryType.GROCERIES)]
+            ))
+        # Receipts saved before OCR output was stored are skipped
+        db.add(Receipt(id=6, user_id=1, store_name="NO OCR", date=stored_date,
+                       subtotal=0.0, tax=0.0, total=0.0))
+        db.commit()
+
+        chunks = []
+        stats = ReceiptReparser(chunk_size=2).run(db, on_chunk=lambda s: chunks.append(s.scanned))
+
+        assert (stats.scanned, stats.updated, stats.failed, stats.last_id) == (5, 5, 0, 5)
+        assert chunks == [2, 4, 5]
+
+        receipt = db.get(Receipt, 3)
+        assert (receipt.store_name, receipt.total) == ("CORNER SHOP", 6.48)
+        assert receipt.date == datetime(2024, 1, 23)
+        assert [(i.description, i.price, i.category) for i in receipt.items] == [
+            ("MILK", 3.99, CategoryType.GROCERIES),
+            ("BREAD", 2.49, CategoryType.MISCELLANEOUS)
+        ]
+        assert db.get(Receipt, 6).store_name == "NO OCR"
+
+        # Nothing left to change on a second run
+        assert ReceiptReparser().run(db).updated == 0
+
+    def test_dry_run_writes_nothing(self):
+        db = make_session()
+        db.add(User(id=1, email="test@example.com", hashed_password="x"))
+        db.add(Receipt(id=1, user_id=1, store_name="OLD", date=datetime(2024, 1, 1),
+                       subtotal=0.0, tax=0.0, total=0.0,
+                       ocr_data=ocr_result(["SHOP", "Total: $1.00"]).to_bytes()))
+        db.commit()
+
+        stats = ReceiptReparser().run(db, dry_run=True)
+
+        assert stats.updated == 1
+        assert db.get(Receipt, 1).store_name == "OLD"
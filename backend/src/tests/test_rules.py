@@ -0,0 +1,126 @@
+import sys
+import os
+import asyncio
+from datetime import datetime
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database.models import (
+    Base, User, Receipt, ReceiptItem, BankTransaction, CategoryRule, CategoryType, TransactionType
+)
+from services.categorization.classifier import ExpenseCategory
+from services.categorization.rules import CompiledRules, Rule, RuleEngine, apply_rules
+from test_classification_cache import RecordingLLM, make_classifier
+
+RULES = [
+    Rule(1, "uber", "transportation"),
+    Rule(2, "AMAZON", "household"),
+    Rule(3, "amazon", "electronics", min_amount=200),
+    Rule(4, "uber eats", "dining"),
+    Rule(5, "100%_", "utilities"),
+]
+
+def make_db():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine, tables=[
+        User.__table__, Receipt.__table__, ReceiptItem.__table__,
+        BankTransaction.__table__, CategoryRule.__table__
+    ])
+    db = sessionmaker(bind=engine)()
+    for user_id in (1, 2):
+        db.add(User(id=user_id, email=f"user{user_id}@example.com", hashed_password="x"))
+    db.commit()
+    return db
+
+def add_receipt(db, user_id, items):
+    receipt = Receipt(user_id=user_id, store_name="Store", date=datetime(2024, 1, 1),
+                      subtotal=0, tax=0, total=0)
+    db.add(receipt)
+    db.flush()
+    for description, price in items:
+        db.add(ReceiptItem(receipt_id=receipt.id, description=description, quantity=1,
+                           price=price, category=CategoryType.MISCELLANEOUS))
+    db.commit()
+    return receipt
+
+class TestCompiledRules:
+    def test_picks_most_specific_matching_rule(self):
+        rules = CompiledRules(RULES)
+        assert rules.match("UBER TRIP 1234", 12.0).id == 1
+        assert rules.match("Uber Eats", 30.0).id == 4
+        assert rules.match("AMAZON MKTPLACE", 50.0).id == 2
+        assert rules.match("AMAZON MKTPLACE", 250.0).id == 3
+        assert rules.match("WALMART", 5.0) is None
+
+    def test_patterns_are_literal(self):
+        rules = CompiledRules(RULES)
+        assert rules.match("GREEN 100%_ ENERGY", 80.0).id == 5
+        assert rules.match("GREEN 1000 ENERGY", 80.0) is None
+
+    def test_priority_overrides_specificity(self):
+        rules = CompiledRules(RULES + [Rule(6, "UBER", "entertainment", priority=1)])
+        assert rules.match("UBER EATS", 30.0).id == 6
+
+class TestRuleTier:
+    def test_rules_decide_before_any_model(self):
+        llm = RecordingLLM()
+        classifier = make_classifier(llm)
+        result = asyncio.run(classifier.classify_items(
+            items=[{"description": d, "price": p} for d, p in [("UBER TRIP", 20.0), ("WHOLE MILK", 3.0)]],
+            store_name="Walmart", total_amount=23.0, rules=CompiledRules(RULES)
+        ))
+        assert llm.calls == [["WHOLE MILK"]]
+        assert [item.category for item in result] == [ExpenseCategory.TRANSPORTATION, ExpenseCategory.GROCERIES]
+        assert classifier.served["rule"] == 1
+
+    def test_streamed_rules_keep_original_positions(self):
+        classifier = make_classifier(RecordingLLM())
+
+        async def collect():
+            return dict([pair async for pair in classifier.stream_classify_items(
+                items=[{"description": d, "price": 5.0} for d in ["WHOLE MILK", "UBER TRIP", "SOAP"]],
+                store_name="Walmart", total_amount=15.0, rules=CompiledRules(RULES)
+            )])
+
+        result = asyncio.run(collect())
+        assert result[1].category == ExpenseCategory.TRANSPORTATION
+        assert result[0].category == ExpenseCategory.GROCERIES
+        assert result[2].category == ExpenseCategory.HOUSEHOLD
+
+class TestApplyRules:
+    def test_updates_matching_rows_in_bulk(self):
+        db = make_db()
+        add_receipt(db, 1, [("Uber Eats order", 30.0), ("AMAZON BASICS", 250.0), ("MILK", 3.0)])
+        other_user = add_receipt(db, 2, [("UBER TRIP", 10.0)])
+        db.add(BankTransaction(user_id=1, date=datetime(2024, 1, 2), description="POS AMAZON MKTPLACE",
+                               amount=40.0, transaction_type=TransactionType.DEBIT,
+                               category=CategoryType.MISCELLANEOUS))
+        db.commit()
+
+        updated = apply_rules(db, 1, RULES)
+
+        assert updated == {"receipt_items": 2, "bank_transactions": 1}
+        categories = {item.description: item.category for item in db.query(ReceiptItem).all()}
+        assert categories["Uber Eats order"] == CategoryType.DINING
+        assert categories["AMAZON BASICS"] == CategoryType.ELECTRONICS
+        assert categories["MILK"] == CategoryType.MISCELLANEOUS
+        # Another user's rows are untouched
+        assert other_user.items[0].category == CategoryType.MISCELLANEOUS
+        assert db.query(BankTransaction).one().category == CategoryType.HOUSEHOLD
+
+    def test_engine_recompiles_after_edit(self):
+        db = make_db()
+        engine = RuleEngine()
+        receipt = add_receipt(db, 1, [("UBER TRIP", 10.0)])
+        assert len(engine.rules_for(db, 1)) == 0
+
+        db.add(CategoryRule(user_id=1, pattern="uber", category="transportation"))
+        db.commit()
+        # Cached until invalidated by an edit
+        assert len(engine.rules_for(db, 1)) == 0
+        assert engine.reapply(db, 1)["receipt_items"] == 1
+        assert len(engine.rules_for(db, 1)) == 1
+
+        db.refresh(receipt)
+        assert receipt.items[0].category == CategoryType.TRANSPORTATION
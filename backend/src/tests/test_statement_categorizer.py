@@ -0,0 +1,70 @@
+import sys
+import os
+import asyncio
+from datetime import datetime
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database.models import CategoryType
+from services.categorization.statements import StatementCategorizer, statement_key
+from services.pdf_processing.statement_extractor import BankTransaction
+from test_classification_cache import RecordingLLM, make_classifier
+
+def make_transactions(descriptions):
+    return [
+        BankTransaction(
+            date=datetime(2024, 1, 1 + i % 28),
+            description=description,
+            amount=10.0 + i,
+            transaction_type="debit"
+        )
+        for i, description in enumerate(descriptions)
+    ]
+
+class TestStatementKey:
+    def test_strips_prefixes_and_references(self):
+        assert statement_key("POS STARBUCKS #1123") == "STARBUCKS"
+        assert statement_key("TST* JOES PIZZA 12") == "JOES PIZZA"
+        # Nothing but noise keeps the original words
+        assert statement_key("POS 1234") == "POS 1234"
+
+class TestStatementCategorizer:
+    def test_classifies_each_merchant_once(self):
+        llm = RecordingLLM()
+        categorizer = StatementCategorizer(make_classifier(llm))
+        descriptions = [
+            "POS MILKBAR #%04d" % i if i % 2 else "CORNER DELI %d" % i
+            for i in range(500)
+        ]
+        transactions = make_transactions(descriptions)
+
+        asyncio.run(categorizer.categorize(transactions))
+
+        assert len(llm.calls) == 1
+        assert sorted(llm.calls[0]) == ["CORNER DELI", "MILKBAR"]
+        for transaction in transactions:
+            expected = CategoryType.GROCERIES if "MILK" in transaction.description else CategoryType.HOUSEHOLD
+            assert transaction.category == expected.value
+        assert categorizer.stats()["distinct_merchants"] == 2
+
+    def test_known_merchants_skip_the_classifier(self):
+        llm = RecordingLLM()
+        categorizer = StatementCategorizer(make_classifier(llm))
+        transactions = make_transactions([
+            "WALMART SUPERCENTER #12", "POS WAL-MART 0042", "CVS PHARMACY 0042", "TARGET T-1234"
+        ])
+
+        asyncio.run(categorizer.categorize(transactions))
+
+        # Target has no default category, so only it reaches the LLM
+        assert llm.calls == [["Target"]]
+        assert [t.category for t in transactions] == [
+            CategoryType.GROCERIES.value, CategoryType.GROCERIES.value,
+            CategoryType.HEALTH_BEAUTY.value, CategoryType.HOUSEHOLD.value
+        ]
+        assert categorizer.stats()["merchant_directory_hits"] == 2
+
+    def test_failed_classification_is_still_storable(self):
+        categorizer = StatementCategorizer(make_classifier(RecordingLLM(fail=True)))
+        transactions = make_transactions(["UNKNOWN SHOP 1"])
+        asyncio.run(categorizer.categorize(transactions))
+        assert transactions[0].category == CategoryType.MISCELLANEOUS.value
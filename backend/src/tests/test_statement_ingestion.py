@@ -0,0 +1,66 @@
+import sys
+import os
+import asyncio
+from datetime import datetime
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "tools"))
+
+from database.models import Base, User, BankTransaction as StoredTransaction, CategoryType, TransactionType
+from database.utils import BankTransactionSink
+from generate_sample_statement import make_transactions, render_statement_pdf
+from services.pdf_processing.statement_extractor import BankTransaction, StatementProcessor
+
+def make_db():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine, tables=[User.__table__, StoredTransaction.__table__])
+    db = sessionmaker(bind=engine)()
+    db.add(User(id=1, email="user1@example.com", hashed_password="x"))
+    db.commit()
+    return engine, db
+
+class TestStreamStatement:
+    def test_yields_pages_in_order(self, tmp_path):
+        pdf_path = tmp_path / "statement.pdf"
+        pdf_path.write_bytes(render_statement_pdf(make_transactions(90), rows_per_page=20))
+        processor = StatementProcessor(workers=1)
+
+        async def collect():
+            return [page async for page in processor.stream_statement(str(pdf_path))]
+
+        pages = asyncio.run(collect())
+        assert [page.number for page in pages] == [1, 2, 3, 4, 5]
+        assert all(page.page_count == 5 for page in pages)
+        flattened = [t for page in pages for t in page.transactions]
+        assert flattened == asyncio.run(processor.process_statement(str(pdf_path)))
+
+class TestBankTransactionSink:
+    def test_writes_in_multi_row_batches(self):
+        engine, db = make_db()
+        inserts = []
+
+        @event.listens_for(engine, "before_cursor_execute")
+        def count_inserts(conn, cursor, statement, parameters, context, executemany):
+            if statement.startswith("INSERT INTO bank_transactions"):
+                inserts.append(statement)
+
+        transactions = [
+            BankTransaction(date=datetime(2024, 1, 1 + i), description=f"SHOP {i}", amount=1.0 + i,
+                            transaction_type="debit", category="dining" if i % 2 else None)
+            for i in range(25)
+        ]
+
+        sink = BankTransactionSink(db, user_id=1, batch_size=10)
+        assert asyncio.run(sink.add(transactions[:15])) == 10
+        assert sink.pending == 5
+        asyncio.run(sink.add(transactions[15:]))
+        assert asyncio.run(sink.flush()) == 25
+
+        assert sink.batches == 3
+        assert len(inserts) <= 3
+        stored = db.query(StoredTransaction).order_by(StoredTransaction.id).all()
+        assert [t.description for t in stored] == [t.description for t in transactions]
+        assert stored[0].category == CategoryType.MISCELLANEOUS
+        assert stored[1].category == CategoryType.DINING
+        assert stored[0].transaction_type == TransactionType.DEBIT
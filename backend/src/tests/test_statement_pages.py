@@ -0,0 +1,31 @@
+import sys
+import os
+import asyncio
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "tools"))
+
+from generate_sample_statement import make_transactions, render_statement_pdf
+from services.pdf_processing.statement_extractor import StatementProcessor, page_ranges
+
+class TestPageRanges:
+    def test_contiguous_and_balanced(self):
+        assert page_ranges(10, 3) == [(0, 4), (4, 7), (7, 10)]
+        assert page_ranges(2, 8) == [(0, 1), (1, 2)]
+        assert page_ranges(0, 4) == []
+
+class TestParallelExtraction:
+    def test_matches_sequential_order(self, tmp_path):
+        rows = make_transactions(170)
+        pdf_path = tmp_path / "statement.pdf"
+        pdf_path.write_bytes(render_statement_pdf(rows, rows_per_page=20))
+
+        sequential = asyncio.run(StatementProcessor(workers=1).process_statement(str(pdf_path)))
+        processor = StatementProcessor(workers=3)
+        try:
+            parallel = asyncio.run(processor.process_statement(str(pdf_path)))
+        finally:
+            processor.shutdown()
+
+        assert parallel == sequential
+        assert len(parallel) == len(rows)
+        assert parallel[0].description == rows[0][1]
@@ -0,0 +1,48 @@
+import sys
+import os
+from datetime import datetime
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.pdf_processing.scanner import StatementScanner
+from services.pdf_processing.statement_extractor import StatementProcessor
+
+class TestStatementScanner:
+    def test_each_amount_is_one_token(self):
+        scanner = StatementScanner()
+        assert scanner.find_amounts("PAYROLL $1,234.56 fee -$2.50 bal 10.00") == [1234.56, -2.5, 10.0]
+        assert scanner.find_amounts("REF 1.2345 STORE 5744") == []
+
+    def test_tokens_carry_spans(self):
+        text = "01/02/2024 UBER TRIP -$14.06"
+        tokens = StatementScanner().scan(text)
+        assert [(t.kind, text[t.start:t.end]) for t in tokens] == [("date", "01/02/2024"), ("amount", "-$14.06")]
+
+    def test_date_shapes(self):
+        scanner = StatementScanner()
+        expected = datetime(2024, 1, 23)
+        for text in ["01/23/2024", "01-23-24", "2024-01-23", "2024/01/23", "January 23, 2024", "Jan 23 2024", "23 Jan 2024"]:
+            assert scanner.find_date(f"Posted {text} POS") == expected, text
+        assert scanner.find_date("13/13/2024") is None
+
+    def test_day_order_is_detected_once_for_the_text(self):
+        scanner = StatementScanner()
+        lines = ["05/01/2024 A 1.00", "23/01/2024 B 2.00"]
+        assert scanner.detect_day_first(lines)
+        assert not scanner.detect_day_first(["05/01/2024 A 1.00", "01/23/2024 B 2.00"])
+        dates = [t.value for t in scanner.scan("\n".join(lines)) if t.kind == "date"]
+        assert dates == [datetime(2024, 1, 5), datetime(2024, 1, 23)]
+
+class TestTextParsing:
+    def test_amount_and_description_without_duplicates(self):
+        text = "\n".join([
+            "01/05/2024 TRADER JOE'S #552 -$43.50 1,234.56",
+            "02/23/2024 PAYROLL DEPOSIT $1,702.43",
+            "02/24/2024 CORNER DELI",
+            "POS PURCHASE -12.00"
+        ])
+        transactions = StatementProcessor(workers=1)._process_text(text)
+        assert [(t.description, t.amount, t.transaction_type) for t in transactions] == [
+            ("TRADER JOE'S #552", 43.5, "debit"),
+            ("PAYROLL DEPOSIT", 1702.43, "credit"),
+            ("CORNER DELI POS PURCHASE", 12.0, "debit")
+        ]
@@ -0,0 +1,85 @@
+import sys
+import os
+import json
+import importlib
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+from fastapi.testclient import TestClient
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "tools"))
+
+from services.categorization import llm
+# The routers build their classifiers at import; keep them offline without an API key
+if not os.getenv("OPENAI_API_KEY"):
+    llm.LLM_BACKEND = "fake"
+
+from main import app
+from database.config import get_db
+from database.models import (
+    Base, User, BankTransaction, CategoryRule, ClassificationCacheEntry
+)
+from generate_sample_statement import make_transactions, render_statement_pdf
+
+# api.routers re-exports the router object under the module's name
+statements = importlib.import_module("api.routers.statements")
+
+def make_client(monkeypatch):
+    # One in-memory database shared by the request and the stream's own session
+    engine = create_engine(
+        "sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool
+    )
+    Base.metadata.create_all(engine, tables=[
+        User.__table__, BankTransaction.__table__,
+        CategoryRule.__table__, ClassificationCacheEntry.__table__
+    ])
+    Session = sessionmaker(bind=engine)
+    with Session() as db:
+        db.add(User(id=1, email="user1@example.com", hashed_password="x"))
+        db.commit()
+
+    def session():
+        with Session() as db:
+            yield db
+
+    monkeypatch.setattr(statements, "SessionLocal", Session)
+    monkeypatch.setitem(app.dependency_overrides, get_db, session)
+    return TestClient(app), Session
+
+def upload(client, query=""):
+    pdf = render_statement_pdf(make_transactions(30), rows_per_page=20)
+    return client.post(
+        f"/api/statements/upload{query}",
+        files={"file": ("statement.pdf", pdf, "application/pdf")}
+    )
+
+class TestStatementUploadRoute:
+    def test_returns_json_by_default(self, monkeypatch):
+        client, Session = make_client(monkeypatch)
+        response = upload(client)
+
+        assert response.status_code == 200
+        assert response.json() == {"message": "Processed 30 transactions"}
+        with Session() as db:
+            assert db.query(BankTransaction).count() == 30
+
+    def test_streams_progress_events(self, monkeypatch):
+        client, Session = make_client(monkeypatch)
+        response = upload(client, "?stream=true")
+
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/event-stream")
+        events = [
+            (block.split("\n")[0][len("event: "):], json.loads(block.split("\n")[1][len("data: "):]))
+            for block in response.text.strip().split("\n\n")
+        ]
+        assert [name for name, _ in events] == ["page", "page", "done"]
+        assert [data["page"] for _, data in events[:2]] == [1, 2]
+        assert events[-1][1]["transactions"] == 30
+        with Session() as db:
+            assert db.query(BankTransaction).count() == 30
+
+    def test_shares_the_receipt_classifier(self):
+        receipts = importlib.import_module("api.routers.receipts")
+        classifier = statements.statement_categorizer.classifier
+        assert classifier is receipts.ocr_service.classifier
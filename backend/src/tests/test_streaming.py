@@ -0,0 +1,111 @@
+import sys
+import os
+import asyncio
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.categorization.streaming import ItemStreamParser, merge_streams
+from services.categorization.classifier import ExpenseCategory, to_category_type
+from database.models import CategoryType
+from test_classification_cache import RecordingLLM, make_classifier
+
+class Chunk:
+    def __init__(self, content):
+        self.content = content
+
+class StreamingLLM(RecordingLLM):
+    """Streams the RecordingLLM answer a few characters at a time, optionally cut short."""
+
+    def __init__(self, cut_after=None):
+        super().__init__()
+        self.cut_after = cut_after
+        self.streamed = []
+
+    async def astream(self, prompt):
+        answer = (await self.ainvoke(prompt)).content
+        self.streamed.append(len(self.calls))
+        if self.cut_after is not None:
+            answer = answer[:self.cut_after]
+        for start in range(0, len(answer), 7):
+            await asyncio.sleep(0)
+            yield Chunk(answer[start:start + 7])
+
+class TestItemStreamParser:
+    def test_items_complete_as_chunks_arrive(self):
+        text = '```json\n{"items": [{"id": 0, "reasoning": "a {brace} and \\"quote\\""}, {"id": 1}]}\n```'
+        parser = ItemStreamParser()
+
+        completed = []
+        for position, char in enumerate(text):
+            for item in parser.feed(char):
+                completed.append((item["id"], position))
+
+        assert [item_id for item_id, _ in completed] == [0, 1]
+        # The first item is available long before the answer ends
+        assert completed[0][1] < text.index('{"id": 1}')
+
+    def test_truncated_answer_keeps_finished_items(self):
+        parser = ItemStreamParser()
+        items = parser.feed('{"items": [{"id": 0, "category": "pets"}, {"id": 1, "categ')
+        assert items == [{"id": 0, "category": "pets"}]
+
+class TestMergeStreams:
+    def test_yields_in_arrival_order(self):
+        async def stream(values, delay):
+            for value in values:
+                await asyncio.sleep(delay)
+                yield value
+
+        async def run():
+            return [value async for value in merge_streams([
+                stream(["slow"], 0.02), stream(["fast-1", "fast-2"], 0.001)
+            ])]
+
+        assert asyncio.run(run()) == ["fast-1", "fast-2", "slow"]
+
+class TestStreamClassification:
+    def stream(self, classifier, descriptions):
+        async def run():
+            return [pair async for pair in classifier.stream_classify_items(
+                [{"description": d, "price": 1.0} for d in descriptions], "Walmart", 1.0
+            )]
+        return asyncio.run(run())
+
+    def test_cached_items_come_first_then_streamed_items(self):
+        llm = StreamingLLM()
+        classifier = make_classifier(llm)
+        classifier.llm = RecordingLLM()
+        asyncio.run(classifier.classify_items([{"description": "SOAP", "price": 1.0}], "Walmart", 1.0))
+
+        classifier.llm = llm
+        pairs = self.stream(classifier, ["MILK", "SOAP", "BREAD", "MILK"])
+
+        assert pairs[0][0] == 1  # cached
+        assert sorted(index for index, _ in pairs) == [0, 1, 2, 3]
+        categories = dict((index, item.category) for index, item in pairs)
+        assert categories == {
+            0: ExpenseCategory.GROCERIES, 1: ExpenseCategory.HOUSEHOLD,
+            2: ExpenseCategory.HOUSEHOLD, 3: ExpenseCategory.GROCERIES
+        }
+        # Duplicates are asked once and the answers are cached for later receipts
+        assert llm.calls == [["MILK", "BREAD"]]
+        assert classifier.stats()["cache"] == 1
+
+    def test_items_missing_from_a_cut_stream_are_retried(self):
+        llm = StreamingLLM(cut_after=120)
+        classifier = make_classifier(llm)
+
+        pairs = self.stream(classifier, ["MILK", "SOAP", "BREAD"])
+
+        assert sorted(index for index, _ in pairs) == [0, 1, 2]
+        assert all(item.category != ExpenseCategory.MISCELLANEOUS for _, item in pairs)
+        # The first call was streamed; the retry of the leftovers was not
+        assert llm.streamed == [1]
+        assert llm.calls[0] == ["MILK", "SOAP", "BREAD"]
+        assert len(llm.calls[1]) < 3
+
+class TestCategoryTypes:
+    def test_maps_to_database_categories(self):
+        assert to_category_type(ExpenseCategory.GROCERIES) == CategoryType.GROCERIES
+        assert to_category_type("personal_care") == CategoryType.HEALTH_BEAUTY
+        assert to_category_type(ExpenseCategory.PETS) == CategoryType.MISCELLANEOUS
+        assert to_category_type(None) == CategoryType.MISCELLANEOUS
@@ -0,0 +1,55 @@
+import sys
+import os
+import numpy as np
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.ocr.ocr_result import OCRResult, OCRWord
+from services.ocr.tiling import find_strips, stitch
+
+LINE_PITCH = 40
+LINE_HEIGHT = 20
+
+def striped_receipt(height):
+    """White page with a black 'text line' every LINE_PITCH rows."""
+    image = np.full((height, 300), 255, np.uint8)
+    for top in range(10, height - LINE_HEIGHT, LINE_PITCH):
+        image[top:top + LINE_HEIGHT, 20:280] = 0
+    return image
+
+def fake_ocr(image):
+    """Report every fully visible line of a strip as one word."""
+    dark = np.count_nonzero(image == 0, axis=1) > 0
+    words, top = [], None
+    for row, is_dark in enumerate(list(dark) + [False]):
+        if is_dark and top is None:
+            top = row
+        elif not is_dark and top is not None:
+            if top > 0 and row < image.shape[0]:
+                words.append(OCRWord("LINE", 20, top, 260, row - top, 90.0, len(words)))
+            top = None
+    return OCRResult(words=words)
+
+class TestStripTiling:
+    def test_short_image_is_one_strip(self):
+        strips = find_strips(striped_receipt(1000), strip_height=1500)
+        assert [(s.top, s.bottom) for s in strips] == [(0, 1000)]
+
+    def test_cuts_fall_between_lines(self):
+        image = striped_receipt(5000)
+        strips = find_strips(image, strip_height=1500, overlap=30)
+
+        assert len(strips) >= 4
+        assert strips[0].own_top == 0 and strips[-1].own_bottom == 5000
+        for before, after in zip(strips, strips[1:]):
+            assert before.own_bottom == after.own_top
+            assert (image[before.own_bottom] == 255).all()
+
+    def test_stitch_keeps_each_line_once(self):
+        image = striped_receipt(5000)
+        strips = find_strips(image, strip_height=1500, overlap=60)
+        results = [fake_ocr(image[s.top:s.bottom]) for s in strips]
+        merged = stitch(strips, results)
+
+        expected = fake_ocr(image)
+        assert [w.top for w in merged.words] == [w.top for w in expected.words]
+        assert len({w.line_id for w in merged.words}) == len(expected.words)
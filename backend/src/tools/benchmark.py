@@ -0,0 +1,277 @@
+import io
+import sys
+import json
+import time
+import asyncio
+import argparse
+import tempfile
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+import cv2
+import numpy as np
+from rich.console import Console
+from rich.table import Table
+
+# Add src directory to Python path
+current_dir = Path(__file__).parent
+src_dir = current_dir.parent
+sys.path.insert(0, str(src_dir))
+sys.path.insert(0, str(current_dir))
+
+import pdfplumber
+from services.ocr import stages, backends
+from services.ocr.preprocessing import ImagePreprocessor
+from services.ocr.extractor import ReceiptExtractor
+from services.categorization import classifier as classifier_module
+from services.categorization import cache as classification_cache
+from services.categorization.classifier import ExpenseClassifier, TAXONOMY_VERSION
+from services.categorization.cache import ClassificationCache
+from services.categorization.llm import FakeLLM
+from services.categorization.neighbors import NeighborIndex
+from services.categorization.merchants import DEFAULT_MERCHANTS, Merchant, MerchantDirectory
+from services.categorization.statements import StatementCategorizer
+from services.pdf_processing import statement_extractor
+from services.pdf_processing.layout import analyse_page
+from services.pdf_processing.statement_extractor import StatementProcessor, BankTransaction
+from generate_sample_receipt import render_sample_receipt
+from generate_sample_statement import make_transactions, render_statement_pdf
+
+console = Console()
+
+DEFAULT_BASELINE = current_dir / "benchmark_baseline.json"
+
+def make_item_names(count: int, seed: int = 0) -> List[str]:
+    """Random receipt-like item names of one to three words."""
+    rng = np.random.default_rng(seed)
+    letters = np.array(list("ABCDEFGHIJKLMNOPQRSTUVWXYZ"))
+    words = ["".join(rng.choice(letters, rng.integers(3, 9))) for _ in range(count)]
+    return [" ".join(rng.choice(words, rng.integers(1, 4))) for _ in range(count)]
+
+def percentile_summary(samples: List[float]) -> Dict[str, float]:
+    """Throughput and latency percentiles (ms) for per-call durations in seconds."""
+    durations = np.array(samples) * 1000
+    return {
+        "calls": len(samples),
+        "per_second": len(samples) / max(durations.sum() / 1000, 1e-12),
+        "p50_ms": float(np.percentile(durations, 50)),
+        "p99_ms": float(np.percentile(durations, 99)),
+        "mean_ms": float(durations.mean())
+    }
+
+def time_stage(fn: Callable[[], object], repeat: int, warmup: int = 1) -> Dict[str, float]:
+    """Call fn repeatedly and summarise the per-call durations."""
+    for _ in range(warmup):
+        fn()
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return percentile_summary(samples)
+
+def compare_to_baseline(
+    results: Dict[str, Dict[str, float]],
+    baseline: Dict[str, Dict[str, float]]
+) -> Dict[str, Optional[float]]:
+    """Relative p50 change per stage; None for stages missing from the baseline."""
+    changes = {}
+    for stage, result in results.items():
+        if stage in baseline and baseline[stage]["p50_ms"] > 0:
+            changes[stage] = result["p50_ms"] / baseline[stage]["p50_ms"] - 1
+        else:
+            changes[stage] = None
+    return changes
+
+def regressions(changes: Dict[str, Optional[float]], threshold: float) -> List[str]:
+    """Stages whose p50 grew by more than threshold."""
+    return [stage for stage, change in changes.items() if change is not None and change > threshold]
+
+def ocr_available() -> bool:
+    """Whether any OCR backend can run here (tesserocr or the tesseract binary)."""
+    try:
+        backends.create_backend().image_to_text(np.full((32, 32), 255, np.uint8))
+        return True
+    except Exception:
+        return False
+
+def build_stages(items: int, statement_rows: int) -> Dict[str, Callable[[], object]]:
+    """Synthetic inputs and one zero-argument callable per pipeline stage."""
+    receipt_items = [(f"Item {i:03d}", 1.0 + (i % 17)) for i in range(items)]
+    receipt = render_sample_receipt(items=receipt_items)
+    receipt = cv2.resize(receipt, None, fx=3, fy=3, interpolation=cv2.INTER_CUBIC)
+    jpeg = cv2.imencode(".jpg", cv2.cvtColor(receipt, cv2.COLOR_RGB2BGR))[1].tobytes()
+
+    decoded = stages.decode(jpeg)
+
+    subtotal = sum(price for _, price in receipt_items)
+    receipt_text = "\n".join(
+        ["GROCERY STORE", "01/23/2024"] +
+        [f"{name} ${price:.2f}" for name, price in receipt_items] +
+        [f"Subtotal: ${subtotal:.2f}", f"Tax: ${subtotal * 0.08:.2f}",
+         f"Total: ${subtotal * 1.08:.2f}"]
+    )
+
+    extractor = ReceiptExtractor()
+    # A zero-size cache sends every call to the (fake, zero-latency) LLM
+    classifier = ExpenseClassifier(cache=ClassificationCache(TAXONOMY_VERSION, max_entries=0), llm=FakeLLM())
+    # Keep the fake-LLM stages measuring the LLM path, not neighbour reuse
+    classifier.neighbors = None
+    cached_classifier = ExpenseClassifier(llm=FakeLLM())
+    # Single receipts should not wait out the batching window
+    classifier.batcher.window = cached_classifier.batcher.window = 0
+    classify_input = [{"description": name, "price": price} for name, price in receipt_items]
+
+    # Eight concurrent receipts of distinct items share LLM requests
+    burst_size = 8
+    burst_classifier = ExpenseClassifier(cache=ClassificationCache(TAXONOMY_VERSION, max_entries=0), llm=FakeLLM())
+    burst_classifier.neighbors = None
+    burst_inputs = [
+        [{"description": f"{name} #{receipt}", "price": price} for name, price in receipt_items]
+        for receipt in range(burst_size)
+    ]
+
+    async def classify_burst():
+        return await asyncio.gather(*(
+            burst_classifier.classify_items(items=receipt, store_name="GROCERY STORE", total_amount=subtotal)
+            for receipt in burst_inputs
+        ))
+
+    # Neighbour lookups of one receipt's worth of OCR variants in a 20k-item index
+    neighbor_index = NeighborIndex(TAXONOMY_VERSION)
+    known_items = [f"{name} {size}OZ" for name in make_item_names(2000) for size in range(10)]
+    neighbor_index.add(known_items, ["groceries"] * len(known_items), [0.9] * len(known_items))
+    neighbor_queries = [name[:-1] for name in known_items[::400]]
+
+    # Statement descriptions against a directory of 20k merchants
+    merchant_directory = MerchantDirectory(DEFAULT_MERCHANTS + [
+        Merchant(name, "grocery", "groceries") for name in make_item_names(20000, seed=1)
+    ])
+    transactions = make_transactions(statement_rows)
+    merchant_texts = [f"POS DEBIT {description} #{i:04d}" for i, (_, description, _) in enumerate(transactions)]
+
+    # Every distinct statement merchant goes to the (fake) LLM once per run
+    statement_classifier = ExpenseClassifier(cache=ClassificationCache(TAXONOMY_VERSION, max_entries=0), llm=FakeLLM())
+    statement_classifier.neighbors = None
+    statement_classifier.batcher.window = 0
+    statement_categorizer = StatementCategorizer(statement_classifier)
+    bank_transactions = [
+        BankTransaction(date=datetime.strptime(date, "%m/%d/%Y"), description=description,
+                        amount=float(amount.strip("-$").replace(",", "")), transaction_type="debit")
+        for date, description, amount in transactions
+    ]
+
+    pdf_bytes = render_statement_pdf(transactions)
+    processor = StatementProcessor()
+    with pdfplumber.open(io.BytesIO(pdf_bytes)) as pdf:
+        statement_text = "\n".join(page.extract_text() for page in pdf.pages)
+        statement_tables = [table for page in pdf.pages for table in page.extract_tables()]
+
+    # A statement long enough for the page-parallel mode, written once to disk
+    long_pdf_path = Path(tempfile.gettempdir()) / "benchmark_statement.pdf"
+    long_pdf_path.write_bytes(render_statement_pdf(make_transactions(statement_rows * 8)))
+    sequential_processor = StatementProcessor(workers=1)
+    parallel_processor = StatementProcessor()
+
+    def pdf_pages(extract):
+        def run():
+            with pdfplumber.open(io.BytesIO(pdf_bytes)) as pdf:
+                return [extract(page) for page in pdf.pages]
+        return run
+
+    stage_fns = {
+        "decode": lambda: stages.decode(jpeg),
+        "preprocess": lambda: ImagePreprocessor.preprocess_receipt(decoded),
+        "fast_preprocess": lambda: ImagePreprocessor.fast_preprocess(decoded),
+        "parse_receipt": lambda: extractor.extract_receipt_data(receipt_text),
+        "classify_stub_llm": lambda: asyncio.run(classifier.classify_items(
+            items=classify_input, store_name="GROCERY STORE", total_amount=subtotal
+        )),
+        "classify_cached": lambda: asyncio.run(cached_classifier.classify_items(
+            items=classify_input, store_name="GROCERY STORE", total_amount=subtotal
+        )),
+        "classify_burst_8": lambda: asyncio.run(classify_burst()),
+        "neighbor_query_50": lambda: neighbor_index.query(neighbor_queries),
+        "merchant_match": lambda: merchant_directory.match_many(merchant_texts),
+        "categorize_statement": lambda: asyncio.run(statement_categorizer.categorize(bank_transactions)),
+        "pdf_text": pdf_pages(lambda page: page.extract_text()),
+        "pdf_tables": pdf_pages(lambda page: page.extract_tables()),
+        "pdf_layout": pdf_pages(analyse_page),
+        "statement_sequential": lambda: asyncio.run(sequential_processor.process_statement(str(long_pdf_path))),
+        "statement_parallel": lambda: asyncio.run(parallel_processor.process_statement(str(long_pdf_path))),
+        "parse_statement_text": lambda: processor._process_text(statement_text),
+        "parse_statement_tables": lambda: processor._process_tables(statement_tables)
+    }
+    if ocr_available():
+        preprocessed = ImagePreprocessor.preprocess_receipt(decoded)
+        stage_fns["ocr"] = lambda: extractor.extract_text_data(preprocessed)
+    else:
+        console.print("[yellow]No OCR engine available, skipping the ocr stage")
+    return stage_fns
+
+def main():
+    parser = argparse.ArgumentParser(description="Time each receipt and statement pipeline stage")
+    parser.add_argument("--items", type=int, default=40, help="Item lines per synthetic receipt")
+    parser.add_argument("--rows", type=int, default=120, help="Transactions in the synthetic statement")
+    parser.add_argument("--repeat", type=int, default=20, help="Timed calls per stage")
+    parser.add_argument("--stages", nargs="*", help="Only run these stages")
+    parser.add_argument("--baseline", type=Path, default=DEFAULT_BASELINE)
+    parser.add_argument("--save-baseline", action="store_true", help="Write results as the new baseline")
+    parser.add_argument("--threshold", type=float, default=0.25,
+                        help="Allowed relative p50 slowdown before a stage fails")
+    args = parser.parse_args()
+
+    # Parsers and the classifier log every line; keep the report readable
+    for module in (statement_extractor, classifier_module, classification_cache):
+        module.console.quiet = True
+    backends.console.quiet = True
+
+    stage_fns = build_stages(args.items, args.rows)
+    if args.stages:
+        stage_fns = {name: fn for name, fn in stage_fns.items() if name in args.stages}
+
+    results = {}
+    for name, fn in stage_fns.items():
+        console.print(f"Timing {name}...", style="yellow")
+        results[name] = time_stage(fn, args.repeat)
+
+    baseline = {}
+    if args.baseline.exists() and not args.save_baseline:
+        baseline = json.loads(args.baseline.read_text())["stages"]
+    changes = compare_to_baseline(results, baseline)
+    failed = regressions(changes, args.threshold)
+
+    table = Table(show_header=True, header_style="bold magenta")
+    table.add_column("Stage")
+    table.add_column("ops/s", justify="right")
+    table.add_column("p50 ms", justify="right")
+    table.add_column("p99 ms", justify="right")
+    table.add_column("vs baseline", justify="right")
+    for name, result in results.items():
+        change = changes[name]
+        if change is None:
+            delta = "-"
+        else:
+            style = "red" if name in failed else "green"
+            delta = f"[{style}]{change:+.0%}[/]"
+        table.add_row(
+            name, f"{result['per_second']:.1f}", f"{result['p50_ms']:.2f}",
+            f"{result['p99_ms']:.2f}", delta
+        )
+    console.print(table)
+
+    if args.save_baseline:
+        args.baseline.write_text(json.dumps({
+            "config": {"items": args.items, "rows": args.rows, "repeat": args.repeat},
+            "stages": results
+        }, indent=2))
+        console.print(f"✓ Baseline saved to {args.baseline}", style="green")
+
+    if failed:
+        console.print(
+            f"[bold red]Regressed beyond {args.threshold:.0%}: {', '.join(failed)}"
+        )
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
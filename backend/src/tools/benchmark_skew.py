@@ -0,0 +1,95 @@
+import sys
+import time
+import argparse
+from pathlib import Path
+import cv2
+import numpy as np
+from rich.console import Console
+from rich.table import Table
+
+# Add src directory to Python path
+current_dir = Path(__file__).parent
+src_dir = current_dir.parent
+sys.path.insert(0, str(src_dir))
+sys.path.insert(0, str(current_dir))
+
+from services.ocr.preprocessing import ImagePreprocessor
+from generate_sample_receipt import render_sample_receipt
+
+console = Console()
+
+def legacy_skew_angle(image: np.ndarray) -> float:
+    """Skew estimator before the rewrite: full-resolution Hough, Python loop over lines."""
+    edges = cv2.Canny(image, 50, 150, apertureSize=3)
+    lines = cv2.HoughLines(edges, 1, np.pi/180, 100)
+
+    if lines is not None:
+        angles = []
+        for rho, theta in lines[:, 0]:
+            angle = np.degrees(theta) - 90
+            if -45 < angle < 45:
+                angles.append(angle)
+
+        if angles:
+            return np.median(angles)
+
+    return 0.0
+
+def make_rotated_receipts(angles, item_count: int, scale: float):
+    """Render a synthetic receipt, rotate it and binarise it like preprocess_receipt does."""
+    items = [(f"Item {i:03d}", 1.0 + (i % 17)) for i in range(item_count)]
+    receipt = cv2.cvtColor(render_sample_receipt(items=items), cv2.COLOR_RGB2GRAY)
+    receipt = cv2.resize(receipt, None, fx=scale, fy=scale, interpolation=cv2.INTER_CUBIC)
+    # Leave room so the rotation does not crop the text
+    padded = cv2.copyMakeBorder(receipt, 200, 200, 400, 400, cv2.BORDER_CONSTANT, value=255)
+    h, w = padded.shape
+
+    samples = []
+    for angle in angles:
+        M = cv2.getRotationMatrix2D((w / 2, h / 2), angle, 1.0)
+        rotated = cv2.warpAffine(padded, M, (w, h), borderValue=255)
+        rotated = ImagePreprocessor.fit_pixel_budget(rotated)
+        binary = cv2.adaptiveThreshold(
+            rotated, 255, cv2.ADAPTIVE_THRESH_GAUSSIAN_C, cv2.THRESH_BINARY, 11, 2
+        )
+        samples.append((angle, binary))
+    return samples
+
+def time_estimator(estimator, samples, repeat: int):
+    """Return (mean ms per image, mean absolute error in degrees)."""
+    errors = []
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for angle, image in samples:
+            # A receipt rotated by +a needs a correction of -a
+            errors.append(abs(float(estimator(image)) + angle))
+    elapsed = time.perf_counter() - start
+    return elapsed * 1000 / (repeat * len(samples)), float(np.mean(errors))
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark receipt skew estimation")
+    parser.add_argument("--items", type=int, default=60, help="Item lines per receipt")
+    parser.add_argument("--scale", type=float, default=3.0, help="Upscale factor (phone-photo sized input)")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    angles = [-10, -5, -2, -1, -0.3, 0, 0.3, 1, 2, 5, 10]
+    samples = make_rotated_receipts(angles, args.items, args.scale)
+    console.print(f"\n{len(samples)} rotated receipts at {samples[0][1].shape[1]}x{samples[0][1].shape[0]}")
+
+    table = Table(show_header=True, header_style="bold magenta")
+    table.add_column("Estimator")
+    table.add_column("ms / image", justify="right")
+    table.add_column("Mean abs error (deg)", justify="right")
+
+    for name, estimator in [
+        ("legacy (full-res Hough)", legacy_skew_angle),
+        ("current", ImagePreprocessor._get_skew_angle)
+    ]:
+        ms, error = time_estimator(estimator, samples, args.repeat)
+        table.add_row(name, f"{ms:.1f}", f"{error:.2f}")
+
+    console.print(table)
+
+if __name__ == "__main__":
+    main()
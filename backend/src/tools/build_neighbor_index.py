@@ -0,0 +1,55 @@
+import sys
+import time
+import argparse
+from pathlib import Path
+from rich.console import Console
+
+# Add src directory to Python path
+current_dir = Path(__file__).parent
+src_dir = current_dir.parent
+sys.path.insert(0, str(src_dir))
+
+from database.config import SessionLocal
+from database.models import ClassificationCacheEntry
+from services.categorization.neighbors import NeighborIndex, NEIGHBOR_INDEX_PATH
+
+console = Console()
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Snapshot the nearest-neighbour label index from the classification cache"
+    )
+    parser.add_argument("--taxonomy-version", required=True,
+                        help="ExpenseClassifier TAXONOMY_VERSION the labels belong to")
+    parser.add_argument("--output", type=Path, default=NEIGHBOR_INDEX_PATH)
+    parser.add_argument("--chunk-size", type=int, default=5000)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    index = NeighborIndex(args.taxonomy_version)
+    with SessionLocal() as db:
+        rows = db.query(
+            ClassificationCacheEntry.description,
+            ClassificationCacheEntry.category,
+            ClassificationCacheEntry.confidence
+        ).filter(
+            ClassificationCacheEntry.taxonomy_version == args.taxonomy_version
+        ).order_by(ClassificationCacheEntry.created_at).yield_per(args.chunk_size)
+
+        chunk = []
+        for row in rows:
+            chunk.append(row)
+            if len(chunk) == args.chunk_size:
+                index.add(*zip(*chunk))
+                chunk = []
+        if chunk:
+            index.add(*zip(*chunk))
+
+    path = index.save(args.output)
+    console.print(
+        f"✓ Indexed {len(index)} descriptions in {time.perf_counter() - start:.1f}s, saved to {path}",
+        style="green"
+    )
+
+if __name__ == "__main__":
+    main()
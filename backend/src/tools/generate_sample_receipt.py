@@ -5,11 +5,27 @@ from PIL import Image, ImageDraw, ImageFont
 import os
 from datetime import datetime
 from pathlib import Path
+from typing import List, Optional, Tuple
 
-def generate_sample_receipt():
-    # Create a white image
+DEFAULT_ITEMS = [
+    ("Milk 1L", 3.99),
+    ("Bread", 2.49),
+    ("Eggs 12pk", 4.99),
+    ("Bananas", 1.99),
+    ("Coffee", 7.99)
+]
+
+def render_sample_receipt(
+    items: Optional[List[Tuple[str, float]]] = None,
+    store_name: str = "GROCERY STORE",
+    noise: bool = True
+) -> np.ndarray:
+    """Draw a synthetic receipt and return it as an image array."""
+    items = items or DEFAULT_ITEMS
+
+    # Create a white image, tall enough for all items
     width = 400
-    height = 800
+    height = max(800, 330 + 30 * len(items))
     image = Image.new('RGB', (width, height), 'white')
     draw = ImageDraw.Draw(image)
     
@@ -20,15 +36,7 @@ def generate_sample_receipt():
         font = ImageFont.load_default()
     
     # Sample receipt content
-    store_name = "GROCERY STORE"
     date = datetime.now().strftime("%m/%d/%Y")
-    items = [
-        ("Milk 1L", 3.99),
-        ("Bread", 2.49),
-        ("Eggs 12pk", 4.99),
-        ("Bananas", 1.99),
-        ("Coffee", 7.99)
-    ]
     
     # Draw receipt content
     y_position = 50
@@ -65,18 +73,23 @@ def generate_sample_receipt():
     y_position += 30
     draw.text((50, y_position), f"Total:    ${total:>6.2f}", font=font, fill='black')
     
+    cv_image = np.array(image)
+    if noise:
+        # Add some noise and blur to make it more realistic
+        cv_image = cv2.GaussianBlur(cv_image, (3, 3), 0)
+        grain = np.random.normal(0, 2, cv_image.shape).astype(np.uint8)
+        cv_image = cv2.add(cv_image, grain)
+    return cv_image
+
+def generate_sample_receipt():
+    cv_image = render_sample_receipt()
+
     # Save the image
     current_dir = Path(__file__).parent
     samples_dir = current_dir.parent / 'tests' / 'samples'
     samples_dir.mkdir(parents=True, exist_ok=True)
     image_path = samples_dir / 'sample_receipt.jpg'
     
-    # Add some noise and blur to make it more realistic
-    cv_image = np.array(image)
-    cv_image = cv2.GaussianBlur(cv_image, (3, 3), 0)
-    noise = np.random.normal(0, 2, cv_image.shape).astype(np.uint8)
-    cv_image = cv2.add(cv_image, noise)
-    
     cv2.imwrite(str(image_path), cv_image)
     return str(image_path)
 
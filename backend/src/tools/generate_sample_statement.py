@@ -0,0 +1,108 @@
+import random
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import List, Tuple
+
+MERCHANTS = [
+    "WALMART SUPERCENTER", "SHELL OIL 5744", "NETFLIX.COM", "STARBUCKS #1123",
+    "AMAZON MKTPLACE", "CVS PHARMACY 0042", "UBER TRIP", "PG&E UTILITY PAYMENT",
+    "TRADER JOE'S #552", "PAYROLL DEPOSIT", "SPOTIFY USA", "HOME DEPOT 4410"
+]
+
+PAGE_WIDTH = 612
+PAGE_HEIGHT = 792
+ROW_HEIGHT = 18
+COLUMNS = [(40, "Date"), (130, "Description"), (460, "Amount")]
+TABLE_RIGHT = 572
+
+def make_transactions(count: int, seed: int = 0) -> List[Tuple[str, str, str]]:
+    """Random (date, description, amount) rows; debits are negative."""
+    rng = random.Random(seed)
+    day = datetime(2024, 1, 1)
+    rows = []
+    for _ in range(count):
+        day += timedelta(days=rng.randint(0, 2))
+        merchant = rng.choice(MERCHANTS)
+        amount = rng.uniform(3, 2500) if merchant == "PAYROLL DEPOSIT" else -rng.uniform(2, 300)
+        sign = "-" if amount < 0 else ""
+        rows.append((day.strftime("%m/%d/%Y"), merchant, f"{sign}${abs(amount):,.2f}"))
+    return rows
+
+def _escape(text: str) -> str:
+    return text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+def _page_content(title: str, rows: List[Tuple[str, str, str]]) -> bytes:
+    """Drawing operators for one page: a title and a ruled transaction table."""
+    ops = [f"BT /F1 14 Tf 40 {PAGE_HEIGHT - 50} Td ({_escape(title)}) Tj ET"]
+
+    top = PAGE_HEIGHT - 80
+    table = [tuple(name for _, name in COLUMNS)] + rows
+    bottom = top - ROW_HEIGHT * len(table)
+
+    # Ruling lines so table extraction can find the cells
+    for i in range(len(table) + 1):
+        y = top - ROW_HEIGHT * i
+        ops.append(f"{COLUMNS[0][0]} {y} m {TABLE_RIGHT} {y} l S")
+    for x in [x for x, _ in COLUMNS] + [TABLE_RIGHT]:
+        ops.append(f"{x} {top} m {x} {bottom} l S")
+
+    for i, row in enumerate(table):
+        y = top - ROW_HEIGHT * (i + 1) + 5
+        for (x, _), cell in zip(COLUMNS, row):
+            ops.append(f"BT /F1 10 Tf {x + 4} {y} Td ({_escape(cell)}) Tj ET")
+
+    return "\n".join(ops).encode("latin-1")
+
+def render_statement_pdf(
+    transactions: List[Tuple[str, str, str]],
+    rows_per_page: int = 35,
+    bank_name: str = "FIRST NATIONAL BANK"
+) -> bytes:
+    """Write a bank statement PDF with one ruled transaction table per page."""
+    pages = [
+        transactions[i:i + rows_per_page]
+        for i in range(0, len(transactions), rows_per_page)
+    ] or [[]]
+
+    # Object 1: catalog, 2: page tree, 3: font, then a page and its content stream per page
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        None,
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"
+    ]
+    page_ids = []
+    for number, rows in enumerate(pages, start=1):
+        content = _page_content(f"{bank_name} - Statement page {number}", rows)
+        objects.append(b"<< /Length %d >>\nstream\n%s\nendstream" % (len(content), content))
+        content_id = len(objects)
+        objects.append((
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 {PAGE_WIDTH} {PAGE_HEIGHT}] "
+            f"/Resources << /Font << /F1 3 0 R >> >> /Contents {content_id} 0 R >>"
+        ).encode("latin-1"))
+        page_ids.append(len(objects))
+    kids = " ".join(f"{page_id} 0 R" for page_id in page_ids)
+    objects[1] = f"<< /Type /Pages /Kids [{kids}] /Count {len(page_ids)} >>".encode("latin-1")
+
+    pdf = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(pdf))
+        pdf += b"%d 0 obj\n%s\nendobj\n" % (number, body)
+
+    xref = len(pdf)
+    pdf += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    for offset in offsets:
+        pdf += b"%010d 00000 n \n" % offset
+    pdf += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref)
+    return bytes(pdf)
+
+def generate_sample_statement():
+    """Generate a sample bank statement PDF for testing."""
+    output_dir = Path(__file__).parent.parent / "tests" / "samples"
+    output_dir.mkdir(parents=True, exist_ok=True)
+    output_path = output_dir / "generated_statement.pdf"
+    output_path.write_bytes(render_statement_pdf(make_transactions(80)))
+    print(f"Sample statement generated at: {output_path}")
+
+if __name__ == "__main__":
+    generate_sample_statement()
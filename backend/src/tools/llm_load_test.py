@@ -0,0 +1,105 @@
+import sys
+import time
+import asyncio
+import argparse
+from pathlib import Path
+import numpy as np
+from rich.console import Console
+from rich.table import Table
+
+# Add src directory to Python path
+current_dir = Path(__file__).parent
+src_dir = current_dir.parent
+sys.path.insert(0, str(src_dir))
+
+from services.categorization.batcher import AdaptiveLimiter
+from services.categorization.cache import ClassificationCache
+from services.categorization.classifier import ExpenseClassifier, TAXONOMY_VERSION
+from services.categorization.llm import FakeLLM, FakeLLMConfig
+
+console = Console()
+
+async def run_load(classifier: ExpenseClassifier, receipts: int, items: int, concurrency: int, stream: bool):
+    """Classify ``receipts`` receipts of distinct items, ``concurrency`` at a time; per-receipt latencies."""
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+
+    async def one_receipt(receipt: int):
+        receipt_items = [
+            {"description": f"ITEM {receipt:05d}-{i:03d}", "price": 1.0 + i % 17}
+            for i in range(items)
+        ]
+        async with semaphore:
+            started = time.perf_counter()
+            if stream:
+                async for _ in classifier.stream_classify_items(receipt_items, "GROCERY STORE", 100.0):
+                    pass
+            else:
+                await classifier.classify_items(receipt_items, "GROCERY STORE", 100.0)
+            latencies.append(time.perf_counter() - started)
+
+    await asyncio.gather(*(one_receipt(receipt) for receipt in range(receipts)))
+    return latencies
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Measure classifier throughput, batching and retries against the offline fake LLM"
+    )
+    parser.add_argument("--receipts", type=int, default=200)
+    parser.add_argument("--items", type=int, default=20, help="Items per receipt")
+    parser.add_argument("--concurrency", type=int, default=32, help="Receipts in flight at once")
+    parser.add_argument("--stream", action="store_true", help="Use the streaming classification path")
+    parser.add_argument("--latency-ms", type=float, default=400.0, help="Median fake LLM latency")
+    parser.add_argument("--latency-sigma", type=float, default=0.5, help="Lognormal latency spread")
+    parser.add_argument("--per-item-ms", type=float, default=5.0)
+    parser.add_argument("--error-rate", type=float, default=0.02)
+    parser.add_argument("--drop-rate", type=float, default=0.01)
+    parser.add_argument("--max-concurrency", type=int, default=16, help="LLM request limit")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    llm = FakeLLM(FakeLLMConfig(
+        latency_ms=args.latency_ms,
+        latency_sigma=args.latency_sigma,
+        per_item_ms=args.per_item_ms,
+        error_rate=args.error_rate,
+        drop_rate=args.drop_rate,
+        seed=args.seed
+    ))
+    # Every item goes to the LLM: no cache hits, neighbours or local model
+    classifier = ExpenseClassifier(
+        cache=ClassificationCache(TAXONOMY_VERSION, max_entries=0),
+        limiter=AdaptiveLimiter(max_limit=args.max_concurrency),
+        llm=llm
+    )
+    classifier.local_model = None
+    classifier.neighbors = None
+
+    started = time.perf_counter()
+    latencies = asyncio.run(run_load(classifier, args.receipts, args.items, args.concurrency, args.stream))
+    elapsed = time.perf_counter() - started
+
+    stats = classifier.stats()
+    total_items = args.receipts * args.items
+    table = Table(show_header=True, header_style="bold magenta")
+    table.add_column("Metric")
+    table.add_column("Value", justify="right")
+    rows = [
+        ("items/s", f"{total_items / elapsed:.1f}"),
+        ("receipt p50 ms", f"{np.percentile(latencies, 50) * 1000:.1f}"),
+        ("receipt p99 ms", f"{np.percentile(latencies, 99) * 1000:.1f}"),
+        ("llm calls", str(llm.calls)),
+        ("llm errors", str(llm.errors)),
+        ("items dropped by llm", str(llm.items_dropped)),
+        ("items per batch", f"{stats['llm_batches']['entries_per_batch']:.1f}"),
+        ("served by llm", str(stats["llm"])),
+        ("fallbacks", str(stats["fallback"])),
+        ("final llm limit", str(stats["llm_concurrency"]["limit"])),
+        ("peak llm in flight", str(stats["llm_concurrency"]["peak_in_flight"])),
+    ]
+    for name, value in rows:
+        table.add_row(name, value)
+    console.print(table)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+import sys
+import time
+import argparse
+from pathlib import Path
+from rich.console import Console
+
+# Add src directory to Python path
+current_dir = Path(__file__).parent
+src_dir = current_dir.parent
+sys.path.insert(0, str(src_dir))
+
+from database.config import SessionLocal
+from services.ocr.reparse import ReceiptReparser, REPARSE_CHUNK_SIZE
+
+console = Console()
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Re-run receipt parsing over stored OCR output (no OCR)"
+    )
+    parser.add_argument("--chunk-size", type=int, default=REPARSE_CHUNK_SIZE)
+    parser.add_argument("--after-id", type=int, default=0, help="Resume after this receipt id")
+    parser.add_argument("--limit", type=int, help="Stop after this many receipts")
+    parser.add_argument("--dry-run", action="store_true", help="Parse but do not write changes")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+
+    def report(stats):
+        elapsed = time.perf_counter() - start
+        console.print(
+            f"{stats.scanned} scanned, {stats.updated} updated, {stats.failed} failed "
+            f"(last id {stats.last_id}, {stats.scanned / max(elapsed, 1e-9):.0f} receipts/s)",
+            style="yellow"
+        )
+
+    reparser = ReceiptReparser(chunk_size=args.chunk_size)
+    with SessionLocal() as db:
+        stats = reparser.run(
+            db, after_id=args.after_id, limit=args.limit,
+            dry_run=args.dry_run, on_chunk=report
+        )
+
+    console.print(
+        f"\n✓ Re-parsed {stats.scanned} receipts, {stats.updated} changed"
+        f"{' (dry run)' if args.dry_run else ''}",
+        style="green"
+    )
+
+if __name__ == "__main__":
+    main()
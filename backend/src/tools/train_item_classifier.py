@@ -0,0 +1,82 @@
+import sys
+import argparse
+from pathlib import Path
+from typing import List
+from rich.console import Console
+from rich.table import Table
+
+# Add src directory to Python path
+current_dir = Path(__file__).parent
+src_dir = current_dir.parent
+sys.path.insert(0, str(src_dir))
+
+from sqlalchemy.orm import Session
+from database.config import SessionLocal
+from database.models import (
+    ClassificationCacheEntry, Receipt as ReceiptRecord, ReceiptItem as ReceiptItemRecord
+)
+from services.categorization.classifier import ExpenseClassifier, ExpenseCategory, TAXONOMY_VERSION
+from services.categorization.llm import FakeLLM
+from services.categorization.local_model import (
+    LocalItemClassifier, TrainingSample, LOCAL_MODEL_DIR, LOCAL_MODEL_THRESHOLD
+)
+
+console = Console()
+
+def collect_samples(db: Session, classifier: ExpenseClassifier) -> List[TrainingSample]:
+    """Past LLM classifications plus labelled receipt items in the current taxonomy."""
+    samples = [
+        TrainingSample(entry.description, entry.store_type, entry.category)
+        for entry in db.query(ClassificationCacheEntry).filter(
+            ClassificationCacheEntry.taxonomy_version == TAXONOMY_VERSION
+        ).yield_per(5000)
+    ]
+
+    valid = {category.value for category in ExpenseCategory}
+    rows = db.query(
+        ReceiptItemRecord.description, ReceiptItemRecord.category, ReceiptRecord.store_name
+    ).join(ReceiptRecord, ReceiptItemRecord.receipt_id == ReceiptRecord.id).yield_per(5000)
+    for description, category, store_name in rows:
+        # Uploads store miscellaneous until an item is categorized, so it is not a label
+        if category.value in valid and category.value != ExpenseCategory.MISCELLANEOUS.value:
+            samples.append(TrainingSample(
+                description, classifier._get_store_type(store_name), category.value
+            ))
+    return samples
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Train the local item classifier from stored labels"
+    )
+    parser.add_argument("--output", type=Path, default=LOCAL_MODEL_DIR)
+    parser.add_argument("--threshold", type=float, default=LOCAL_MODEL_THRESHOLD,
+                        help="Confidence above which items skip the LLM")
+    parser.add_argument("--holdout", type=float, default=0.2, help="Fraction held out for metrics")
+    parser.add_argument("--min-samples", type=int, default=200)
+    args = parser.parse_args()
+
+    # Only used for store types; training never calls the LLM
+    classifier = ExpenseClassifier(llm=FakeLLM())
+    with SessionLocal() as db:
+        samples = collect_samples(db, classifier)
+    console.print(f"Collected {len(samples)} labelled items", style="yellow")
+    if len(samples) < args.min_samples:
+        console.print(f"[red]Need at least {args.min_samples} samples to train")
+        sys.exit(1)
+
+    model = LocalItemClassifier.train(
+        samples, TAXONOMY_VERSION, threshold=args.threshold, holdout=args.holdout
+    )
+
+    table = Table(show_header=True, header_style="bold magenta")
+    table.add_column("Metric")
+    table.add_column("Value", justify="right")
+    for name, value in model.metrics.items():
+        table.add_row(name, f"{value:.3f}" if isinstance(value, float) else str(value))
+    console.print(table)
+
+    path = model.save(args.output)
+    console.print(f"✓ Saved model {model.version} to {path}", style="green")
+
+if __name__ == "__main__":
+    main()